@@ -18,7 +18,9 @@ from utils.database import DatabaseManager
 from utils.models import ModelManager
 from utils.visualizations import create_sentiment_gauge, create_model_comparison_chart, create_timeline_chart, create_rating_distribution
 from utils.movie_search import MovieCatalog
+from utils.analytics import ReviewAnalytics
 from utils.language import detect_language, translate_to_english
+from utils.review_pipeline import get_review_pipeline, PipelineBusyError
 from config import AppConfig
 
 # Page configuration
@@ -248,23 +250,26 @@ def _style_plotly(fig):
         pass
     return fig
 
-# Helper function to get all reviews from database
-def get_all_reviews_from_db():
-    """Get all reviews from database for shared viewing across sessions"""
-    if st.session_state.db_manager.is_connected():
-        try:
-            reviews = st.session_state.db_manager.get_reviews(limit=1000)
-            # Convert ObjectId to string for compatibility
-            for review in reviews:
-                if '_id' in review:
-                    review['_id'] = str(review['_id'])
-                if 'movie_id' in review and hasattr(review['movie_id'], '__str__'):
-                    review['movie_id'] = str(review['movie_id'])
-            return reviews
-        except Exception as e:
-            print(f"Error loading reviews: {e}")
-            return []
-    return []
+@st.fragment(run_every=AppConfig.REVIEW_STATUS_POLL_SECONDS)
+def show_review_job_status():
+    """Poll the background review pipeline and report progress for this session's reviews"""
+    pipeline = get_review_pipeline()
+    still_pending = []
+    for job_id in st.session_state.pending_review_jobs:
+        status = pipeline.get_status(job_id)
+        if status is None:
+            continue
+        title = status.get('movie_title') or 'your movie'
+        if status['status'] == 'done':
+            sentiment = status['sentiment']
+            lang_note = f" (translated from {status['original_language']})" if status['was_translated'] else ""
+            st.toast(f"✅ Review for {title} saved{lang_note}! Sentiment: {sentiment['label']} ({sentiment['score']:.2%})")
+        elif status['status'] == 'failed':
+            st.toast(f"⚠️ Review for {title} could not be processed: {status['error']}")
+        else:
+            still_pending.append(job_id)
+            st.caption(f"⏳ Analyzing your review for {title} ({status['stage']})...")
+    st.session_state.pending_review_jobs = still_pending
 
 # Initialize session state
 if 'db_manager' not in st.session_state:
@@ -280,6 +285,10 @@ if 'model_manager' not in st.session_state:
         st.session_state.distilbert_ready = False
 if 'movie_catalog' not in st.session_state:
     st.session_state.movie_catalog = MovieCatalog(st.session_state.db_manager)
+if 'review_analytics' not in st.session_state:
+    st.session_state.review_analytics = ReviewAnalytics(
+        st.session_state.db_manager, cache_ttl=AppConfig.REVIEW_STATS_CACHE_TTL
+    )
 if 'current_page' not in st.session_state:
     st.session_state.current_page = 'home'
 if 'session_id' not in st.session_state:
@@ -287,6 +296,8 @@ if 'session_id' not in st.session_state:
     st.session_state.session_id = str(uuid.uuid4())
 if 'admin_mode' not in st.session_state:
     st.session_state.admin_mode = False
+if 'pending_review_jobs' not in st.session_state:
+    st.session_state.pending_review_jobs = []
 
 # Navigation handling with query params
 page_map = {
@@ -377,8 +388,7 @@ with st.sidebar:
             if stats:
                 total_reviews_db = stats.get('total_reviews', 0)
             # Count reviews from this session
-            all_reviews = get_all_reviews_from_db()
-            session_reviews_count = sum(1 for r in all_reviews if r.get('session_id') == st.session_state.session_id)
+            session_reviews_count = st.session_state.review_analytics.session_review_count(st.session_state.session_id)
         except:
             pass
     
@@ -411,6 +421,10 @@ with st.sidebar:
             st.session_state.admin_mode = False
             st.rerun()
 
+# Background review processing status
+if st.session_state.pending_review_jobs:
+    show_review_job_status()
+
 # Main content area
 if page == "Home":
     # Hero section
@@ -490,8 +504,7 @@ if page == "Home":
                 if stats:
                     total_reviews = stats.get('total_reviews', 0)
                 # Count reviews from this session
-                all_reviews = get_all_reviews_from_db()
-                session_reviews_count = sum(1 for r in all_reviews if r.get('session_id') == st.session_state.session_id)
+                session_reviews_count = st.session_state.review_analytics.session_review_count(st.session_state.session_id)
             except:
                 pass
         
@@ -604,6 +617,9 @@ elif page == "Movie Catalog":
         total_pages = max(1, (total_movies + 19) // 20)
         st.markdown(f"**Page {st.session_state.catalog_page}/{total_pages} — Showing {len(movies)} of {total_movies} movies**")
     
+    # Resolve all posters of the page at once (concurrent, bounded by a page deadline)
+    poster_images = st.session_state.movie_catalog.get_poster_images(movies)
+    
     # Display movies in grid layout
     cols_per_row = 4
     for idx in range(0, len(movies), cols_per_row):
@@ -613,9 +629,7 @@ elif page == "Movie Catalog":
                 movie = movies[idx + col_idx]
                 with col:
                     # Movie poster
-                    year = movie.get('year')
-                    poster_url = st.session_state.movie_catalog.get_poster_url(movie['title'], year)
-                    st.image(poster_url, width="stretch")
+                    st.image(poster_images[idx + col_idx], width="stretch")
                     
                     # Movie details
                     st.markdown(f"**{movie['title'][:30]}{'...' if len(movie['title']) > 30 else ''}**")
@@ -636,6 +650,18 @@ elif page == "Movie Catalog":
                         st.session_state.show_review_modal = True
 
     # Pagination controls (only when browsing without search)
+    if use_pagination:
+        # Get the neighbouring pages ready while the user looks at this one
+        st.session_state.movie_catalog.prefetch_neighbours(
+            genre_filter=genre_filter,
+            sort_by=sort_option.lower(),
+            sort_order=order,
+            limit=20,
+            page=st.session_state.catalog_page
+        )
+    else:
+        st.session_state.movie_catalog.cancel_prefetch()
+    
     if use_pagination:
         st.divider()
         col_prev, col_page, col_next = st.columns([1,2,1])
@@ -665,7 +691,10 @@ elif page == "Movie Catalog":
         
         with col2:
             year = movie.get('year')
-            st.image(st.session_state.movie_catalog.get_poster_url(movie['title'], year), width="stretch")
+            poster_image = st.session_state.movie_catalog.get_poster_images(
+                [{'title': movie['title'], 'year': year, 'poster': movie.get('poster')}]
+            )[0]
+            st.image(poster_image, width="stretch")
             st.caption(f"**Genres:** {movie.get('genres', 'N/A')}")
             st.caption(f"**Year:** {movie.get('year', 'N/A')}")
         
@@ -717,58 +746,40 @@ elif page == "Movie Catalog":
             with col_btn1:
                 if st.button("✅ Submit", type="primary", width="stretch"):
                     if user_review.strip():
-                        with st.spinner("Analyzing sentiment..."):
-                            # Language detection & optional translation
-                            detected_lang = detect_language(user_review)
-                            translated_text, translated_flag, translation_model = translate_to_english(user_review, detected_lang)
-
-                            # Get sentiment prediction (always on English text)
-                            # Map display names to internal model names
-                            model_name_map = {
-                                "LSTM Deep Learning": "lstm",
-                                "Logistic Regression": "logistic", 
-                                "Random Forest": "random_forest",
-                                "DistilBERT (Recommended)": "distilbert",
-                                "DistilBERT": "distilbert"
-                            }
-                            model_name = model_name_map.get(selected_model, "logistic")  # Default to Logistic Regression
-                            sentiment_result = st.session_state.model_manager.predict_sentiment(
-                                translated_text,
-                                model_name
-                            )
+                        # Map display names to internal model names
+                        model_name_map = {
+                            "LSTM Deep Learning": "lstm",
+                            "Logistic Regression": "logistic",
+                            "Random Forest": "random_forest",
+                            "DistilBERT (Recommended)": "distilbert",
+                            "DistilBERT": "distilbert"
+                        }
+                        model_name = model_name_map.get(selected_model, "logistic")  # Default to Logistic Regression
 
-                            # Save review with multilingual metadata
-                            review_data = {
-                                'movie_id': movie['_id'],
-                                'movie_title': movie['title'],
-                                'rating': user_rating,
-                                'original_text': user_review,
-                                'original_language': detected_lang,
-                                'translated_text': translated_text if translated_flag else None,
-                                'translation_model': translation_model,
-                                'was_translated': translated_flag,
-                                'sentiment_score': sentiment_result['score'],
-                                'sentiment_label': sentiment_result['label'],
-                                'model_used': model_name,
-                                'session_id': st.session_state.session_id,
-                                'timestamp': datetime.now()
-                            }
+                        # Language, translation and sentiment fields are filled in by the pipeline
+                        review_data = {
+                            'movie_id': movie['_id'],
+                            'movie_title': movie['title'],
+                            'rating': user_rating,
+                            'original_text': user_review,
+                            'session_id': st.session_state.session_id,
+                            'timestamp': datetime.now()
+                        }
 
-                            # Save directly to database (shared across all sessions)
-                            saved_id = st.session_state.db_manager.save_review(review_data)
-                            
-                            if saved_id:
-                                lang_note = f" (translated from {detected_lang})" if translated_flag else ""
-                                st.success(f"✅ Review submitted{lang_note}! Sentiment: {sentiment_result['label']} ({sentiment_result['score']:.2%})")
-                                st.info("💾 Saved to shared database - visible to all participants after refresh")
-                            else:
-                                st.warning("⚠️ Review analyzed but may not have saved to database. Check connection.")
-                            
-                            # Small delay to ensure DB write completes before closing
-                            import time
-                            time.sleep(0.5)
+                        # Hand off to the background pipeline (detect -> translate -> score -> persist)
+                        try:
+                            job_id = get_review_pipeline().submit(
+                                review_data,
+                                user_review,
+                                model_name,
+                                st.session_state.model_manager,
+                                st.session_state.db_manager
+                            )
+                            st.session_state.pending_review_jobs.append(job_id)
                             st.session_state.show_review_modal = False
                             st.rerun()
+                        except PipelineBusyError:
+                            st.warning("⚠️ Many reviews are being analyzed right now. Please try again in a few seconds.")
                     else:
                         st.error("⚠️ Please write a review before submitting")
             
@@ -792,50 +803,32 @@ elif page == "Live Analytics":
         # Manual refresh instruction
         st.caption(" Use 🔄 button to see latest reviews")
     
-    # Load all reviews from database (shared across all sessions)
-    all_reviews = get_all_reviews_from_db()
+    # Aggregated review data from the database (shared across all sessions)
+    analytics = st.session_state.review_analytics
+    kpis = analytics.kpis()
     
-    if not all_reviews:
+    if not kpis:
         st.info("No reviews collected yet. Visit the Movie Catalog to start collecting audience feedback.")
     else:
-        # Prepare dataframe from all reviews (database + session)
-        reviews_df = pd.DataFrame(all_reviews)
-        # Ensure a canonical review_text column exists for downstream visuals
-        if 'review_text' not in reviews_df.columns:
-            for alt_col in ['text', 'original_text', 'translated_text']:
-                if alt_col in reviews_df.columns:
-                    reviews_df['review_text'] = reviews_df[alt_col]
-                    break
-        if 'review_text' not in reviews_df.columns:
-            reviews_df['review_text'] = ''
-        
         # KPI metrics in a single row
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("Total Reviews", len(reviews_df))
+            st.metric("Total Reviews", kpis['total_reviews'])
         
         with col2:
-            avg_rating = reviews_df['rating'].mean()
-            st.metric("⭐ Average Rating", f"{avg_rating:.2f}/5")
+            st.metric("⭐ Average Rating", f"{kpis['avg_rating']:.2f}/5")
         
         with col3:
-            positive_pct = (reviews_df['sentiment_label'] == 'Positive').mean() * 100
-            st.metric("👍 Positive Sentiment", f"{positive_pct:.1f}%")
+            st.metric("👍 Positive Sentiment", f"{kpis['positive_pct']:.1f}%")
         
         with col4:
-            avg_confidence = reviews_df['sentiment_score'].mean()
-            st.metric("Model Confidence", f"{avg_confidence:.2%}")
+            st.metric("Model Confidence", f"{kpis['avg_confidence']:.2%}")
         
         st.divider()
         
-        # Calculate Top 5 Movies
-        movie_sentiment = reviews_df.groupby('movie_title').agg({
-            'sentiment_score': 'mean',
-            'sentiment_label': lambda x: x.mode()[0] if len(x) > 0 else 'Neutral',
-            'rating': 'mean',
-            'movie_id': 'first'
-        }).reset_index()
+        # Calculate Top 5 Movies from per-movie aggregates
+        movie_sentiment = analytics.movie_sentiment().dropna(subset=['sentiment_score'])
         
         movie_sentiment_sorted = movie_sentiment.sort_values('sentiment_score', ascending=False)
         
@@ -852,30 +845,23 @@ elif page == "Live Analytics":
         # Combine into top_5
         top_5_movies = pd.concat([top_2_recommended, neutral_movie, bottom_2_not_recommended])
 
-        # Enrich top_5_movies with additional movie information (year, etc.)
+        # Enrich top_5_movies with additional movie information (year, etc.) in one query
+        try:
+            movie_details = st.session_state.db_manager.get_movies_by_ids(
+                top_5_movies['movie_id'].tolist(),
+                projection={'year': 1, 'genres': 1, 'poster': 1}
+            )
+        except Exception:
+            movie_details = {}
+        
         enriched_top_5 = []
         for _, row in top_5_movies.iterrows():
-            movie_id = row['movie_id']
-            # Get full movie details from database
-            try:
-                movie_details = st.session_state.db_manager.get_movie_by_id(movie_id)
-                if movie_details:
-                    enriched_row = row.copy()
-                    enriched_row['year'] = movie_details.get('year', 'N/A')
-                    enriched_row['genres'] = movie_details.get('genres', 'N/A')
-                    enriched_top_5.append(enriched_row)
-                else:
-                    # Fallback if movie not found
-                    enriched_row = row.copy()
-                    enriched_row['year'] = 'N/A'
-                    enriched_row['genres'] = 'N/A'
-                    enriched_top_5.append(enriched_row)
-            except Exception:
-                # Fallback on error
-                enriched_row = row.copy()
-                enriched_row['year'] = 'N/A'
-                enriched_row['genres'] = 'N/A'
-                enriched_top_5.append(enriched_row)
+            details = movie_details.get(str(row['movie_id'])) or {}
+            enriched_row = row.copy()
+            enriched_row['year'] = details.get('year', 'N/A')
+            enriched_row['genres'] = details.get('genres', 'N/A')
+            enriched_row['poster'] = details.get('poster')
+            enriched_top_5.append(enriched_row)
 
         top_5_movies = pd.DataFrame(enriched_top_5)
 
@@ -885,6 +871,11 @@ elif page == "Live Analytics":
         # Display Top 5 in a horizontal row
         st.subheader("Top 5 Movies by Sentiment Analysis")
         cols = st.columns(5)
+        poster_images = st.session_state.movie_catalog.get_poster_images([
+            {'title': row['movie_title'], 'year': row.get('year') if row.get('year') != 'N/A' else None,
+             'poster': row.get('poster')}
+            for _, row in top_5_movies.iterrows()
+        ])
         
         position = 1
         for (idx, row), col in zip(top_5_movies.iterrows(), cols):
@@ -908,9 +899,7 @@ elif page == "Live Analytics":
             
             with col:
                 # Movie poster
-                year = row.get('year', 'N/A')
-                poster_url = st.session_state.movie_catalog.get_poster_url(movie_title, year if year != 'N/A' else None)
-                st.image(poster_url, width="stretch", use_container_width=True)
+                st.image(poster_images[position - 1], width="stretch", use_container_width=True)
 
                 st.markdown(f"**#{position} {emoji}**")
                 st.markdown(f"**{movie_title[:18]}{'...' if len(movie_title) > 18 else ''}**")
@@ -934,7 +923,7 @@ elif page == "Live Analytics":
         
         # Recent reviews table
         st.subheader("Recent Reviews")
-        recent_reviews = reviews_df.sort_values('timestamp', ascending=False).head(10)
+        recent_reviews = analytics.recent_reviews(limit=10)
         
         display_df = recent_reviews[['movie_title', 'rating', 'sentiment_label', 'sentiment_score', 'review_text']].copy()
         display_df['sentiment_score'] = display_df['sentiment_score'].apply(lambda x: f"{x:.2%}")
@@ -950,26 +939,22 @@ elif page == "Live Analytics":
         
         with col1:
                 # Rating distribution
-                fig = create_rating_distribution(reviews_df)
+                fig = create_rating_distribution(analytics.rating_histogram())
                 fig = _style_plotly(fig)
                 st.plotly_chart(fig, width='stretch')
         
         with col2:
             
             # Top reviewed movies
-            top_movies = reviews_df.groupby('movie_title').agg({
-                'rating': 'mean',
-                'sentiment_score': 'mean',
-                'review_text': 'count'
-                }).sort_values('review_text', ascending=False).head(5)
+            top_movies = movie_sentiment.sort_values('review_count', ascending=False).head(5)
                 
             fig = px.bar(
-                top_movies.reset_index(),
-                x='review_text',
+                top_movies,
+                x='review_count',
                 y='movie_title',
                 orientation='h',
                 title="Most Reviewed Movies",
-                labels={'review_text': 'Number of Reviews', 'movie_title': 'Movie'}
+                labels={'review_count': 'Number of Reviews', 'movie_title': 'Movie'}
             )
             fig.update_layout(height=300)
             fig = _style_plotly(fig)
@@ -978,7 +963,7 @@ elif page == "Live Analytics":
         st.divider()
 
             # Timeline chart
-        fig = create_timeline_chart(reviews_df)
+        fig = create_timeline_chart(analytics.timeline())
         fig = _style_plotly(fig)
         st.plotly_chart(fig, width='stretch')      
  
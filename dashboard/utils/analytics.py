@@ -0,0 +1,269 @@
+"""
+Review analytics computed by MongoDB aggregation pipelines
+
+ReviewAnalytics serves the Live Analytics page: KPIs, per-movie sentiment,
+the rating histogram, the review timeline and recent reviews. MongoDB returns
+aggregated rows (per movie, per rating, per time bucket); reviews that are not
+in MongoDB yet (write-behind buffer, local fallback log) are folded into the
+same rows from LocalAggregates, which is rebuilt only when those sources change.
+"""
+from collections import defaultdict
+from datetime import datetime
+
+import pandas as pd
+
+from utils.cache import TTLCache
+
+REVIEW_TEXT_FIELDS = ('review_text', 'text', 'original_text', 'translated_text')
+
+
+def _number(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+def _sum_and_count(field):
+    """$group accumulators summing a numeric field and counting its numeric values"""
+    return {
+        f'{field}_sum': {'$sum': {'$cond': [{'$isNumber': f'${field}'}, f'${field}', 0]}},
+        f'{field}_count': {'$sum': {'$cond': [{'$isNumber': f'${field}'}, 1, 0]}},
+    }
+
+
+def _add_numbers(target, review):
+    """Fold a review's sentiment_score and rating into *_sum/*_count keys of `target`"""
+    for field in ('sentiment_score', 'rating'):
+        value = _number(review.get(field))
+        if value is not None:
+            target[f'{field}_sum'] += value
+            target[f'{field}_count'] += 1
+
+
+class LocalAggregates:
+    """Every local-review aggregate the page needs, computed in one pass"""
+
+    def __init__(self, reviews):
+        self.sessions = defaultdict(int)
+        self.movies = {}  # title -> per-movie accumulators
+        self.ratings = defaultdict(int)
+        self.minutes = defaultdict(lambda: defaultdict(float))  # minute -> accumulators
+        for review in reviews:
+            self.add(review)
+
+    def add(self, review):
+        if review.get('session_id'):
+            self.sessions[review['session_id']] += 1
+
+        title = review.get('movie_title')
+        movie = self.movies.get(title)
+        if movie is None:
+            movie = self.movies[title] = {
+                'movie_id': review.get('movie_id'), 'review_count': 0, 'labels': defaultdict(int),
+                'sentiment_score_sum': 0.0, 'sentiment_score_count': 0,
+                'rating_sum': 0.0, 'rating_count': 0,
+            }
+        movie['review_count'] += 1
+        movie['labels'][review.get('sentiment_label')] += 1
+        _add_numbers(movie, review)
+
+        if _number(review.get('rating')) is not None:
+            self.ratings[review['rating']] += 1
+
+        timestamp = review.get('timestamp')
+        if isinstance(timestamp, datetime):
+            minute = self.minutes[timestamp.replace(second=0, microsecond=0)]
+            minute['review_count'] += 1
+            _add_numbers(minute, review)
+
+
+class ReviewAnalytics:
+    """Aggregated review views for the Live Analytics page"""
+
+    def __init__(self, db_manager, cache_ttl=2):
+        self.db_manager = db_manager
+        # Local aggregates and per-session counts, reused across the metrics of a rerun
+        self._cache = TTLCache(maxsize=32, ttl=cache_ttl)
+
+    def _aggregate(self, pipeline):
+        if not self.db_manager.is_connected():
+            return []
+        try:
+            return list(self.db_manager.reviews.aggregate(pipeline))
+        except Exception as e:
+            print(f"⚠ Review analytics query failed: {e}")
+            return []
+
+    def _local_version(self):
+        try:
+            return self.db_manager.local_reviews_version()
+        except Exception as e:
+            print(f"⚠ Could not read local review version: {e}")
+            return None
+
+    def _local(self):
+        """LocalAggregates over pending and locally stored reviews (rescanned only when they change)"""
+        def _scan():
+            try:
+                return LocalAggregates(self.db_manager.iter_local_reviews())
+            except Exception as e:
+                print(f"⚠ Could not include local reviews in analytics: {e}")
+                return LocalAggregates(())
+        return self._cache.get_or_set(('local', self._local_version()), _scan)
+
+    # ------------------------------------------------------------------ KPIs
+    def kpis(self):
+        """Total reviews, average rating, positive share and mean model confidence"""
+        stats = self.db_manager.get_review_statistics()
+        if not stats or not stats.get('total_reviews'):
+            return None
+        return {
+            'total_reviews': stats['total_reviews'],
+            'avg_rating': stats.get('avg_rating', 0),
+            # Share of reviews labelled Positive (sentiment_score is the label's confidence)
+            'positive_pct': stats.get('positive_label_count', 0) / stats['total_reviews'] * 100,
+            'avg_confidence': stats.get('avg_sentiment', 0),
+            'active_participants': stats.get('active_participants', 0),
+        }
+
+    def session_review_count(self, session_id):
+        """Number of reviews written from one browser session"""
+        def _count():
+            if not self.db_manager.is_connected():
+                return 0
+            try:
+                return self.db_manager.reviews.count_documents({'session_id': session_id})
+            except Exception as e:
+                print(f"⚠ Could not count session reviews: {e}")
+                return 0
+        count = self._cache.get_or_set(('session', session_id, self._local_version()), _count)
+        return count + self._local().sessions.get(session_id, 0)
+
+    # ------------------------------------------------------------- per movie
+    def movie_sentiment(self):
+        """
+        Per-movie sentiment aggregates
+
+        Returns:
+            DataFrame with movie_title, movie_id, review_count, sentiment_score (mean),
+            rating (mean) and sentiment_label (most frequent label)
+        """
+        rows = self._aggregate([
+            {'$project': {'movie_title': 1, 'movie_id': 1, 'rating': 1, 'sentiment_score': 1, 'sentiment_label': 1}},
+            {'$group': {
+                '_id': {'title': '$movie_title', 'label': '$sentiment_label'},
+                'movie_id': {'$first': '$movie_id'},
+                'review_count': {'$sum': 1},
+                **_sum_and_count('sentiment_score'),
+                **_sum_and_count('rating'),
+            }},
+        ])
+
+        totals = ('review_count', 'sentiment_score_sum', 'sentiment_score_count', 'rating_sum', 'rating_count')
+        movies = {}
+
+        def _movie(title, movie_id):
+            movie = movies.get(title)
+            if movie is None:
+                movie = movies[title] = {'movie_id': movie_id, 'labels': defaultdict(int), **{key: 0 for key in totals}}
+            return movie
+
+        for row in rows:
+            movie = _movie(row['_id'].get('title'), row.get('movie_id'))
+            movie['labels'][row['_id'].get('label')] += row['review_count']
+            for key in totals:
+                movie[key] += row[key]
+
+        for title, local in self._local().movies.items():
+            movie = _movie(title, local['movie_id'])
+            for label, count in local['labels'].items():
+                movie['labels'][label] += count
+            for key in totals:
+                movie[key] += local[key]
+
+        records = []
+        for title, movie in movies.items():
+            if title is None:
+                continue
+            labels = [(-count, str(label)) for label, count in movie['labels'].items() if label is not None]
+            records.append({
+                'movie_title': title,
+                'movie_id': str(movie['movie_id']) if movie['movie_id'] is not None else None,
+                'review_count': movie['review_count'],
+                'sentiment_score': (movie['sentiment_score_sum'] / movie['sentiment_score_count']
+                                    if movie['sentiment_score_count'] else None),
+                'rating': movie['rating_sum'] / movie['rating_count'] if movie['rating_count'] else None,
+                # Most frequent label, ties broken alphabetically (as pandas' mode())
+                'sentiment_label': min(labels)[1] if labels else 'Neutral',
+            })
+        columns = ['movie_title', 'movie_id', 'review_count', 'sentiment_score', 'rating', 'sentiment_label']
+        return pd.DataFrame(records, columns=columns)
+
+    # ------------------------------------------------------------ histograms
+    def rating_histogram(self):
+        """Series of review counts indexed by rating"""
+        counts = defaultdict(int)
+        for row in self._aggregate([
+            {'$match': {'rating': {'$type': 'number'}}},
+            {'$group': {'_id': '$rating', 'count': {'$sum': 1}}},
+        ]):
+            counts[row['_id']] += row['count']
+        for rating, count in self._local().ratings.items():
+            counts[rating] += count
+        return pd.Series(counts, dtype='int64', name='count').sort_index()
+
+    def timeline(self, bucket_minutes=5):
+        """
+        Review activity per time bucket
+
+        Returns:
+            DataFrame with time_bucket, review_count, sentiment_score (mean), rating (mean)
+        """
+        buckets = defaultdict(lambda: defaultdict(float))
+        for row in self._aggregate([
+            {'$match': {'timestamp': {'$type': 'date'}}},
+            {'$group': {
+                '_id': {'$dateTrunc': {'date': '$timestamp', 'unit': 'minute', 'binSize': bucket_minutes}},
+                'review_count': {'$sum': 1},
+                **_sum_and_count('sentiment_score'),
+                **_sum_and_count('rating'),
+            }},
+        ]):
+            bucket = buckets[row['_id']]
+            for key, value in row.items():
+                if key != '_id':
+                    bucket[key] += value
+
+        for minute, totals in self._local().minutes.items():
+            bucket = buckets[minute.replace(minute=minute.minute - minute.minute % bucket_minutes)]
+            for key, value in totals.items():
+                bucket[key] += value
+
+        records = []
+        for time_bucket in sorted(buckets):
+            bucket = buckets[time_bucket]
+            records.append({
+                'time_bucket': time_bucket,
+                'review_count': int(bucket['review_count']),
+                'sentiment_score': (bucket['sentiment_score_sum'] / bucket['sentiment_score_count']
+                                    if bucket['sentiment_score_count'] else None),
+                'rating': bucket['rating_sum'] / bucket['rating_count'] if bucket['rating_count'] else None,
+            })
+        return pd.DataFrame(records, columns=['time_bucket', 'review_count', 'sentiment_score', 'rating'])
+
+    # ---------------------------------------------------------------- recent
+    def recent_reviews(self, limit=10):
+        """DataFrame of the newest reviews with a canonical review_text column"""
+        records = []
+        for review in self.db_manager.iter_reviews(limit=limit):
+            text = next((review[f] for f in REVIEW_TEXT_FIELDS if review.get(f)), '')
+            records.append({
+                'movie_title': review.get('movie_title'),
+                'rating': review.get('rating'),
+                'sentiment_label': review.get('sentiment_label'),
+                'sentiment_score': review.get('sentiment_score'),
+                'review_text': text,
+                'timestamp': review.get('timestamp'),
+            })
+        columns = ['movie_title', 'rating', 'sentiment_label', 'sentiment_score', 'review_text', 'timestamp']
+        return pd.DataFrame(records, columns=columns)
@@ -0,0 +1,68 @@
+"""
+Process-wide background refresh tasks
+
+Streamlit creates manager objects per browser session, but periodic
+maintenance (count refreshes, materialized views, health checks) should run
+once per process. start_periodic_task() registers tasks by name so repeated
+calls from new sessions reuse the running thread.
+"""
+import threading
+
+
+class PeriodicTask:
+    """Daemon thread calling `func` every `interval` seconds"""
+
+    def __init__(self, name, interval, func, run_immediately=True):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self.run_immediately = run_immediately
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"periodic-{name}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def trigger(self):
+        """Run the task as soon as possible instead of waiting for the interval"""
+        self._wake.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def is_alive(self):
+        return self._thread.is_alive()
+
+    def _run(self):
+        if not self.run_immediately:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+        while not self._stop.is_set():
+            try:
+                self.func()
+            except Exception as e:
+                print(f"⚠ Background task '{self.name}' failed: {e}")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+
+_tasks = {}
+_tasks_lock = threading.Lock()
+
+
+def start_periodic_task(name, interval, func, run_immediately=True):
+    """Start `func` on a schedule unless a task with this name is already running"""
+    with _tasks_lock:
+        task = _tasks.get(name)
+        if task is None or not task.is_alive():
+            task = PeriodicTask(name, interval, func, run_immediately).start()
+            _tasks[name] = task
+        return task
+
+
+def get_periodic_task(name):
+    with _tasks_lock:
+        return _tasks.get(name)
@@ -0,0 +1,318 @@
+"""
+Local SQLite snapshot of the movie catalog
+
+`export_snapshot()` streams `sample_mflix.movies` (catalog projection) and the
+materialized popularity view into a single SQLite file. `CatalogSnapshot`
+serves the DatabaseManager catalog reads from that file with the same return
+shapes as the MongoDB queries, so the catalog keeps working without Atlas
+(outages, offline demos, tests) and reads are local-latency.
+
+Schema:
+
+    movies(id, title, title_lower, year, rating, runtime, plot, poster,
+           genres, directors, cast, search_text)   list fields are JSON arrays
+    movie_genres(genre, id)                          lowercased genre membership
+    popularity(id, rating, comment_count)
+    meta(key, value)                                 exported_at, movie_count
+"""
+import base64
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+try:
+    from bson import ObjectId
+except ImportError:  # snapshot reads work without pymongo installed
+    ObjectId = str
+
+SNAPSHOT_FIELDS = ('title', 'year', 'genres', 'plot', 'poster', 'imdb.rating', 'runtime', 'directors', 'cast')
+
+# UI sort option -> column
+SORT_COLUMNS = {
+    'title': 'title',
+    'year': 'year',
+    'rating': 'rating',
+    'popularity': 'rating',
+}
+
+SCHEMA = """
+CREATE TABLE movies (
+    id TEXT PRIMARY KEY,
+    title TEXT,
+    title_lower TEXT,
+    year INTEGER,
+    rating REAL,
+    runtime INTEGER,
+    plot TEXT,
+    poster TEXT,
+    genres TEXT,
+    directors TEXT,
+    "cast" TEXT,
+    search_text TEXT
+);
+CREATE TABLE movie_genres (genre TEXT NOT NULL, id TEXT NOT NULL);
+CREATE TABLE popularity (id TEXT PRIMARY KEY, rating REAL, comment_count INTEGER);
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+INDEXES = """
+CREATE INDEX movies_title ON movies (title, id);
+CREATE INDEX movies_year ON movies (year, id);
+CREATE INDEX movies_rating ON movies (rating, id);
+CREATE INDEX movie_genres_genre ON movie_genres (genre, id);
+CREATE INDEX popularity_rank ON popularity (rating DESC, comment_count DESC);
+"""
+
+
+def _as_list(value):
+    if isinstance(value, list):
+        return [v for v in value if v is not None]
+    return [] if value is None else [value]
+
+
+def _as_int(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    digits = str(value or '')[:4]
+    return int(digits) if digits.isdigit() else None
+
+
+def _as_float(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+def _movie_row(doc):
+    imdb = doc.get('imdb') if isinstance(doc.get('imdb'), dict) else {}
+    title = doc.get('title')
+    title = '' if title is None else str(title)
+    genres, directors, cast = _as_list(doc.get('genres')), _as_list(doc.get('directors')), _as_list(doc.get('cast'))
+    # Same normalization as the trigram index: one list entry per line, lowercased
+    search_text = '\n'.join([
+        title, str(doc.get('plot') or ''), '\n'.join(map(str, cast)), '\n'.join(map(str, directors))
+    ]).lower()
+    return (
+        str(doc['_id']), title, title.lower(), _as_int(doc.get('year')), _as_float(imdb.get('rating')),
+        _as_int(doc.get('runtime')), doc.get('plot'), doc.get('poster'),
+        json.dumps(genres), json.dumps(directors), json.dumps(cast), search_text,
+    )
+
+
+def export_snapshot(movies, path, popularity=None, batch_size=1000):
+    """
+    Stream the movie catalog into a new SQLite snapshot
+
+    The snapshot is written to a temporary file and moved into place, so
+    readers never see a partial export.
+
+    Args:
+        movies: pymongo collection (or anything with find()) of movie documents
+        path: Destination .sqlite3 file
+        popularity: Optional materialized popularity collection to include
+
+    Returns:
+        Number of movies exported
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    if tmp_path.exists():
+        tmp_path.unlink()
+
+    projection = {field: 1 for field in SNAPSHOT_FIELDS}
+    conn = sqlite3.connect(str(tmp_path))
+    try:
+        conn.executescript(SCHEMA)
+        count = 0
+        rows, genre_rows = [], []
+        cursor = movies.find({}, projection)
+        if hasattr(cursor, 'batch_size'):
+            cursor = cursor.batch_size(batch_size)
+        for doc in cursor:
+            row = _movie_row(doc)
+            rows.append(row)
+            genre_rows.extend((str(genre).lower(), row[0]) for genre in json.loads(row[8]))
+            if len(rows) >= batch_size:
+                count += _insert_movies(conn, rows, genre_rows)
+                rows, genre_rows = [], []
+        count += _insert_movies(conn, rows, genre_rows)
+
+        if popularity is not None:
+            conn.executemany(
+                "INSERT OR REPLACE INTO popularity VALUES (?, ?, ?)",
+                (
+                    (str(doc['_id']), _as_float(doc.get('rating')), int(doc.get('comment_count') or 0))
+                    for doc in popularity.find({}, {'rating': 1, 'comment_count': 1})
+                )
+            )
+
+        conn.executescript(INDEXES)
+        conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+            ('exported_at', datetime.now().isoformat(sep=' ')),
+            ('movie_count', str(count)),
+        ])
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, path)
+    return count
+
+
+def _insert_movies(conn, rows, genre_rows):
+    conn.executemany(f"INSERT OR REPLACE INTO movies VALUES ({', '.join('?' * 12)})", rows)
+    conn.executemany("INSERT INTO movie_genres VALUES (?, ?)", genre_rows)
+    return len(rows)
+
+
+def _object_id(value):
+    if ObjectId is str or not ObjectId.is_valid(value):
+        return value
+    return ObjectId(value)
+
+
+def _encode_offset_token(offset):
+    return base64.urlsafe_b64encode(json.dumps({'snapshot_offset': offset}).encode()).decode()
+
+
+def _decode_offset_token(token):
+    if not token:
+        return 0
+    try:
+        return int(json.loads(base64.urlsafe_b64decode(token.encode()))['snapshot_offset'])
+    except (ValueError, KeyError, TypeError):
+        return 0
+
+
+class CatalogSnapshot:
+    """Read-only catalog backend over a snapshot file (DatabaseManager return shapes)"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._local = threading.local()  # one read-only connection per thread
+
+    def available(self):
+        return self.path.exists()
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def meta(self):
+        return dict(self._conn().execute("SELECT key, value FROM meta").fetchall())
+
+    # ----------------------------------------------------------------- shapes
+    @staticmethod
+    def _movie_doc(row):
+        doc = {
+            '_id': _object_id(row['id']),
+            'title': row['title'],
+            'genres': json.loads(row['genres']),
+            'plot': row['plot'],
+            'poster': row['poster'],
+            'runtime': row['runtime'],
+            'directors': json.loads(row['directors']),
+            'cast': json.loads(row['cast']),
+            'rating': row['rating'],
+        }
+        if row['year'] is not None:
+            doc['year'] = row['year']
+        if row['rating'] is not None:
+            doc['imdb'] = {'rating': row['rating']}
+        return {key: value for key, value in doc.items() if value is not None or key == 'rating'}
+
+    # ---------------------------------------------------------------- filters
+    def _where(self, query="", genre=None, phrase=False):
+        """SQL WHERE clause mirroring DatabaseManager._keyword_filter/_genre_filter"""
+        clauses, params = [], []
+        query = (query or '').strip().lower()
+        if query:
+            words = query.split()
+            if phrase:
+                clauses.append("instr(title_lower, ?) > 0")
+                params.append(query)
+            elif len(words) == 1:
+                clauses.append("instr(search_text, ?) > 0")
+                params.append(words[0])
+            else:
+                clauses.append('(' + ' OR '.join("instr(title_lower, ?) > 0" for _ in words) + ')')
+                params.extend(words)
+        if genre and genre != "All Genres":
+            clauses.append("id IN (SELECT id FROM movie_genres WHERE genre = ?)")
+            params.append(genre.lower())
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    @staticmethod
+    def _order_by(sort_by, sort_order):
+        column = SORT_COLUMNS.get((sort_by or 'title').lower(), 'title')
+        direction = 'ASC' if sort_order == 'asc' else 'DESC'
+        if column == 'rating' and direction == 'ASC':
+            # Unrated movies last, by id (same order as the MongoDB rating_sort tiers)
+            return " ORDER BY rating IS NULL, rating ASC, id ASC"
+        return f" ORDER BY {column} {direction}, id {direction}"
+
+    # ------------------------------------------------------------------ reads
+    def search_movies(self, query="", genre=None, sort_by="title", sort_order="asc", limit=50, skip=0):
+        where, params = self._where(query, genre)
+        sql = f"SELECT * FROM movies{where}{self._order_by(sort_by, sort_order)} LIMIT ? OFFSET ?"
+        return [self._movie_doc(row) for row in self._conn().execute(sql, params + [limit, skip])]
+
+    def search_movies_page(self, query="", genre=None, sort_by="title", sort_order="asc", limit=20, page_token=None):
+        """(movies, next_page_token); tokens are opaque offsets into the snapshot ordering"""
+        offset = _decode_offset_token(page_token)
+        movies = self.search_movies(query, genre, sort_by, sort_order, limit=limit + 1, skip=offset)
+        next_token = _encode_offset_token(offset + limit) if len(movies) > limit else None
+        return movies[:limit], next_token
+
+    def page_token_at(self, query="", genre=None, sort_by="title", sort_order="asc", page_token=None, offset=0):
+        if offset <= 0:
+            return page_token
+        target = _decode_offset_token(page_token) + offset
+        return _encode_offset_token(target) if target < self.count_movies(query, genre, phrase=False) else None
+
+    def count_movies(self, query="", genre=None, phrase=True):
+        where, params = self._where(query, genre, phrase=phrase)
+        return self._conn().execute(f"SELECT COUNT(*) FROM movies{where}", params).fetchone()[0]
+
+    def get_movies_by_ids(self, movie_ids, projection=None):
+        """str(id) -> movie; `projection` is accepted for signature parity (full rows are returned)"""
+        ids = list(dict.fromkeys(str(movie_id) for movie_id in movie_ids))
+        movies = {}
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            sql = f"SELECT * FROM movies WHERE id IN ({', '.join('?' * len(chunk))})"
+            for row in self._conn().execute(sql, chunk):
+                movies[row['id']] = self._movie_doc(row)
+        return movies
+
+    def get_popular_movies(self, limit=20):
+        rows = self._conn().execute(
+            "SELECT m.*, p.rating AS popularity_rating, p.comment_count FROM popularity p "
+            "JOIN movies m ON m.id = p.id ORDER BY p.rating DESC, p.comment_count DESC LIMIT ?",
+            (limit,)
+        ).fetchall()
+        if not rows:
+            # Snapshot exported without the popularity view: rating only
+            rows = self._conn().execute(
+                "SELECT *, rating AS popularity_rating, 0 AS comment_count FROM movies "
+                "WHERE rating IS NOT NULL ORDER BY rating DESC, id DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+        movies = []
+        for row in rows:
+            doc = self._movie_doc(row)
+            doc.pop('imdb', None)
+            doc.pop('runtime', None)
+            doc['rating'] = row['popularity_rating']
+            doc['comment_count'] = row['comment_count']
+            movies.append(doc)
+        return movies
@@ -1,13 +1,19 @@
 """
 Database management utilities for MongoDB Atlas
 """
-from pymongo import MongoClient
-from pymongo.server_api import ServerApi
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from bson import ObjectId
 import pandas as pd
 from datetime import datetime
 import sys
 from pathlib import Path
 import os
+import json
+import base64
+import heapq
+import threading
+from itertools import islice
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -23,28 +29,281 @@ except ImportError:
     spec.loader.exec_module(config_module)
     AppConfig = config_module.AppConfig
 
-class DatabaseManager:
-    def __init__(self):
-        """Initialize MongoDB connection"""
+from utils.title_index import get_title_index
+from utils.keyword_index import TrigramIndex, get_keyword_index
+from utils.cache import TTLCache
+from utils.review_stats import ReviewStats
+from utils.review_log import ReviewLog
+from utils.write_behind import get_write_behind_buffer
+from utils.catalog_snapshot import CatalogSnapshot
+from utils.mongo_client import get_mongo_client, is_healthy, on_healthy
+from utils.background import start_periodic_task, get_periodic_task
+
+# Pagination counts shared by all sessions: (query, genre, exact) -> count
+_count_cache = TTLCache(maxsize=AppConfig.COUNT_CACHE_SIZE, ttl=AppConfig.COUNT_CACHE_TTL)
+
+# Catalog read results keyed by normalized arguments + catalog version, shared by all sessions
+_catalog_cache = TTLCache(maxsize=AppConfig.CATALOG_CACHE_SIZE, ttl=AppConfig.CATALOG_CACHE_TTL)
+
+# Last seen catalog_meta version; bumping it in MongoDB invalidates every catalog cache
+_catalog_version = {'value': 0}
+
+# Movie documents by (id, projection), shared so detail lookups skip Atlas round trips
+_movie_cache = TTLCache(maxsize=AppConfig.MOVIE_CACHE_SIZE, ttl=AppConfig.MOVIE_CACHE_TTL)
+
+# Per-genre movie counts (lowercased genre -> count), kept fresh by a background task
+_genre_counts = {}
+_genre_counts_meta = {}
+
+# Canonical genre spelling (lowercased genre -> stored name), from distinct('genres')
+_genre_names = {}
+
+# Reviews stored locally while MongoDB rejects writes (the flat JSONL file is
+# the pre-segment-log format, migrated into the log on first use)
+LOCAL_BACKUP_PATH = Path(__file__).parent.parent / 'local_reviews_backup.jsonl'
+_local_log = ReviewLog(AppConfig.LOCAL_REVIEW_LOG_DIR, legacy_path=LOCAL_BACKUP_PATH)
+
+# Reviews accepted from every session, batched into MongoDB (logged locally first)
+_review_buffer = get_write_behind_buffer(
+    ReviewLog(AppConfig.REVIEW_WAL_DIR),
+    max_batch=AppConfig.REVIEW_WRITE_BATCH_SIZE,
+    max_delay=AppConfig.REVIEW_WRITE_MAX_DELAY
+)
+
+# Collapses the repeated statistics reads of a single page render
+_stats_cache = TTLCache(maxsize=4, ttl=AppConfig.REVIEW_STATS_CACHE_TTL)
+
+
+def _review_sort_key(review):
+    timestamp = review.get('timestamp')
+    return timestamp if isinstance(timestamp, datetime) else datetime.min
+
+
+def _norm(value):
+    """Normalize a query argument for cache keys"""
+    return (value or '').strip().lower() if isinstance(value, str) or value is None else value
+
+
+def _copy_rows(movies):
+    """Shallow-copy cached movie dicts so callers can annotate them freely"""
+    return [dict(movie) for movie in movies]
+
+
+def _copy_page(page):
+    movies, next_token = page
+    return _copy_rows(movies), next_token
+
+
+def _is_quota_error(message):
+    message = str(message)
+    return 'quota' in message.lower() or 'AtlasError' in message
+
+
+def _unique_reviews(reviews):
+    seen = set()
+    for review in reviews:
+        review_id = review.get('_id')
+        if review_id is not None:
+            if str(review_id) in seen:
+                continue
+            seen.add(str(review_id))
+        yield review
+
+
+def _guarded_stream(reviews, source):
+    """Yield from a review source, ending it quietly if it fails mid-iteration"""
+    try:
+        yield from reviews
+    except Exception as e:
+        print(f"⚠ Error reading reviews from {source}: {e}")
+
+
+_services_lock = threading.Lock()
+_services_started = False
+
+
+def _start_process_services(manager):
+    """Once per process: indexes, background refreshers and search index warmup"""
+    global _services_started
+    with _services_lock:
+        if _services_started:
+            return
+        _services_started = True
+    
+    def _run():
+        # Create indexes for better performance
+        manager._create_indexes()
+        
+        # Sort key for rating order with unrated movies last (new documents only)
         try:
-            self.client = MongoClient(AppConfig.MONGODB_URI, server_api=ServerApi('1'))
-            self.db = self.client[AppConfig.DATABASE_NAME]
-            
-            # Test connection
-            self.client.admin.command('ping')
-            self.connected = True
-            
-            # Initialize collections
-            self.movies = self.db[AppConfig.MOVIES_COLLECTION]
-            self.comments = self.db[AppConfig.COMMENTS_COLLECTION]
-            self.reviews = self.db[AppConfig.REVIEWS_COLLECTION]
-            
-            # Create indexes for better performance
-            self._create_indexes()
-            
+            manager.backfill_rating_sort()
         except Exception as e:
-            print(f"Database connection error: {e}")
-            self.connected = False
+            print(f"rating_sort backfill warning: {e}")
+        
+        # Pick up catalog reloads (scripts/04_refresh_catalog.py bumps catalog_meta.version)
+        start_periodic_task('catalog-version', AppConfig.CATALOG_VERSION_POLL_SECONDS, manager.poll_catalog_version)
+        
+        # Keep per-genre counts fresh for pagination
+        start_periodic_task('genre-counts', AppConfig.GENRE_COUNT_REFRESH_SECONDS, manager._refresh_genre_counts)
+        
+        # Keep the materialized popularity view current
+        start_periodic_task('movie-popularity', AppConfig.POPULARITY_REFRESH_SECONDS, manager.refresh_popularity)
+        
+        # Warm the shared search indexes
+        get_title_index(manager.movies).ensure_built()
+        get_keyword_index(manager.movies).ensure_built()
+    
+    threading.Thread(target=_run, name="database-startup", daemon=True).start()
+
+
+def _on_mongo_healthy(manager):
+    """Atlas is reachable: flush buffered reviews through `manager` and start the process services"""
+    _review_buffer.set_sink(manager._flush_reviews)
+    _start_process_services(manager)
+
+
+# ---------------------------------------------------------------------------
+# Keyset pagination helpers
+# ---------------------------------------------------------------------------
+# MongoDB orders mixed types by bracket: null/missing < numbers < strings.
+_TYPE_BRACKETS = ('null', 'number', 'string')
+
+
+def _type_bracket(value):
+    if value is None:
+        return 'null'
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return 'number'
+    return 'string'
+
+
+def _bracket_filter(field, bracket):
+    if bracket == 'null':
+        return {field: None}  # matches null and missing
+    return {field: {'$type': bracket}}
+
+
+def _keyset_filter(field, direction, last_value, last_id):
+    """Filter for rows strictly after (last_value, last_id) in (field, _id) order"""
+    bracket = _type_bracket(last_value)
+    rank = _TYPE_BRACKETS.index(bracket)
+    id_op = '$gt' if direction == 1 else '$lt'
+    clauses = [{field: last_value, '_id': {id_op: last_id}}]
+    if bracket != 'null':
+        clauses.append({field: {'$gt' if direction == 1 else '$lt': last_value}})
+    # Whole type brackets that sort after the last value
+    later = _TYPE_BRACKETS[rank + 1:] if direction == 1 else _TYPE_BRACKETS[:rank]
+    clauses.extend(_bracket_filter(field, b) for b in later)
+    return {'$or': clauses}
+
+
+def _field_value(doc, dotted_field):
+    value = doc
+    for part in dotted_field.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _encode_page_token(sort_field, direction, value, doc_id):
+    payload = {'f': sort_field, 'd': direction, 'v': value, 'id': str(doc_id)}
+    raw = json.dumps(payload, default=str).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def _decode_page_token(token, sort_field, direction):
+    """Return (last_value, last_id) or None for a missing/foreign token"""
+    if not token:
+        return None
+    try:
+        from bson import ObjectId
+        payload = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+        if payload.get('f') != sort_field or payload.get('d') != direction:
+            return None
+        return payload.get('v'), ObjectId(payload['id'])
+    except Exception as e:
+        print(f"Ignoring invalid page token: {e}")
+        return None
+
+
+class DatabaseManager:
+    # Fields returned for catalog listings
+    CATALOG_PROJECTION = {
+        'title': 1,
+        'year': 1,
+        'genres': 1,
+        'plot': 1,
+        'poster': 1,
+        'imdb.rating': 1,
+        'rating_sort': 1,
+        'runtime': 1,
+        'directors': 1,
+        'cast': 1
+    }
+
+    # Map UI sort options to document fields
+    SORT_FIELD_MAP = {
+        'title': 'title',
+        'year': 'year',
+        'rating': 'rating_sort',
+        'popularity': 'rating_sort'  # Use rating as popularity proxy
+    }
+
+    # Stored sort key: imdb.rating, or this sentinel (below every rating) when missing
+    RATING_SORT_MISSING = -1
+    RATING_SORT_EXPRESSION = {'$cond': [{'$isNumber': '$imdb.rating'}, '$imdb.rating', RATING_SORT_MISSING]}
+
+    # Fields returned for the popular movies list
+    POPULARITY_PROJECTION = {
+        'title': 1,
+        'year': 1,
+        'genres': 1,
+        'plot': 1,
+        'poster': 1,
+        'rating': 1,
+        'comment_count': 1,
+        'directors': 1,
+        'cast': 1
+    }
+
+    def __init__(self):
+        """Bind to the shared MongoDB client (no per-session connection or ping)"""
+        self.client = get_mongo_client()
+        self.db = self.client[AppConfig.DATABASE_NAME]
+        
+        # Initialize collections
+        self.movies = self.db[AppConfig.MOVIES_COLLECTION]
+        self.comments = self.db[AppConfig.COMMENTS_COLLECTION]
+        self.reviews = self.db[AppConfig.REVIEWS_COLLECTION]
+        self.popularity = self.db[AppConfig.POPULARITY_COLLECTION]
+        self.materialized_meta = self.db[AppConfig.MATERIALIZED_META_COLLECTION]
+        self.review_stats = self.db[AppConfig.REVIEW_STATS_COLLECTION]
+        self.review_participants = self.db[AppConfig.REVIEW_PARTICIPANTS_COLLECTION]
+        self.review_trending = self.db[AppConfig.REVIEW_TRENDING_COLLECTION]
+        self.catalog_meta = self.db[AppConfig.CATALOG_META_COLLECTION]
+        
+        # Local catalog snapshot: forced by config, or the fallback while Atlas is unreachable
+        self._snapshot = CatalogSnapshot(AppConfig.CATALOG_SNAPSHOT_PATH)
+        
+        # Runs now if Atlas is reachable, otherwise once the health check sees it come
+        # back; buffered reviews are flushed through the newest manager
+        on_healthy('database-manager', lambda: _on_mongo_healthy(self))
+        if not self.connected and self.snapshot is not None:
+            print(f"✓ Serving the movie catalog from local snapshot {self._snapshot.path.name}")
+    
+    @property
+    def connected(self):
+        """Latest result of the shared client's background health check"""
+        return is_healthy()
+    
+    @property
+    def snapshot(self):
+        """The CatalogSnapshot read backend in use, or None when reading from MongoDB"""
+        backend = AppConfig.CATALOG_BACKEND
+        if backend == 'mongo' or (backend == 'auto' and self.connected):
+            return None
+        return self._snapshot if self._snapshot.available() else None
     
     def _create_indexes(self):
         """Create indexes for optimized queries"""
@@ -58,8 +317,25 @@ class DatabaseManager:
             # Index on year for sorting
             self.movies.create_index("year")
             
+            # Compound (sort field, _id) indexes back keyset pagination in both directions,
+            # with a genres-prefixed twin for genre-filtered browsing
+            for sort_field in set(self.SORT_FIELD_MAP.values()):
+                self.movies.create_index([(sort_field, 1), ('_id', 1)])
+                self.movies.create_index([('genres', 1), (sort_field, 1), ('_id', 1)])
+            
+            # Sort index for the materialized popularity view
+            self.popularity.create_index([('rating', -1), ('comment_count', -1)])
+            self.comments.create_index('date')  # incremental comment-count watermark
+            
+            # Hourly trending buckets: newest-first reads, expired by a TTL index
+            self.review_trending.create_index(
+                'bucket',
+                expireAfterSeconds=AppConfig.TRENDING_RETENTION_DAYS * 24 * 3600
+            )
+            
             # Index on reviews timestamp
             self.reviews.create_index("timestamp")
+            self.reviews.create_index("session_id")  # per-session review counts
             
         except Exception as e:
             print(f"Index creation warning: {e}")
@@ -71,10 +347,130 @@ class DatabaseManager:
     def get_movie_count(self):
         """Get total number of movies in database"""
         try:
-            return self.movies.count_documents({})
+            return self.count_movies(exact=False)
         except:
             return 0
     
+    def _keyword_filter(self, query, phrase=False, fields=None):
+        """
+        Build a MongoDB filter for a keyword query using the local trigram index
+
+        Single words match title, plot, cast or directors; multiple words match
+        any of them in the title. With `phrase=True` the whole query is one term.
+        Falls back to the equivalent regex filter if the index is unavailable.
+        """
+        words = query.strip().split()
+        if phrase:
+            terms, mode, fields = [query.strip()], 'and', fields or ('title',)
+        elif len(words) == 1:
+            terms, mode, fields = words, 'and', fields or TrigramIndex.FIELDS
+        else:
+            terms, mode, fields = words, 'or', fields or ('title',)
+
+        try:
+            ids = get_keyword_index(self.movies).search_terms(terms, mode=mode, fields=fields)
+            return {'_id': {'$in': ids}}
+        except Exception as e:
+            print(f"Keyword index unavailable ({e}), using regex search")
+            return {'$or': [
+                {field: {'$regex': term, '$options': 'i'}}
+                for term in terms for field in fields
+            ]}
+
+    def _catalog_filter(self, query="", genre=None):
+        """Build the MongoDB filter shared by catalog browse/search queries"""
+        filter_query = {}
+        
+        # Text search - resolved locally by the trigram index, then fetched by _id
+        if query:
+            filter_query.update(self._keyword_filter(query))
+        
+        # Genre filter
+        if genre and genre != "All Genres":
+            filter_query.update(self._genre_filter(genre))
+        
+        return filter_query
+
+    def _genre_filter(self, genre):
+        """Exact-membership genre filter (served by the genres compound indexes)"""
+        return {'genres': self.canonical_genre(genre)}
+
+    def canonical_genre(self, genre):
+        """Map a genre name in any case to the spelling stored in the catalog"""
+        if not _genre_names:
+            try:
+                for name in self.movies.distinct('genres'):
+                    if isinstance(name, str):
+                        _genre_names[name.lower()] = name
+            except Exception as e:
+                print(f"Could not load genre list: {e}")
+        return _genre_names.get(genre.lower(), genre)
+
+    def explain_catalog_query(self, genre=None, sort_by="title", sort_order="asc", limit=20):
+        """Return MongoDB's explain() output for a catalog browse page (diagnostics/tests)"""
+        sort_field, sort_direction = self._sort_spec(sort_by, sort_order)
+        filter_query = self._catalog_filter("", genre)
+        if sort_field == 'rating_sort' and sort_direction == 1:
+            filter_query = {'$and': [filter_query, {'rating_sort': {'$gt': self.RATING_SORT_MISSING}}]}
+        cursor = (
+            self.movies.find(filter_query, self.CATALOG_PROJECTION)
+            .sort([(sort_field, sort_direction), ('_id', sort_direction)])
+            .limit(limit)
+        )
+        return cursor.explain()
+
+    def _find_sorted(self, filter_query, projection, sort_field, sort_direction, position=None, skip=0, limit=20):
+        """
+        Rows ordered by (sort field, _id), optionally after a keyset position
+
+        Unrated movies always come last. Descending rating order gets that for
+        free from the sentinel; ascending order reads two index ranges - rated
+        movies first, then the unrated tier by _id.
+        """
+        order = [(sort_field, sort_direction), ('_id', sort_direction)]
+        if sort_field != 'rating_sort' or sort_direction == -1:
+            if position is not None:
+                filter_query = {'$and': [filter_query, _keyset_filter(sort_field, sort_direction, *position)]}
+            return list(self.movies.find(filter_query, projection).sort(order).skip(skip).limit(limit))
+
+        rows = []
+        if position is None or position[0] != self.RATING_SORT_MISSING:
+            rated = [filter_query, {'rating_sort': {'$gt': self.RATING_SORT_MISSING}}]
+            if position is not None:
+                rated.append(_keyset_filter(sort_field, sort_direction, *position))
+            rated_query = {'$and': rated}
+            rows = list(self.movies.find(rated_query, projection).sort(order).skip(skip).limit(limit))
+            if len(rows) >= limit:
+                return rows
+            if rows:
+                skip = 0
+            elif skip:
+                skip = max(0, skip - self.movies.count_documents(rated_query))
+            position = None
+
+        unrated = [filter_query, {'rating_sort': self.RATING_SORT_MISSING}]
+        if position is not None:
+            unrated.append({'_id': {'$gt': position[1]}})
+        rows += list(
+            self.movies.find({'$and': unrated}, projection).sort(order).skip(skip).limit(limit - len(rows))
+        )
+        return rows
+
+    def backfill_rating_sort(self, only_missing=True):
+        """Store rating_sort (imdb.rating or the sentinel) on catalog documents"""
+        filter_query = {'rating_sort': {'$exists': False}} if only_missing else {}
+        result = self.movies.update_many(filter_query, [{'$set': {'rating_sort': self.RATING_SORT_EXPRESSION}}])
+        if result.modified_count:
+            print(f"✓ rating_sort stored on {result.modified_count} movies")
+            _catalog_cache.invalidate()
+        return result.modified_count
+
+    def _sort_spec(self, sort_by, sort_order):
+        """Map UI sort options to (field, direction)"""
+        sort_direction = 1 if sort_order == "asc" else -1
+        sort_field = self.SORT_FIELD_MAP.get((sort_by or 'title').lower(), 'title')
+        return sort_field, sort_direction
+
     def search_movies(self, query="", genre=None, sort_by="title", sort_order="asc", limit=50, skip=0):
         """
         Search movies with filters and sorting
@@ -90,80 +486,19 @@ class DatabaseManager:
         Returns:
             List of movie documents
         """
-        try:
-            filter_query = {}
-            
-            # Text search - search in multiple fields for better results
-            if query:
-                # Split query into words for better matching
-                words = query.strip().split()
-                if len(words) == 1:
-                    # Single word - search in title, plot, cast, directors
-                    filter_query['$or'] = [
-                        {'title': {'$regex': query, '$options': 'i'}},
-                        {'plot': {'$regex': query, '$options': 'i'}},
-                        {'cast': {'$regex': query, '$options': 'i'}},
-                        {'directors': {'$regex': query, '$options': 'i'}}
-                    ]
-                else:
-                    # Multiple words - search each word
-                    word_patterns = [{'title': {'$regex': word, '$options': 'i'}} for word in words]
-                    filter_query['$or'] = word_patterns
-            
-            # Genre filter
-            if genre and genre != "All Genres":
-                filter_query['genres'] = {'$regex': genre, '$options': 'i'}
-            
-            # Determine sort order
-            sort_direction = 1 if sort_order == "asc" else -1
-            
-            # Map sort_by to actual field
-            sort_field_map = {
-                'title': 'title',
-                'year': 'year',
-                'rating': 'imdb.rating',
-                'popularity': 'imdb.rating'  # Use rating as popularity proxy
-            }
-            sort_field = sort_field_map.get(sort_by.lower(), 'title')
+        if self.snapshot is not None:
+            return self.snapshot.search_movies(query, genre, sort_by, sort_order, limit=limit, skip=skip)
+        if not self.connected:
+            return []
+        
+        def _query():
+            filter_query = self._catalog_filter(query, genre)
+            sort_field, sort_direction = self._sort_spec(sort_by, sort_order)
             
             # Execute query with sorting
             # Apply sort then skip then limit (safer pagination order)
-            movies = list(
-                self.movies.find(
-                    filter_query,
-                    {
-                        'title': 1,
-                        'year': 1,
-                        'genres': 1,
-                        'plot': 1,
-                        'poster': 1,
-                        'imdb.rating': 1,
-                        'runtime': 1,
-                        'directors': 1,
-                        'cast': 1
-                    }
-                ).sort(sort_field, sort_direction).skip(skip).limit(limit)
-            )
-
-            # Fallback: if requesting rating/popularity sort and result unexpectedly empty on first page, retry without sort to avoid blank UI
-            if not movies and skip == 0 and sort_field == 'imdb.rating':
-                unsorted = list(
-                    self.movies.find(
-                        filter_query,
-                        {
-                            'title': 1,
-                            'year': 1,
-                            'genres': 1,
-                            'plot': 1,
-                            'poster': 1,
-                            'imdb.rating': 1,
-                            'runtime': 1,
-                            'directors': 1,
-                            'cast': 1
-                        }
-                    ).skip(0).limit(limit)
-                )
-                movies = unsorted
+            movies = self._find_sorted(filter_query, self.CATALOG_PROJECTION, sort_field, sort_direction,
+                                       skip=skip, limit=limit)
             
             # Process results
             for movie in movies:
@@ -171,46 +506,190 @@ class DatabaseManager:
                     movie['rating'] = movie['imdb']['rating']
                 else:
                     movie['rating'] = None
-
-            # Custom post-sort to ensure unrated movies always appear at the end
-            # MongoDB may place nulls first in descending order; we normalize here.
-            if sort_field in ['imdb.rating'] and movies:
-                if sort_order == 'desc':
-                    # High rating first, None at end
-                    movies.sort(key=lambda m: (m['rating'] is None, -(m['rating'] if m['rating'] is not None else 0)))
-                else:
-                    # Low rating first, None at end
-                    movies.sort(key=lambda m: (m['rating'] is None, m['rating'] if m['rating'] is not None else 10**9))
             
             return movies
-            
+        
+        try:
+            key = ('search', _norm(query), _norm(genre), _norm(sort_by), sort_order, limit, skip, _catalog_version['value'])
+            return _copy_rows(_catalog_cache.get_or_set(key, _query))
         except Exception as e:
             print(f"Error searching movies: {e}")
             return []
 
-    def count_movies(self, query="", genre=None):
-        """Count movies matching filters (used for pagination)."""
+    def search_movies_page(self, query="", genre=None, sort_by="title", sort_order="asc", limit=20, page_token=None):
+        """
+        Keyset (seek) pagination over the catalog
+
+        Pages are ordered by (sort field, _id) and continue from the last row of
+        the previous page, so every page is an index range scan regardless of
+        depth (no server-side skip).
+
+        Args:
+            page_token: Opaque token returned for the previous page (None = first page)
+
+        Returns:
+            Tuple (movies, next_page_token); next_page_token is None on the last page
+        """
+        if self.snapshot is not None:
+            return self.snapshot.search_movies_page(query, genre, sort_by, sort_order, limit=limit, page_token=page_token)
+        if not self.connected:
+            return [], None
+        
+        def _query():
+            sort_field, sort_direction = self._sort_spec(sort_by, sort_order)
+            filter_query = self._catalog_filter(query, genre)
+
+            position = _decode_page_token(page_token, sort_field, sort_direction)
+            movies = self._find_sorted(filter_query, self.CATALOG_PROJECTION, sort_field, sort_direction,
+                                       position=position, limit=limit + 1)
+            has_more = len(movies) > limit
+            movies = movies[:limit]
+
+            for movie in movies:
+                if 'imdb' in movie and 'rating' in movie['imdb']:
+                    movie['rating'] = movie['imdb']['rating']
+                else:
+                    movie['rating'] = None
+
+            next_token = None
+            if has_more and movies:
+                last = movies[-1]
+                next_token = _encode_page_token(sort_field, sort_direction, _field_value(last, sort_field), last['_id'])
+            return movies, next_token
+        
+        try:
+            key = ('page', _norm(query), _norm(genre), _norm(sort_by), sort_order, limit, page_token, _catalog_version['value'])
+            return _copy_page(_catalog_cache.get_or_set(key, _query))
+        except Exception as e:
+            print(f"Error paging movies: {e}")
+            return [], None
+
+    def page_token_at(self, query="", genre=None, sort_by="title", sort_order="asc", page_token=None, offset=0):
+        """
+        Token for the page starting `offset` rows after `page_token`
+
+        Used to jump to an arbitrary page number: walks forward with a
+        (sort field, _id)-only projection that the compound index can serve.
+        """
+        if offset <= 0:
+            return page_token
+        if self.snapshot is not None:
+            return self.snapshot.page_token_at(query, genre, sort_by, sort_order, page_token=page_token, offset=offset)
+        if not self.connected:
+            return None
+        
+        def _query():
+            sort_field, sort_direction = self._sort_spec(sort_by, sort_order)
+            filter_query = self._catalog_filter(query, genre)
+            position = _decode_page_token(page_token, sort_field, sort_direction)
+            boundary = self._find_sorted(filter_query, {sort_field: 1, '_id': 1}, sort_field, sort_direction,
+                                         position=position, skip=offset - 1, limit=1)
+            if not boundary:
+                return None
+            doc = boundary[0]
+            return _encode_page_token(sort_field, sort_direction, _field_value(doc, sort_field), doc['_id'])
+        
         try:
-            filter_query = {}
-            if query:
-                filter_query['title'] = {'$regex': query, '$options': 'i'}
-            if genre and genre != "All Genres":
-                filter_query['genres'] = {'$regex': genre, '$options': 'i'}
-            return self.movies.count_documents(filter_query)
+            key = ('token_at', _norm(query), _norm(genre), _norm(sort_by), sort_order, page_token, offset, _catalog_version['value'])
+            return _catalog_cache.get_or_set(key, _query)
+        except Exception as e:
+            print(f"Error locating page token: {e}")
+            return None
+
+    def count_movies(self, query="", genre=None, exact=True):
+        """
+        Count movies matching filters (used for pagination)
+
+        Results are cached per (query, genre) for COUNT_CACHE_TTL seconds and
+        shared across sessions. Genre-only counts come from the per-genre table
+        maintained by the background refresher. With exact=False an unfiltered
+        count uses the collection's metadata (estimated_document_count).
+        """
+        query = (query or "").strip()
+        genre = genre if genre and genre != "All Genres" else None
+        if self.snapshot is not None:
+            return self.snapshot.count_movies(query, genre)
+        if not self.connected:
+            return 0
+        cache_key = (query.lower(), genre.lower() if genre else None, exact, _catalog_version['value'])
+
+        cached = _count_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        try:
+            if not query and genre is None and not exact:
+                count = self.movies.estimated_document_count()
+            elif not query and genre is not None and genre.lower() in _genre_counts:
+                count = _genre_counts[genre.lower()]
+            else:
+                filter_query = {}
+                if query:
+                    filter_query.update(self._keyword_filter(query, phrase=True, fields=('title',)))
+                if genre:
+                    filter_query.update(self._genre_filter(genre))
+                count = self.movies.count_documents(filter_query)
+            _count_cache.set(cache_key, count)
+            return count
         except Exception as e:
             print(f"Error counting movies: {e}")
             return 0
 
+    def _refresh_genre_counts(self):
+        """Recompute per-genre movie counts (runs in the background refresher)"""
+        pipeline = [
+            {'$unwind': '$genres'},
+            {'$group': {'_id': '$genres', 'count': {'$sum': 1}}}
+        ]
+        rows = [row for row in self.movies.aggregate(pipeline) if row.get('_id')]
+        counts = {str(row['_id']).lower(): row['count'] for row in rows}
+        _genre_names.update({str(row['_id']).lower(): row['_id'] for row in rows})
+        total = self.movies.estimated_document_count()
+        changed = counts != _genre_counts or total != _genre_counts_meta.get('total')
+        _genre_counts.clear()
+        _genre_counts.update(counts)
+        _genre_counts_meta['total'] = total
+        if changed:
+            self.invalidate_counts()
+
+    def poll_catalog_version(self):
+        """Adopt the catalog version stored in MongoDB, dropping cached reads if it changed"""
+        doc = self.catalog_meta.find_one({'_id': 'catalog'}, {'version': 1}) or {}
+        version = doc.get('version', 0)
+        if version == _catalog_version['value']:
+            return False
+        _catalog_version['value'] = version
+        _catalog_cache.invalidate()
+        _movie_cache.invalidate()
+        self.invalidate_counts()
+        task = get_periodic_task('genre-counts')
+        if task is not None:
+            task.trigger()
+        print(f"✓ Catalog version {version}: cached catalog reads dropped")
+        return True
+    
+    def bump_catalog_version(self):
+        """Record a catalog change so every process drops its cached catalog reads"""
+        self.catalog_meta.update_one({'_id': 'catalog'}, {'$inc': {'version': 1}}, upsert=True)
+        return self.poll_catalog_version()
+    
+    def invalidate_counts(self):
+        """Drop cached pagination counts (call after the catalog changes)"""
+        _count_cache.invalidate()
+
     def search_movies_precise_title(self, query, genre=None, limit=20):
         """Return top-N movies best matching the title query using fuzzy ranking.
 
-        Steps:
-        1. Collect candidate set via regex on title (up to 1000 docs)
-        2. If insufficient, broaden using word components
-        3. Score each candidate using rapidfuzz similarity (WRatio)
-        4. Sort by similarity desc then IMDb rating desc
-        5. Return top `limit`
+        Served from the shared in-memory TitleIndex (no MongoDB round trip):
+        1. Candidates: titles containing the query (broadened to query words if < 10)
+        2. Score candidates with rapidfuzz WRatio in one vectorized call
+        3. Sort by similarity desc then IMDb rating desc
+        4. Return top `limit`
         """
+        if self.snapshot is not None:
+            return self.snapshot.search_movies(query=query, genre=genre, sort_by='title', sort_order='asc', limit=limit)
+        if not self.connected:
+            return []
         try:
             from rapidfuzz import fuzz
         except Exception as e:
@@ -218,323 +697,527 @@ class DatabaseManager:
             return self.search_movies(query=query, genre=genre, sort_by='title', sort_order='asc', limit=limit)
 
         try:
-            filter_query = {}
-            if genre and genre != "All Genres":
-                filter_query['genres'] = {'$regex': genre, '$options': 'i'}
-
-            # Primary candidate set: title contains full query
-            primary_regex = {'title': {'$regex': query, '$options': 'i'}}
-            candidate_filter = {**filter_query, **primary_regex}
-            projection = {
-                'title': 1,
-                'year': 1,
-                'genres': 1,
-                'imdb.rating': 1
-            }
-            candidates = list(self.movies.find(candidate_filter, projection).limit(1000))
-
-            # Broaden if very few results
-            if len(candidates) < 10:
-                words = [w for w in query.split() if len(w) > 2]
-                word_or = [{ 'title': {'$regex': w, '$options': 'i'}} for w in words]
-                if word_or:
-                    broaden_filter = {**filter_query, '$or': word_or}
-                    more_candidates = list(self.movies.find(broaden_filter, projection).limit(1000))
-                    # Merge by _id
-                    existing_ids = {c['_id'] for c in candidates}
-                    for m in more_candidates:
-                        if m['_id'] not in existing_ids:
-                            candidates.append(m)
-
-            # Score and sort
-            scored = []
-            q_lower = query.lower().strip()
-            for m in candidates:
-                title = m.get('title', '')
-                sim = fuzz.WRatio(q_lower, title.lower())  # 0-100
-                rating = None
-                if 'imdb' in m and isinstance(m['imdb'], dict) and 'rating' in m['imdb']:
-                    rating = m['imdb']['rating']
-                scored.append((sim, rating if rating is not None else -1, m))
-
-            scored.sort(key=lambda x: (x[0], x[1]), reverse=True)
-            top = [s[2] for s in scored[:limit]]
-
-            # Normalize rating field
-            for movie in top:
-                if 'imdb' in movie and 'rating' in movie['imdb']:
-                    movie['rating'] = movie['imdb']['rating']
-                else:
-                    movie['rating'] = None
-            return top
+            return get_title_index(self.movies).search(query, genre=genre, limit=limit)
         except Exception as e:
             print(f"Precise title search error: {e}")
             return []
     
-    def get_movie_by_id(self, movie_id):
+    def get_movie_by_id(self, movie_id, projection=None):
         """Get a single movie by ID"""
-        try:
-            from bson import ObjectId
-            return self.movies.find_one({'_id': ObjectId(movie_id)})
-        except Exception as e:
-            print(f"Error getting movie: {e}")
-            return None
+        return self.get_movies_by_ids([movie_id], projection=projection).get(str(movie_id))
+    
+    def get_movies_by_ids(self, movie_ids, projection=None):
+        """
+        Get several movies with one `$in` query
+        
+        Documents are served from a shared LRU cache when possible; only the
+        missing ids are fetched from MongoDB.
+        
+        Args:
+            movie_ids: Movie ids (ObjectId or hex string); invalid ids are ignored
+            projection: Optional MongoDB projection applied to every movie
+        
+        Returns:
+            Dict mapping str(movie id) to the movie document (missing movies are absent)
+        """
+        if self.snapshot is not None:
+            return self.snapshot.get_movies_by_ids(movie_ids, projection=projection)
+        projection_key = tuple(sorted(projection.items())) if projection else None
+        movies, missing = {}, []
+        for movie_id in movie_ids:
+            key = str(movie_id)
+            if key in movies or not ObjectId.is_valid(key):
+                continue
+            cached = _movie_cache.get((key, projection_key))
+            if cached is not None:
+                movies[key] = dict(cached)
+            else:
+                movies[key] = None
+                missing.append(ObjectId(key))
+        
+        if missing and self.connected:
+            try:
+                for movie in self.movies.find({'_id': {'$in': missing}}, projection):
+                    key = str(movie['_id'])
+                    _movie_cache.set((key, projection_key), movie)
+                    movies[key] = dict(movie)
+            except Exception as e:
+                print(f"Error getting movies: {e}")
+        return {key: movie for key, movie in movies.items() if movie is not None}
     
     def get_popular_movies(self, limit=20):
-        """Get popular movies based on IMDb rating and number of comments"""
+        """Get popular movies based on IMDb rating and number of comments
+
+        Reads the materialized `movie_popularity` collection, sorted by its
+        (rating, comment_count) index - no per-request $lookup over comments.
+        """
+        if self.snapshot is not None:
+            return self.snapshot.get_popular_movies(limit=limit)
+        if not self.connected:
+            return []
+        key = ('popular', limit, _catalog_version['value'])
+        cached = _catalog_cache.get(key)
+        if cached is not None:
+            return _copy_rows(cached)
         try:
-            # Use aggregation to join with comments and sort
-            pipeline = [
-                {
-                    '$match': {
-                        'imdb.rating': {'$exists': True, '$ne': None}
-                    }
-                },
-                {
-                    '$lookup': {
-                        'from': 'comments',
-                        'localField': '_id',
-                        'foreignField': 'movie_id',
-                        'as': 'comments'
-                    }
-                },
-                {
-                    '$addFields': {
-                        'comment_count': {'$size': '$comments'},
-                        'rating': '$imdb.rating'
-                    }
-                },
-                {
-                    '$sort': {
-                        'rating': -1,
-                        'comment_count': -1
-                    }
-                },
-                {
-                    '$limit': limit
-                },
-                {
-                    '$project': {
-                        'title': 1,
-                        'year': 1,
-                        'genres': 1,
-                        'plot': 1,
-                        'poster': 1,
-                        'rating': 1,
-                        'comment_count': 1,
-                        'directors': 1,
-                        'cast': 1
-                    }
-                }
-            ]
-            
-            return list(self.movies.aggregate(pipeline))
-            
+            movies = list(
+                self.popularity.find({}, self.POPULARITY_PROJECTION)
+                .sort([('rating', -1), ('comment_count', -1)])
+                .limit(limit)
+            )
+            if movies:
+                _catalog_cache.set(key, movies)
+                return _copy_rows(movies)
+            # Not materialized yet: ask the refresher to build it now
+            task = get_periodic_task('movie-popularity')
+            if task is not None:
+                task.trigger()
         except Exception as e:
             print(f"Error getting popular movies: {e}")
-            # Fallback to simple query
+
+        # Fallback to simple query
+        try:
             return list(self.movies.find(
                 {'imdb.rating': {'$exists': True}},
                 {'title': 1, 'year': 1, 'genres': 1, 'poster': 1, 'imdb': 1}
             ).sort('imdb.rating', -1).limit(limit))
-    
+        except Exception as e:
+            print(f"Error getting fallback popular movies: {e}")
+            return []
+
+    def refresh_popularity(self, full=False):
+        """
+        Maintain the `movie_popularity` materialized view with $merge
+
+        A full build copies rated movies (catalog fields + rating) and counts all
+        comments. Later runs are incremental: only movies with a newer _id and
+        comments dated after the last watermark are merged, adding to the
+        stored comment_count.
+        """
+        meta = self.materialized_meta.find_one({'_id': AppConfig.POPULARITY_COLLECTION}) or {}
+        full = full or not meta
+        started_at = datetime.now()
+
+        # Fix the upper watermarks first so rows arriving mid-refresh wait for the next run
+        last_movie = self.movies.find_one({}, {'_id': 1}, sort=[('_id', -1)])
+        last_comment = self.comments.find_one({}, {'date': 1}, sort=[('date', -1)])
+        movies_until = last_movie['_id'] if last_movie else meta.get('last_movie_id')
+        comments_until = last_comment.get('date') if last_comment else meta.get('comments_until')
+
+        movie_match = {'imdb.rating': {'$exists': True, '$ne': None}}
+        if movies_until is not None:
+            movie_match['_id'] = {'$lte': movies_until}
+            if not full and meta.get('last_movie_id') is not None:
+                movie_match['_id']['$gt'] = meta['last_movie_id']
+        self.movies.aggregate([
+            {'$match': movie_match},
+            {'$project': {
+                'title': 1, 'year': 1, 'genres': 1, 'plot': 1, 'poster': 1,
+                'directors': 1, 'cast': 1, 'rating': '$imdb.rating'
+            }},
+            {'$merge': {
+                'into': AppConfig.POPULARITY_COLLECTION,
+                'on': '_id',
+                'whenMatched': 'merge',
+                'whenNotMatched': 'insert'
+            }}
+        ])
+        self.popularity.update_many({'comment_count': {'$exists': False}}, {'$set': {'comment_count': 0}})
+
+        comment_match = {}
+        if comments_until is not None:
+            comment_match['date'] = {'$lte': comments_until}
+            if not full and meta.get('comments_until') is not None:
+                comment_match['date']['$gt'] = meta['comments_until']
+        if full:
+            merged_count = '$$new.comment_count'
+        else:
+            merged_count = {'$add': [{'$ifNull': ['$comment_count', 0]}, '$$new.comment_count']}
+        self.comments.aggregate([
+            {'$match': comment_match},
+            {'$group': {'_id': '$movie_id', 'comment_count': {'$sum': 1}}},
+            {'$merge': {
+                'into': AppConfig.POPULARITY_COLLECTION,
+                'on': '_id',
+                'whenMatched': [{'$set': {'comment_count': merged_count}}],
+                'whenNotMatched': 'discard'
+            }}
+        ])
+
+        self.materialized_meta.update_one(
+            {'_id': AppConfig.POPULARITY_COLLECTION},
+            {'$set': {
+                'last_movie_id': movies_until,
+                'comments_until': comments_until,
+                'refreshed_at': started_at,
+                'full_refresh': full
+            }},
+            upsert=True
+        )
+        _catalog_cache.invalidate(lambda key: key[0] == 'popular')
+        print(f"✓ movie_popularity refreshed ({'full' if full else 'incremental'})")
+
     def save_review(self, review_data):
         """
         Save a user review to database
         
+        The review gets its ObjectId here and is handed to the process-wide
+        write-behind buffer, which logs it locally and inserts it into MongoDB
+        with the next batch. Reads see it immediately through the buffer.
+        
         Args:
             review_data: Dictionary containing review information
         """
         try:
             review_data['timestamp'] = datetime.now()
-            result = self.reviews.insert_one(review_data)
-            print(f"✓ Review saved to MongoDB with ID: {result.inserted_id}")
-            return result.inserted_id
+            review_data['_id'] = ObjectId()
+            _review_buffer.append(review_data)
+            _stats_cache.invalidate()
+            return review_data['_id']
         except Exception as e:
-            error_msg = str(e)
-            print(f"⚠ Error saving review to MongoDB: {error_msg}")
-            
-            # Fallback storage if Atlas space quota exceeded OR any other error
-            if 'space quota' in error_msg.lower() or 'quota' in error_msg.lower() or 'AtlasError' in error_msg:
-                print(f"⚠ MongoDB Atlas space quota exceeded (using {review_data.get('movie_title', 'N/A')})")
-                print("💾 Falling back to local file storage...")
+            print(f"⚠ Error saving review: {e}")
+            return None
+    
+    def _flush_reviews(self, reviews):
+        """
+        Write-behind sink: insert one batch of buffered reviews
+        
+        Returns the reviews to retry later. Reviews rejected because the Atlas
+        space quota is exceeded go to the local review log instead.
+        """
+        if not self.connected:
+            return list(reviews)  # keep them in the write-ahead log until Atlas is back
+        
+        # Reviews replayed from the write-ahead log come back with their ObjectIds restored
+        documents = [dict(review) for review in reviews]
+        
+        try:
+            self.reviews.insert_many(documents, ordered=False)
+            errors = {}
+        except BulkWriteError as e:
+            errors = {error['index']: error for error in e.details.get('writeErrors', [])}
+        except Exception as e:
+            if not _is_quota_error(e):
+                raise
+            errors = {i: {'errmsg': str(e)} for i in range(len(documents))}
+        
+        # A duplicate key means an earlier attempt already inserted (and counted) the review
+        inserted = [doc for i, doc in enumerate(documents) if i not in errors]
+        failed = [(i, error) for i, error in errors.items() if error.get('code') != 11000]
+        # Stored reviews leave the pending overlay before the statistics round trips
+        failed_indexes = {i for i, _ in failed}
+        _review_buffer.confirm(doc for i, doc in enumerate(documents) if i not in failed_indexes)
+        if inserted:
+            self._record_review_stats(inserted)
+            self._record_trending(inserted)
+            print(f"✓ Saved {len(inserted)} reviews to MongoDB")
+        
+        retry = []
+        for i, error in failed:
+            if _is_quota_error(error.get('errmsg', '')):
                 try:
-                    from pathlib import Path
-                    import json
-                    backup_path = Path(__file__).parent.parent / 'local_reviews_backup.jsonl'
-                    review_data['timestamp'] = str(datetime.now()) if isinstance(review_data.get('timestamp'), datetime) else review_data.get('timestamp', str(datetime.now()))
-                    review_data['storage_fallback'] = 'local_file_quota_exceeded'
-                    with open(backup_path, 'a', encoding='utf-8') as f:
-                        f.write(json.dumps(review_data, default=str) + '\n')
-                    print(f"✓ Review stored locally at {backup_path}")
-                    return 'local-backup'
+                    self._store_review_locally(documents[i])
+                    _review_buffer.confirm([documents[i]])
+                    continue
                 except Exception as fe:
                     print(f"✗ Local backup also failed: {fe}")
-                    return None
-            return None
+            retry.append(reviews[i])
+        if retry:
+            print(f"⚠ {len(retry)} reviews could not be saved to MongoDB, will retry")
+        return retry
+    
+    def _store_review_locally(self, review_data):
+        """Fallback storage when the Atlas space quota is exceeded"""
+        print(f"⚠ MongoDB Atlas space quota exceeded (using {review_data.get('movie_title', 'N/A')})")
+        review_data = dict(review_data)
+        review_data.pop('_id', None)
+        review_data['storage_fallback'] = 'local_file_quota_exceeded'
+        _local_log.append(review_data)
+        print(f"💾 Review stored locally in {_local_log.directory}")
     
     def get_reviews(self, movie_id=None, limit=100):
         """Get reviews from MongoDB and local backup, optionally filtered by movie"""
-        all_reviews = []
+        return list(self.iter_reviews(movie_id=movie_id, limit=limit))
+    
+    def iter_reviews(self, movie_id=None, limit=100):
+        """
+        Yield reviews newest first from MongoDB and the local review log
         
-        # Try to get from MongoDB first
-        try:
-            query = {}
-            if movie_id:
-                query['movie_id'] = movie_id
-            
-            mongo_reviews = list(self.reviews.find(query).sort('timestamp', -1).limit(limit))
-            all_reviews.extend(mongo_reviews)
-            print(f"✓ Loaded {len(mongo_reviews)} reviews from MongoDB")
-        except Exception as e:
-            print(f"⚠ Error getting reviews from MongoDB: {e}")
+        Both sources are already ordered by timestamp (the indexed Mongo cursor
+        and the log's reverse index), so they are merged lazily with a heap and
+        iteration stops after `limit` reviews.
+        """
+        query = {}
+        if movie_id:
+            query['movie_id'] = movie_id
         
-        # Also load from local backup if it exists (for demo when MongoDB is full)
-        try:
-            from pathlib import Path
-            import json
-            backup_path = Path(__file__).parent.parent / 'local_reviews_backup.jsonl'
-            if backup_path.exists():
-                with open(backup_path, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        if line.strip():
-                            try:
-                                review = json.loads(line)
-                                # Convert timestamp string back to datetime if needed
-                                if isinstance(review.get('timestamp'), str):
-                                    from dateutil.parser import parse
-                                    try:
-                                        review['timestamp'] = parse(review['timestamp'])
-                                    except:
-                                        pass
-                                # Filter by movie_id if specified
-                                if movie_id is None or str(review.get('movie_id')) == str(movie_id):
-                                    all_reviews.append(review)
-                            except json.JSONDecodeError:
-                                continue
-                print(f"✓ Loaded {len(all_reviews) - len(mongo_reviews)} additional reviews from local backup")
-        except Exception as e:
-            print(f"⚠ Could not load from local backup: {e}")
+        mongo_cursor = []
+        if self.connected:
+            try:
+                mongo_cursor = self.reviews.find(query).sort('timestamp', -1).limit(limit).batch_size(min(limit, 200))
+            except Exception as e:
+                print(f"⚠ Error getting reviews from MongoDB: {e}")
         
-        # Sort by timestamp descending and limit
-        try:
-            all_reviews.sort(key=lambda x: x.get('timestamp', datetime.min), reverse=True)
-        except:
-            pass
+        # Reviews still waiting in the write-behind buffer (read-your-writes)
+        pending = [
+            review for review in _review_buffer.pending()
+            if not movie_id or str(review.get('movie_id')) == str(movie_id)
+        ]
+        pending.sort(key=_review_sort_key, reverse=True)
         
-        return all_reviews[:limit]
+        sources = [
+            pending,
+            _guarded_stream(mongo_cursor, "MongoDB"),
+            _guarded_stream(_local_log.iter_reviews(movie_id=movie_id), "local review log"),
+        ]
+        merged = heapq.merge(*sources, key=_review_sort_key, reverse=True)
+        if pending:
+            # A review can be in MongoDB and still pending while its batch is confirmed
+            merged = _unique_reviews(merged)
+        return islice(merged, limit)
     
-    def get_review_statistics(self):
-        """Get aggregated statistics about reviews from MongoDB and local backup"""
-        stats = {
-            'total_reviews': 0,
-            'avg_rating': 0,
-            'avg_sentiment': 0,
-            'positive_count': 0,
-            'negative_count': 0,
-            'active_participants': 0
-        }
-        
+    def local_reviews_version(self):
+        """Cheap token that changes whenever iter_local_reviews() would yield something different"""
+        pending = _review_buffer.pending()
+        return len(pending), str(pending[-1].get('_id')) if pending else None, _local_log.count()
+    
+    def iter_local_reviews(self):
+        """Yield reviews that are not in MongoDB: pending write-behind reviews, then the local log"""
+        yield from _review_buffer.pending()
+        yield from _local_log.iter_reviews(newest_first=False)
+    
+    def _record_review_stats(self, reviews):
+        """Fold a batch of saved reviews into the running statistics document
+
+        Only a complete document (every counter present) is updated. When it is
+        missing or predates a counter, the batch is left to the rebuild on the
+        next statistics read, which recounts audience_reviews - an upsert here
+        would create a batch-only document that looks complete and hide older
+        reviews for good.
+        """
         try:
-            # Try MongoDB first
-            pipeline = [
-                {
-                    '$group': {
-                        '_id': None,
-                        'total_reviews': {'$sum': 1},
-                        'avg_rating': {'$avg': '$rating'},
-                        'avg_sentiment': {'$avg': '$sentiment_score'},
-                        'positive_count': {
-                            '$sum': {
-                                '$cond': [{'$gt': ['$sentiment_score', 0.5]}, 1, 0]
-                            }
-                        },
-                        'negative_count': {
-                            '$sum': {
-                                '$cond': [{'$lt': ['$sentiment_score', 0.5]}, 1, 0]
-                            }
+            batch = ReviewStats()
+            for review in reviews:
+                batch.add(review)
+            complete = {'_id': 'global', **{name: {'$exists': True} for name in ReviewStats.COUNTERS}}
+            result = self.review_stats.update_one(
+                complete,
+                {'$inc': {name: getattr(batch, name) for name in ReviewStats.COUNTERS}}
+            )
+            if not result.matched_count:
+                _stats_cache.invalidate()
+                return
+            if batch.participants:
+                first_seen = {}
+                for review in reviews:
+                    first_seen.setdefault(review.get('session_id'), review.get('timestamp', datetime.now()))
+                result = self.review_participants.bulk_write([
+                    UpdateOne({'_id': session_id}, {'$setOnInsert': {'first_seen': first_seen[session_id]}}, upsert=True)
+                    for session_id in batch.participants
+                ], ordered=False)
+                if result.upserted_count:
+                    self.review_stats.update_one(complete, {'$inc': {'participants': result.upserted_count}})
+            _stats_cache.invalidate()
+        except Exception as e:
+            print(f"⚠ Could not update review statistics: {e}")
+
+    def rebuild_review_statistics(self):
+        """Recompute the statistics document from scratch (first run or repair)"""
+        pipeline = [
+            {
+                '$group': {
+                    '_id': None,
+                    'total_reviews': {'$sum': 1},
+                    'rating_sum': {'$sum': {'$cond': [{'$isNumber': '$rating'}, '$rating', 0]}},
+                    'rating_count': {'$sum': {'$cond': [{'$isNumber': '$rating'}, 1, 0]}},
+                    'sentiment_sum': {'$sum': {'$cond': [{'$isNumber': '$sentiment_score'}, '$sentiment_score', 0]}},
+                    'sentiment_count': {'$sum': {'$cond': [{'$isNumber': '$sentiment_score'}, 1, 0]}},
+                    'positive_count': {
+                        '$sum': {
+                            '$cond': [{'$gt': ['$sentiment_score', 0.5]}, 1, 0]
+                        }
+                    },
+                    'negative_count': {
+                        '$sum': {
+                            '$cond': [{'$and': [{'$isNumber': '$sentiment_score'}, {'$lt': ['$sentiment_score', 0.5]}]}, 1, 0]
                         }
+                    },
+                    'positive_label_count': {
+                        '$sum': {'$cond': [{'$eq': ['$sentiment_label', 'Positive']}, 1, 0]}
                     }
                 }
-            ]
-            
-            result = list(self.reviews.aggregate(pipeline))
-            mongo_stats = result[0] if result else {}
-            
-            if mongo_stats:
-                stats.update(mongo_stats)
-                try:
-                    # Distinct session identifiers for active participant count
-                    active_ids = self.reviews.distinct('session_id')
-                    stats['active_participants'] = len([i for i in active_ids if i])
-                except Exception as e:
-                    print(f"Warning computing active participants: {e}")
-                    
+            }
+        ]
+        result = list(self.reviews.aggregate(pipeline))
+        counters = {name: 0 for name in ReviewStats.COUNTERS}
+        if result:
+            counters.update({k: v for k, v in result[0].items() if k in counters})
+
+        # Distinct sessions -> participants collection
+        self.review_participants.delete_many({})
+        self.reviews.aggregate([
+            {'$match': {'session_id': {'$nin': [None, '']}}},
+            {'$group': {'_id': '$session_id'}},
+            {'$merge': {'into': AppConfig.REVIEW_PARTICIPANTS_COLLECTION, 'whenMatched': 'keepExisting'}}
+        ])
+        counters['participants'] = self.review_participants.estimated_document_count()
+
+        self.review_stats.replace_one({'_id': 'global'}, {'_id': 'global', **counters}, upsert=True)
+        _stats_cache.invalidate()
+        print(f"✓ Review statistics rebuilt ({counters['total_reviews']} reviews)")
+        return counters
+
+    def get_review_statistics(self):
+        """Get aggregated statistics about reviews from MongoDB and local backup
+
+        Reads the running-totals document maintained by the review flushes plus
+        reviews still in the write-behind buffer and the local log's checkpoint -
+        no scans. Results are cached briefly since one page render asks several
+        times.
+        """
+        cached = _stats_cache.get('review_statistics')
+        if cached is not None:
+            return dict(cached)
+
+        stats = ReviewStats()
+        participants = 0
+        connected = self.connected
+        if connected:
+            try:
+                doc = self.review_stats.find_one({'_id': 'global'})
+                if doc is None or not ReviewStats.is_complete(doc):
+                    doc = self.rebuild_review_statistics()
+                stats.merge(ReviewStats.from_dict({k: doc.get(k, 0) for k in ReviewStats.COUNTERS}))
+                participants = doc.get('participants', 0)
+            except Exception as e:
+                print(f"⚠ Error getting MongoDB statistics: {e}")
+        
+        # Reviews accepted but not yet flushed by the write-behind buffer
+        try:
+            pending = ReviewStats()
+            for review in _review_buffer.pending():
+                pending.add(review)
+            if pending.total_reviews:
+                stats.merge(pending)
+                known = 0
+                if connected:
+                    known = self.review_participants.count_documents({'_id': {'$in': list(pending.participants)}})
+                participants += len(pending.participants) - known
         except Exception as e:
-            print(f"⚠ Error getting MongoDB statistics: {e}")
+            print(f"⚠ Could not include pending reviews in statistics: {e}")
         
-        # Also count reviews from local backup
+        # Reviews that only exist in the local log (checkpointed aggregates)
         try:
-            from pathlib import Path
-            import json
-            backup_path = Path(__file__).parent.parent / 'local_reviews_backup.jsonl'
-            if backup_path.exists():
-                local_reviews = []
-                with open(backup_path, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        if line.strip():
-                            try:
-                                review = json.loads(line)
-                                local_reviews.append(review)
-                            except:
-                                continue
-                
-                if local_reviews:
-                    # Add to totals
-                    stats['total_reviews'] += len(local_reviews)
-                    
-                    # Recalculate averages
-                    all_ratings = [r.get('rating', 0) for r in local_reviews if r.get('rating')]
-                    all_sentiments = [r.get('sentiment_score', 0.5) for r in local_reviews if r.get('sentiment_score')]
-                    
-                    if all_ratings:
-                        stats['avg_rating'] = (stats.get('avg_rating', 0) * (stats['total_reviews'] - len(local_reviews)) + sum(all_ratings)) / stats['total_reviews']
-                    if all_sentiments:
-                        stats['avg_sentiment'] = (stats.get('avg_sentiment', 0) * (stats['total_reviews'] - len(local_reviews)) + sum(all_sentiments)) / stats['total_reviews']
-                    
-                    # Count positive/negative
-                    stats['positive_count'] += sum(1 for r in local_reviews if r.get('sentiment_score', 0.5) > 0.5)
-                    stats['negative_count'] += sum(1 for r in local_reviews if r.get('sentiment_score', 0.5) < 0.5)
-                    
-                    # Count unique sessions
-                    local_sessions = set(r.get('session_id') for r in local_reviews if r.get('session_id'))
-                    stats['active_participants'] += len(local_sessions)
-                    
-                    print(f"✓ Added {len(local_reviews)} local backup reviews to statistics")
+            local = _local_log.stats()
+            stats.merge(local)
+            participants += len(local.participants)
         except Exception as e:
             print(f"⚠ Could not include local backup in statistics: {e}")
         
-        return stats if stats['total_reviews'] > 0 else None
+        summary = stats.summary(participant_count=participants)
+        result = summary if summary['total_reviews'] > 0 else None
+        if result is not None:
+            _stats_cache.set('review_statistics', result)
+        return dict(result) if result else None
+    
+    def _record_trending(self, reviews):
+        """Add a batch of saved reviews to their hourly per-movie trending buckets"""
+        buckets = {}
+        for review in reviews:
+            timestamp = review.get('timestamp')
+            if not isinstance(timestamp, datetime) or not review.get('movie_id'):
+                continue
+            hour = timestamp.replace(minute=0, second=0, microsecond=0)
+            key = (str(review['movie_id']), hour)
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = {'title': review.get('movie_title'), 'stats': ReviewStats()}
+            bucket['stats'].add(review)
+        if not buckets:
+            return
+        try:
+            self.review_trending.bulk_write([
+                UpdateOne(
+                    {'_id': {'movie_id': movie_id, 'bucket': hour}},
+                    {
+                        '$setOnInsert': {'movie_id': movie_id, 'bucket': hour},
+                        '$set': {'movie_title': bucket['title']},
+                        '$inc': {
+                            'review_count': bucket['stats'].total_reviews,
+                            'rating_sum': bucket['stats'].rating_sum,
+                            'rating_count': bucket['stats'].rating_count,
+                            'sentiment_sum': bucket['stats'].sentiment_sum,
+                            'sentiment_count': bucket['stats'].sentiment_count,
+                        }
+                    },
+                    upsert=True
+                )
+                for (movie_id, hour), bucket in buckets.items()
+            ], ordered=False)
+        except Exception as e:
+            print(f"⚠ Could not update trending buckets: {e}")
+    
+    def rebuild_trending(self):
+        """Recompute the hourly trending buckets from the reviews in the retention window"""
+        from datetime import timedelta
+        cutoff = datetime.now() - timedelta(days=AppConfig.TRENDING_RETENTION_DAYS)
+        self.review_trending.delete_many({})
+        self.reviews.aggregate([
+            {'$match': {'timestamp': {'$gte': cutoff}, 'movie_id': {'$nin': [None, '']}}},
+            {'$group': {
+                '_id': {
+                    'movie_id': {'$toString': '$movie_id'},
+                    'bucket': {'$dateTrunc': {'date': '$timestamp', 'unit': 'hour'}}
+                },
+                'movie_title': {'$last': '$movie_title'},
+                'review_count': {'$sum': 1},
+                'rating_sum': {'$sum': {'$cond': [{'$isNumber': '$rating'}, '$rating', 0]}},
+                'rating_count': {'$sum': {'$cond': [{'$isNumber': '$rating'}, 1, 0]}},
+                'sentiment_sum': {'$sum': {'$cond': [{'$isNumber': '$sentiment_score'}, '$sentiment_score', 0]}},
+                'sentiment_count': {'$sum': {'$cond': [{'$isNumber': '$sentiment_score'}, 1, 0]}}
+            }},
+            {'$set': {'movie_id': '$_id.movie_id', 'bucket': '$_id.bucket'}},
+            {'$merge': {'into': AppConfig.REVIEW_TRENDING_COLLECTION, 'whenMatched': 'replace'}}
+        ])
+        self.materialized_meta.update_one(
+            {'_id': AppConfig.REVIEW_TRENDING_COLLECTION},
+            {'$set': {'refreshed_at': datetime.now()}},
+            upsert=True
+        )
+        print("✓ review_trending rebuilt")
     
     def get_trending_movies(self, days=7):
-        """Get movies with most recent reviews"""
+        """
+        Get movies with most recent reviews
+        
+        Reads only the hourly buckets inside the window from the materialized
+        review_trending collection, which save_review keeps current.
+        """
+        if not self.connected:
+            return []
         try:
             from datetime import timedelta
+            if self.materialized_meta.find_one({'_id': AppConfig.REVIEW_TRENDING_COLLECTION}) is None:
+                self.rebuild_trending()
+            
             cutoff_date = datetime.now() - timedelta(days=days)
+            cutoff_bucket = cutoff_date.replace(minute=0, second=0, microsecond=0)
             
             pipeline = [
                 {
                     '$match': {
-                        'timestamp': {'$gte': cutoff_date}
+                        'bucket': {'$gte': cutoff_bucket}
                     }
                 },
                 {
                     '$group': {
                         '_id': '$movie_id',
-                        'movie_title': {'$first': '$movie_title'},
-                        'review_count': {'$sum': 1},
-                        'avg_rating': {'$avg': '$rating'},
-                        'avg_sentiment': {'$avg': '$sentiment_score'}
+                        'movie_title': {'$last': '$movie_title'},
+                        'review_count': {'$sum': '$review_count'},
+                        'rating_sum': {'$sum': '$rating_sum'},
+                        'rating_count': {'$sum': '$rating_count'},
+                        'sentiment_sum': {'$sum': '$sentiment_sum'},
+                        'sentiment_count': {'$sum': '$sentiment_count'}
                     }
                 },
                 {
@@ -542,10 +1225,22 @@ class DatabaseManager:
                 },
                 {
                     '$limit': 10
+                },
+                {
+                    '$project': {
+                        'movie_title': 1,
+                        'review_count': 1,
+                        'avg_rating': {
+                            '$cond': [{'$gt': ['$rating_count', 0]}, {'$divide': ['$rating_sum', '$rating_count']}, None]
+                        },
+                        'avg_sentiment': {
+                            '$cond': [{'$gt': ['$sentiment_count', 0]}, {'$divide': ['$sentiment_sum', '$sentiment_count']}, None]
+                        }
+                    }
                 }
             ]
             
-            return list(self.reviews.aggregate(pipeline))
+            return list(self.review_trending.aggregate(pipeline))
             
         except Exception as e:
             print(f"Error getting trending movies: {e}")
@@ -560,36 +1255,40 @@ class DatabaseManager:
         """
         total_deleted = 0
         
+        # Drop reviews still waiting to be flushed (waits for an in-flight batch)
+        try:
+            total_deleted += _review_buffer.clear()
+        except Exception as e:
+            print(f"⚠ Error clearing pending reviews: {e}")
+        
         # Delete from MongoDB
         try:
+            if not self.connected:
+                raise ConnectionError("MongoDB is unreachable")
             result = self.reviews.delete_many({})
             mongo_deleted = result.deleted_count
+            self.review_stats.delete_many({})
+            self.review_participants.delete_many({})
+            self.review_trending.delete_many({})
             total_deleted += mongo_deleted
             print(f"✓ Deleted {mongo_deleted} reviews from MongoDB")
         except Exception as e:
             print(f"⚠ Error clearing MongoDB reviews: {e}")
         
-        # Also delete local backup file if it exists
+        # Also delete the local review log
         try:
-            from pathlib import Path
-            backup_path = Path(__file__).parent.parent / 'local_reviews_backup.jsonl'
-            if backup_path.exists():
-                # Count lines before deleting
-                with open(backup_path, 'r', encoding='utf-8') as f:
-                    local_count = sum(1 for line in f if line.strip())
-                
-                # Delete the file
-                backup_path.unlink()
-                total_deleted += local_count
-                print(f"✓ Deleted {local_count} reviews from local backup file")
-            else:
-                print("ℹ No local backup file to delete")
+            local_count = _local_log.clear()
+            for path in (LOCAL_BACKUP_PATH, LOCAL_BACKUP_PATH.with_name(LOCAL_BACKUP_PATH.name + '.migrated')):
+                if path.exists():
+                    path.unlink()
+            total_deleted += local_count
+            print(f"✓ Deleted {local_count} reviews from local review log")
         except Exception as e:
-            print(f"⚠ Error clearing local backup: {e}")
+            print(f"⚠ Error clearing local review log: {e}")
         
+        _stats_cache.invalidate()
         return total_deleted
     
     def close(self):
-        """Close database connection"""
-        if self.client:
-            self.client.close()
+        """Release this manager; the shared client stays open for other sessions"""
+        self.client = None
@@ -0,0 +1,143 @@
+"""
+Shared HTTP client for outgoing poster traffic
+
+Poster lookups and image downloads go through one process-wide
+`requests.Session` from get_http_session():
+
+- Keep-alive connection pools per host, sized for the poster worker pool.
+- Transient failures (connection errors, 429, 5xx) are retried with
+  exponential backoff plus jitter, honouring Retry-After.
+- A CircuitBreaker per upstream (OMDb) stops calling a service that keeps
+  failing and lets a single probe through after a cool-down.
+"""
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of calling an upstream whose circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures; after
+    `reset_timeout` seconds one trial call is allowed (half-open) and its
+    outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return 'closed'
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return 'half-open'
+            return 'open'
+
+    def allow(self):
+        """True if a call may go out now"""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self._opened_at is not None:
+                print(f"✓ {self.name} reachable again, circuit closed")
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    print(f"⚠ {self.name} failing, pausing calls for {self.reset_timeout:.0f}s")
+                self._opened_at = time.monotonic()
+            self._trial_running = False
+
+    def call(self, func, *args, is_failure=None, **kwargs):
+        """
+        Run `func` through the breaker
+
+        Exceptions count as failures; so do results for which
+        `is_failure(result)` is true (e.g. HTTP 5xx responses).
+        """
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} circuit open")
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        if is_failure is not None and is_failure(result):
+            self.record_failure()
+        else:
+            self.record_success()
+        return result
+
+
+def build_session(pool_size=8, retries=2, backoff_factor=0.3, backoff_jitter=0.2):
+    """requests.Session with keep-alive pools and a jittered retry policy for GET/HEAD"""
+    retry_options = dict(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        backoff_factor=backoff_factor,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    try:
+        retry = Retry(backoff_jitter=backoff_jitter, **retry_options)
+    except TypeError:  # urllib3 < 2 has no jitter option
+        retry = Retry(**retry_options)
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+_session = None
+_breakers = {}
+_lock = threading.Lock()
+
+
+def get_http_session(pool_size=8, retries=2, backoff_factor=0.3, backoff_jitter=0.2):
+    """Return the process-wide session, creating it on first use"""
+    global _session
+    with _lock:
+        if _session is None:
+            _session = build_session(pool_size, retries, backoff_factor, backoff_jitter)
+        return _session
+
+
+def get_circuit_breaker(name, failure_threshold=5, reset_timeout=30.0):
+    """Return the process-wide breaker called `name`, creating it on first use"""
+    with _lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name, failure_threshold, reset_timeout)
+        return breaker
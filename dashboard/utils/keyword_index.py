@@ -0,0 +1,212 @@
+"""
+Trigram inverted index for catalog keyword search
+
+Indexes the lowercased `title`, `plot`, `cast` and `directors` of every movie:
+
+- Built once per process from a streamed projection of the movies collection
+  and refreshed incrementally (documents with `_id` greater than the last seen).
+- A term of 3+ characters is resolved by intersecting the posting lists of its
+  trigrams (smallest first), then verified with a substring check against the
+  requested fields. Shorter terms fall back to a scan of the stored text.
+- Multi-term queries combine per-term matches with AND or OR.
+
+The result is a list of `_id`s that callers fetch from MongoDB with `$in`.
+"""
+from array import array
+import threading
+import time
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+try:
+    from config import AppConfig
+except ImportError:
+    import importlib.util
+    config_path = Path(__file__).parent.parent / 'config.py'
+    spec = importlib.util.spec_from_file_location("config", config_path)
+    config_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(config_module)
+    AppConfig = config_module.AppConfig
+
+
+def trigrams(text):
+    """Set of overlapping 3-character substrings of `text`"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """Substring index over the catalog's searchable text fields"""
+
+    FIELDS = ('title', 'plot', 'cast', 'directors')
+    PROJECTION = {field: 1 for field in FIELDS}
+
+    def __init__(self, collection=None, refresh_interval=None):
+        self.collection = collection
+        self.refresh_interval = refresh_interval or AppConfig.KEYWORD_INDEX_REFRESH_SECONDS
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._refreshing = False
+        self._built = False
+        self._last_refresh = 0.0
+        self._max_id = None
+
+        self._ids = []
+        self._texts = {field: [] for field in self.FIELDS}
+        self._postings = {}  # trigram -> array of document ordinals (ascending)
+
+    def __len__(self):
+        return len(self._ids)
+
+    # ------------------------------------------------------------------ build
+    def add_documents(self, documents):
+        """Index an iterable of movie documents (ordinals are assigned in order)"""
+        added = 0
+        for doc in documents:
+            texts = {field: self._normalize(doc.get(field)) for field in self.FIELDS}
+            grams = set()
+            for text in texts.values():
+                grams |= trigrams(text)
+
+            with self._lock:
+                ordinal = len(self._ids)
+                self._ids.append(doc['_id'])
+                for field, text in texts.items():
+                    self._texts[field].append(text)
+                for gram in grams:
+                    posting = self._postings.get(gram)
+                    if posting is None:
+                        posting = self._postings[gram] = array('I')
+                    posting.append(ordinal)
+            self._max_id = doc['_id']
+            added += 1
+        self._last_refresh = time.time()
+        return added
+
+    @staticmethod
+    def _normalize(value):
+        if value is None:
+            return ''
+        if isinstance(value, list):
+            # One entry per line so a term never matches across two names
+            return '\n'.join(str(v) for v in value if v).lower()
+        return str(value).lower()
+
+    def ensure_built(self):
+        """Build the index synchronously on first use"""
+        if self._built:
+            return
+        with self._build_lock:
+            if not self._built:
+                count = self._stream({})
+                self._built = True
+                print(f"✓ Keyword index built over {count} movies ({len(self._postings)} trigrams)")
+
+    def refresh(self):
+        """Index movies inserted since the last build (incremental, keyed on _id)"""
+        with self._build_lock:
+            filter_query = {} if self._max_id is None else {'_id': {'$gt': self._max_id}}
+            self._stream(filter_query)
+
+    def refresh_if_stale(self):
+        """Kick off a background incremental refresh when the interval has elapsed"""
+        if self.collection is None or time.time() - self._last_refresh < self.refresh_interval:
+            return
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def _run():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Keyword index refresh warning: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=_run, name="keyword-index-refresh", daemon=True).start()
+
+    def _stream(self, filter_query):
+        cursor = self.collection.find(filter_query, self.PROJECTION).sort('_id', 1).batch_size(1000)
+        return self.add_documents(cursor)
+
+    # ----------------------------------------------------------------- search
+    def search(self, query, mode='and', fields=None):
+        """
+        Return `_id`s of documents matching the query's whitespace-separated terms
+
+        Args:
+            query: Search text; each word is matched as a case-insensitive substring
+            mode: 'and' (every term must match) or 'or' (any term)
+            fields: Fields a term may match in (default: all indexed fields)
+        """
+        return self.search_terms(query.split(), mode=mode, fields=fields)
+
+    def search_terms(self, terms, mode='and', fields=None):
+        """Like search(), with explicit terms (a term may contain spaces)"""
+        if self.collection is not None:
+            self.ensure_built()
+            self.refresh_if_stale()
+
+        terms = [t.lower() for t in terms if t and t.strip()]
+        if not terms:
+            return []
+        fields = tuple(fields) if fields else self.FIELDS
+
+        with self._lock:
+            count = len(self._ids)
+            texts = [self._texts[field] for field in fields]
+            result = None
+            for term in terms:
+                matched = self._match_term(term, texts, count)
+                if result is None:
+                    result = matched
+                elif mode == 'or':
+                    result |= matched
+                else:
+                    result &= matched
+                    if not result:
+                        break
+            return [self._ids[i] for i in sorted(result)]
+
+    def _match_term(self, term, texts, count):
+        grams = trigrams(term)
+        if grams:
+            postings = []
+            for gram in grams:
+                posting = self._postings.get(gram)
+                if posting is None:
+                    return set()
+                postings.append(posting)
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                candidates.intersection_update(posting)
+                if not candidates:
+                    return candidates
+        else:
+            candidates = range(count)
+
+        # Trigram hits are a superset: confirm the substring in a requested field
+        return {
+            i for i in candidates
+            if any(term in field_texts[i] for field_texts in texts)
+        }
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_keyword_index(collection):
+    """Return the process-wide TrigramIndex for a movies collection"""
+    key = collection.full_name
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = TrigramIndex(collection)
+            _indexes[key] = index
+        return index
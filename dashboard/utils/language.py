@@ -3,18 +3,22 @@
 This module provides:
 - detect_language(text): returns ISO 639-1 code (e.g., 'en', 'es').
 - translate_to_english(text, source_lang): translates text to English if source_lang != 'en'.
+- translate_text(text, source_lang, profile): same, returning a dict that records the decoding profile.
 
 Implementation details:
 - Language detection with langdetect (fast, lightweight).
 - Translation via Hugging Face transformers models (Helsinki-NLP opus-mt-* to English).
   Models are loaded lazily and cached in MEMORY.
 - Fallback: if language unsupported or translation fails, returns original text.
+- Decoding profiles: 'realtime' (greedy, output budget scaled to the input length)
+  for interactive reviews, 'quality' (beam search, full 512-token budget) for
+  offline backfills. Sentiment only needs a near-literal translation.
 
 Supported language models mapping kept deliberately small for demo performance.
 Extend LANGUAGE_MODEL_MAP as needed.
 """
 from functools import lru_cache
-from typing import Tuple, Optional
+from typing import Any, Dict, Tuple, Optional
 
 def detect_language(text: str) -> str:
     """Detect language with multiple attempts for reliability.
@@ -108,20 +112,74 @@ LANGUAGE_MODEL_MAP = {
 # Fallback: Use multilingual model for unsupported languages
 MULTILINGUAL_MODEL = 'Helsinki-NLP/opus-mt-mul-en'
 
+# Generation settings per decoding profile.
+# realtime: greedy decoding, max_new_tokens derived from the input token count
+# quality: small beam search over the full 512-token budget (offline backfills)
+DECODING_PROFILES = {
+    'realtime': {
+        'num_beams': 1,
+        'do_sample': False,
+        'length_ratio': 1.5,   # output tokens allowed per input token
+        'length_margin': 16,   # extra tokens for short inputs
+        'max_new_tokens': 512,  # hard cap
+    },
+    'quality': {
+        'num_beams': 4,
+        'do_sample': False,
+        'max_length': 512,
+    },
+}
+
+def _default_profile() -> str:
+    try:
+        from config import AppConfig
+        return AppConfig.TRANSLATION_PROFILE
+    except Exception:
+        return 'realtime'
+
 @lru_cache(maxsize=20)
 def _get_pipeline(model_name: str):
     """Load and cache translation pipeline."""
     from transformers import pipeline
     return pipeline('translation', model=model_name, device=-1)  # CPU
 
-def translate_to_english(text: str, source_lang: str) -> Tuple[str, bool, Optional[str]]:
-    """Translate text to English with fallback to multilingual model.
+def _generation_kwargs(pipe, text: str, profile: str) -> dict:
+    """Build generate() keyword arguments for the given decoding profile."""
+    settings = DECODING_PROFILES[profile]
+    kwargs = {
+        'num_beams': settings['num_beams'],
+        'do_sample': settings['do_sample'],
+        'truncation': True,
+    }
+    if 'length_ratio' in settings:
+        input_tokens = len(pipe.tokenizer(text, truncation=True, max_length=512)['input_ids'])
+        kwargs['max_new_tokens'] = min(
+            settings['max_new_tokens'],
+            int(input_tokens * settings['length_ratio']) + settings['length_margin']
+        )
+    else:
+        kwargs['max_length'] = settings['max_length']
+    return kwargs
 
-    Returns (translated_text, translated_flag, used_model_name)
+def _run_translation(model_name: str, text: str, profile: str) -> str:
+    pipe = _get_pipeline(model_name)
+    result = pipe(text, **_generation_kwargs(pipe, text, profile))
+    return result[0]['translation_text']
+
+def translate_text(text: str, source_lang: str, profile: Optional[str] = None) -> Dict[str, Any]:
+    """Translate text to English using a decoding profile.
+
+    Returns dict with keys: text, translated, model, profile
+    (profile is None when no translation was attempted).
     """
     if source_lang == 'en':
-        return text, False, None
-    
+        return {'text': text, 'translated': False, 'model': None, 'profile': None}
+
+    profile = profile or _default_profile()
+    if profile not in DECODING_PROFILES:
+        print(f"Unknown decoding profile '{profile}', using 'realtime'")
+        profile = 'realtime'
+
     # Try language-specific model first
     model_name = LANGUAGE_MODEL_MAP.get(source_lang)
     
@@ -131,24 +189,28 @@ def translate_to_english(text: str, source_lang: str) -> Tuple[str, bool, Option
         print(f"Using multilingual model for unsupported language: {source_lang}")
     
     try:
-        pipe = _get_pipeline(model_name)
-        result = pipe(text, max_length=512)
-        translated = result[0]['translation_text']
-        return translated, True, model_name
+        translated = _run_translation(model_name, text, profile)
+        return {'text': translated, 'translated': True, 'model': model_name, 'profile': profile}
     except Exception as e:
         # If language-specific model failed, try multilingual as last resort
         if model_name != MULTILINGUAL_MODEL:
             try:
                 print(f"Fallback to multilingual model for '{source_lang}'")
-                pipe = _get_pipeline(MULTILINGUAL_MODEL)
-                result = pipe(text, max_length=512)
-                translated = result[0]['translation_text']
-                return translated, True, MULTILINGUAL_MODEL
+                translated = _run_translation(MULTILINGUAL_MODEL, text, profile)
+                return {'text': translated, 'translated': True, 'model': MULTILINGUAL_MODEL, 'profile': profile}
             except Exception as e2:
                 print(f"Multilingual translation also failed: {str(e2)[:100]}")
         
         # All translation attempts failed; return original text
         print(f"Translation error for '{source_lang}': {str(e)[:100]}")
-        return text, False, None
+        return {'text': text, 'translated': False, 'model': None, 'profile': profile}
+
+def translate_to_english(text: str, source_lang: str, profile: Optional[str] = None) -> Tuple[str, bool, Optional[str]]:
+    """Translate text to English with fallback to multilingual model.
+
+    Returns (translated_text, translated_flag, used_model_name)
+    """
+    result = translate_text(text, source_lang, profile)
+    return result['text'], result['translated'], result['model']
 
-__all__ = ['detect_language', 'translate_to_english']
+__all__ = ['detect_language', 'translate_to_english', 'translate_text', 'DECODING_PROFILES']
@@ -0,0 +1,145 @@
+"""
+Process-wide MongoDB client
+
+Every DatabaseManager (one per browser session) shares the client returned by
+get_mongo_client():
+
+- Pool size, timeouts, wire compression and read preference come from AppConfig.
+- The client is created with connect=False; sockets are opened on first use.
+- A background task pings the cluster every MONGO_HEALTH_CHECK_SECONDS and
+  publishes the result through is_healthy(), so sessions never block on it
+  (only the very first check in a process is synchronous).
+- Work that needs a reachable cluster registers with on_healthy(); it runs
+  right away when the cluster is up, and again whenever a health check sees
+  it come back (e.g. Atlas was down when the process started).
+"""
+import threading
+import time
+import sys
+from pathlib import Path
+
+from pymongo import MongoClient
+from pymongo.server_api import ServerApi
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+try:
+    from config import AppConfig
+except ImportError:
+    import importlib.util
+    config_path = Path(__file__).parent.parent / 'config.py'
+    spec = importlib.util.spec_from_file_location("config", config_path)
+    config_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(config_module)
+    AppConfig = config_module.AppConfig
+
+from utils.background import start_periodic_task
+
+_client = None
+_client_lock = threading.Lock()
+
+_health = {'healthy': False, 'checked_at': None, 'error': None}
+_health_lock = threading.Lock()
+_healthy_callbacks = {}  # name -> callback, run on every unhealthy -> healthy transition
+
+
+def client_options():
+    """MongoClient keyword arguments built from AppConfig"""
+    options = {
+        'server_api': ServerApi('1'),
+        'connect': False,
+        'maxPoolSize': AppConfig.MONGO_MAX_POOL_SIZE,
+        'minPoolSize': AppConfig.MONGO_MIN_POOL_SIZE,
+        'maxIdleTimeMS': AppConfig.MONGO_MAX_IDLE_TIME_MS,
+        'serverSelectionTimeoutMS': AppConfig.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        'connectTimeoutMS': AppConfig.MONGO_CONNECT_TIMEOUT_MS,
+        'socketTimeoutMS': AppConfig.MONGO_SOCKET_TIMEOUT_MS,
+        'readPreference': AppConfig.MONGO_READ_PREFERENCE,
+        'retryWrites': True,
+        'retryReads': True,
+        'appname': AppConfig.APP_NAME,
+    }
+    if AppConfig.MONGO_COMPRESSORS:
+        options['compressors'] = AppConfig.MONGO_COMPRESSORS
+    return options
+
+
+def get_mongo_client():
+    """Return the shared MongoClient, creating it (without connecting) on first use"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = MongoClient(AppConfig.MONGODB_URI, **client_options())
+            # First check runs inline so the first session knows where it stands
+            check_health()
+            start_periodic_task(
+                'mongo-health',
+                AppConfig.MONGO_HEALTH_CHECK_SECONDS,
+                check_health,
+                run_immediately=False
+            )
+        return _client
+
+
+def check_health():
+    """Ping the cluster and record the result; returns True when reachable"""
+    client = _client
+    if client is None:
+        return False
+    try:
+        client.admin.command('ping')
+        healthy, error = True, None
+    except Exception as e:
+        healthy, error = False, str(e)
+    with _health_lock:
+        recovered = healthy and not _health['healthy']
+        if healthy != _health['healthy']:
+            print("✓ MongoDB reachable" if healthy else f"⚠ MongoDB unreachable: {error}")
+        _health.update(healthy=healthy, checked_at=time.time(), error=error)
+        callbacks = list(_healthy_callbacks.items()) if recovered else []
+    for name, callback in callbacks:
+        _run_callback(name, callback)
+    return healthy
+
+
+def on_healthy(name, callback):
+    """
+    Run `callback` whenever the cluster becomes reachable
+
+    Registered by name (a later registration replaces an earlier one), and
+    run immediately if the cluster is reachable right now.
+    """
+    with _health_lock:
+        _healthy_callbacks[name] = callback
+        healthy = _health['healthy']
+    if healthy:
+        _run_callback(name, callback)
+
+
+def _run_callback(name, callback):
+    try:
+        callback()
+    except Exception as e:
+        print(f"⚠ MongoDB '{name}' hook failed: {e}")
+
+
+def is_healthy():
+    """Result of the latest background health check"""
+    with _health_lock:
+        return _health['healthy']
+
+
+def health_status():
+    with _health_lock:
+        return dict(_health)
+
+
+def close_mongo_client():
+    """Close the shared client (process shutdown only - sessions must not call this)"""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+        with _health_lock:
+            _health.update(healthy=False, checked_at=time.time(), error='closed')
@@ -1,8 +1,10 @@
 """
 Movie catalog and search utilities
 """
-import requests
+from concurrent.futures import ThreadPoolExecutor, wait
 from typing import List, Dict
+import threading
+import time
 import sys
 from pathlib import Path
 
@@ -18,13 +20,98 @@ except ImportError:
     spec.loader.exec_module(config_module)
     AppConfig = config_module.AppConfig
 
+from utils.http_client import get_circuit_breaker, get_http_session
+from utils.poster_cache import get_poster_cache, poster_key
+from utils.prefetch import PagePrefetcher
+from utils.thumbnails import get_thumbnail_cache
+
+
+class _TokenBucket:
+    """Process-wide rate limit: at most `rate` acquisitions per second (bursts up to `capacity`)"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout=None):
+        """Block until a token is available; False if `timeout` seconds pass first"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait_for = (1 - self._tokens) / self.rate
+            if deadline is not None and time.monotonic() + wait_for > deadline:
+                return False
+            time.sleep(wait_for)
+
+
+# Shared by every session: one keep-alive pool per host (OMDb, the poster CDN),
+# one worker pool and one rate limit for all outgoing poster lookups
+_http = get_http_session(
+    pool_size=AppConfig.POSTER_WORKERS,
+    retries=AppConfig.HTTP_RETRIES,
+    backoff_factor=AppConfig.HTTP_BACKOFF_FACTOR,
+    backoff_jitter=AppConfig.HTTP_BACKOFF_JITTER
+)
+_omdb_breaker = get_circuit_breaker(
+    'OMDb',
+    failure_threshold=AppConfig.OMDB_BREAKER_FAILURES,
+    reset_timeout=AppConfig.OMDB_BREAKER_RESET_SECONDS
+)
+_poster_pool = ThreadPoolExecutor(max_workers=AppConfig.POSTER_WORKERS, thread_name_prefix='poster')
+_poster_rate = _TokenBucket(AppConfig.POSTER_RATE_LIMIT)
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+
+def _catalog_poster(movie):
+    """The movie document's `poster` field when it looks like an image URL"""
+    poster = movie.get('poster')
+    if isinstance(poster, str) and poster.startswith(('http://', 'https://')):
+        return poster
+    return None
+
+
 class MovieCatalog:
     """Handle movie search and poster retrieval"""
     
     def __init__(self, db_manager):
         self.db_manager = db_manager
         self.omdb_api_key = AppConfig.OMDB_API_KEY
-        self.poster_cache = {}
+        # Shared by every session of the process, persisted across restarts
+        self.poster_cache = get_poster_cache(
+            AppConfig.POSTER_CACHE_PATH,
+            maxsize=AppConfig.POSTER_CACHE_SIZE,
+            ttl=AppConfig.POSTER_CACHE_TTL,
+            negative_ttl=AppConfig.POSTER_NEGATIVE_TTL
+        )
+        # Keyset pagination: (backend, genre, sort_by, sort_order, limit) -> {page number: page token}
+        # MongoDB and snapshot tokens are not interchangeable, hence the backend in the key;
+        # the prefetcher fills it from background threads, hence the lock
+        self.page_tokens = {}
+        self._page_tokens_lock = threading.Lock()
+        try:
+            self.thumbnails = get_thumbnail_cache(
+                AppConfig.THUMBNAIL_DIR,
+                max_bytes=AppConfig.THUMBNAIL_CACHE_MAX_BYTES,
+                width=AppConfig.THUMBNAIL_WIDTH
+            )
+        except Exception as e:
+            print(f"⚠ Thumbnail cache unavailable, serving poster URLs: {e}")
+            self.thumbnails = None
+        self.prefetcher = PagePrefetcher(
+            fetch_page=lambda filters, page: self._get_page(*filters, page),
+            # Runs on the prefetch pool, so it can afford to wait for the posters
+            warm_page=lambda movies: self.get_poster_images(movies)
+        )
     
     def search_movies(self, query="", genre_filter="All Genres", sort_by="title", sort_order="asc", limit=20, page=1, use_pagination=False):
         """Unified search interface.
@@ -41,65 +128,260 @@ class MovieCatalog:
             return self.db_manager.search_movies_precise_title(query=query, genre=genre, limit=20)
 
         if use_pagination:
-            skip = (max(page, 1) - 1) * limit
-            return self.db_manager.search_movies(query="", genre=genre, sort_by=sort_by, sort_order=sort_order, limit=limit, skip=skip)
+            return self._get_page(genre, sort_by, sort_order, limit, max(page, 1))
 
         return self.db_manager.search_movies(query="", genre=genre, sort_by=sort_by, sort_order=sort_order, limit=limit)
 
-    def count_movies(self, query="", genre_filter="All Genres"):
-        """Count total movies for pagination (ignores fuzzy ranking scenario)."""
+    def prefetch_neighbours(self, genre_filter="All Genres", sort_by="title", sort_order="asc", limit=20, page=1):
+        """Warm the next and previous browse pages (query + posters) in the background"""
         genre = None if genre_filter == "All Genres" else genre_filter
-        return self.db_manager.count_movies(query=query, genre=genre)
+        self.prefetcher.schedule((genre, sort_by, sort_order, limit), max(page, 1))
+    
+    def cancel_prefetch(self):
+        self.prefetcher.cancel()
     
-    def get_poster_url(self, movie_title, year=None):
+    def _get_page(self, genre, sort_by, sort_order, limit, page):
+        """Fetch a page by number using keyset tokens remembered from earlier pages."""
+        backend = self._catalog_backend()
+        with self._page_tokens_lock:
+            tokens = self.page_tokens.setdefault((backend, genre, sort_by, sort_order, limit), {1: None})
+            # Page 1 is always known, so there is a known page at or before the target
+            known = page if page in tokens else max(p for p in tokens if p < page)
+            token = tokens[known]
+
+        if known != page:
+            # Jump: walk forward from the nearest known page before the target
+            token = self.db_manager.page_token_at(
+                genre=genre, sort_by=sort_by, sort_order=sort_order,
+                page_token=token, offset=(page - known) * limit
+            )
+            if token is None or self._catalog_backend() != backend:
+                return []
+            with self._page_tokens_lock:
+                tokens[page] = token
+
+        movies, next_token = self.db_manager.search_movies_page(
+            genre=genre, sort_by=sort_by, sort_order=sort_order, limit=limit, page_token=token
+        )
+        # A failover during the call may have answered from the other backend: keep its token out
+        if next_token and self._catalog_backend() == backend:
+            with self._page_tokens_lock:
+                tokens[page + 1] = next_token
+        return movies
+
+    def _catalog_backend(self):
+        """Which catalog backend serves reads right now ('snapshot' or 'mongo')"""
+        return 'snapshot' if self.db_manager.snapshot is not None else 'mongo'
+
+    def count_movies(self, query="", genre_filter="All Genres", exact=False):
+        """Count total movies for pagination (ignores fuzzy ranking scenario).
+
+        Page totals only need to be approximately right, so by default the
+        unfiltered total comes from collection metadata.
         """
-        Get movie poster URL from OMDB API with validation or use placeholder
+        genre = None if genre_filter == "All Genres" else genre_filter
+        return self.db_manager.count_movies(query=query, genre=genre, exact=exact)
+    
+    def get_poster_url(self, movie_title, year=None, catalog_poster=None):
+        """
+        Get movie poster URL, preferring the catalog document's own poster
         
         Args:
             movie_title: Title of the movie
             year: Release year (optional, helps with accuracy)
+            catalog_poster: `poster` field of the movie document, if any
         
         Returns:
             URL string for validated poster image or placeholder
         """
-        # Check cache first
-        cache_key = f"{movie_title}_{year}"
-        if cache_key in self.poster_cache:
-            return self.poster_cache[cache_key]
+        return self.get_poster_urls(
+            [{'title': movie_title, 'year': year, 'poster': catalog_poster}],
+            deadline=AppConfig.POSTER_PAGE_DEADLINE * 2
+        )[0]
+    
+    def get_poster_urls(self, movies, deadline=None):
+        """
+        Resolve posters for a page of movies concurrently
+        
+        Resolution order per movie:
+        1. Cached result for the title/year.
+        2. The document's `poster` field. It is shown right away unless it is
+           known to be broken; unvalidated URLs are checked in the background
+           and replaced by an OMDB lookup if the check fails.
+        3. OMDB lookups, run in parallel on the shared poster pool. The call
+           waits for them until `deadline` seconds passed; stragglers get the
+           placeholder for now and are cached when they complete, so the next
+           rerun shows them.
+        
+        Args:
+            movies: Movie dicts with 'title' and optional 'year' / 'poster'
+            deadline: Page-level time budget in seconds (default AppConfig.POSTER_PAGE_DEADLINE)
+        
+        Returns:
+            List of poster URLs in the same order as `movies`
+        """
+        if deadline is None:
+            deadline = AppConfig.POSTER_PAGE_DEADLINE
+        
+        keys = [poster_key(movie.get('title'), movie.get('year')) for movie in movies]
+        urls = {key: self.poster_cache.get(key) for key in keys}
+        movies = self._with_catalog_posters(movies, [urls[key] is None for key in keys])
+        futures = {}
+        for movie, key in zip(movies, keys):
+            if urls[key] is not None or key in futures:
+                continue
+            catalog_poster = _catalog_poster(movie)
+            verdict = self.poster_cache.validation(catalog_poster) if catalog_poster else None
+            if verdict:
+                self.poster_cache.set(key, catalog_poster, catalog_poster=catalog_poster)
+                urls[key] = catalog_poster
+                continue
+            future = self._submit_lookup(key, movie)
+            if catalog_poster and verdict is None:
+                urls[key] = catalog_poster  # optimistic; validated in the background
+            else:
+                futures[key] = future
+        
+        if futures:
+            wait(futures.values(), timeout=deadline)
+            for key in futures:
+                urls[key] = self.poster_cache.get(key, '')
+        
+        return [
+            urls[key] or self._generate_placeholder_poster(movie.get('title'))
+            for movie, key in zip(movies, keys)
+        ]
+    
+    def get_poster_images(self, movies, deadline=None):
+        """
+        Poster thumbnails for a page of movies, ready for st.image
+        
+        Posters are resolved with get_poster_urls, then served from the local
+        thumbnail cache; missing thumbnails are downloaded concurrently within
+        what is left of the page deadline.
+        
+        Returns:
+            List (same order as `movies`) of thumbnail bytes, or the poster URL
+            when its thumbnail is not available yet
+        """
+        if deadline is None:
+            deadline = AppConfig.POSTER_PAGE_DEADLINE
+        started = time.monotonic()
+        urls = self.get_poster_urls(movies, deadline=deadline)
+        if self.thumbnails is None:
+            return urls
+        
+        images = {url: self.thumbnails.get(url) for url in urls}
+        futures = {
+            url: self._submit_thumbnail(url) for url, image in images.items()
+            if image is None and self.poster_cache.validation(url) is not False  # known broken: no GET
+        }
+        if futures:
+            wait(futures.values(), timeout=max(0.0, deadline - (time.monotonic() - started)))
+            for url, future in futures.items():
+                if future.done() and not future.cancelled() and future.exception() is None:
+                    images[url] = future.result()
+        return [images[url] or url for url in urls]
+    
+    def _submit_thumbnail(self, url):
+        """One in-flight thumbnail download per URL across all sessions"""
+        key = ('thumbnail', url)
+        with _in_flight_lock:
+            future = _in_flight.get(key)
+            if future is None:
+                future = _poster_pool.submit(self._download_thumbnail, url)
+                _in_flight[key] = future
+                future.add_done_callback(lambda f: _in_flight.pop(key, None))
+            return future
+    
+    def _download_thumbnail(self, url):
+        try:
+            data = self.thumbnails.fetch(url, _http)
+        except Exception as e:
+            print(f"Could not download poster {url}: {e}")
+            return None
+        # Remembered either way: a broken poster is not downloaded again until the negative TTL expires
+        self.poster_cache.set_validation(url, data is not None)
+        return data
+    
+    def _with_catalog_posters(self, movies, needed):
+        """Fill in `poster` for uncached movies whose dict lacks the field (one id lookup)"""
+        ids = [movie['_id'] for movie, need in zip(movies, needed)
+               if need and '_id' in movie and 'poster' not in movie]
+        if not ids:
+            return movies
+        try:
+            docs = self.db_manager.get_movies_by_ids(ids, projection={'poster': 1})
+        except Exception as e:
+            print(f"Could not read catalog posters: {e}")
+            return movies
+        return [
+            {**movie, 'poster': docs[str(movie['_id'])].get('poster')}
+            if '_id' in movie and str(movie['_id']) in docs and 'poster' not in movie else movie
+            for movie in movies
+        ]
+    
+    def _submit_lookup(self, cache_key, movie):
+        """
+        One in-flight lookup per title/year across all sessions
         
+        The worker writes the result to the shared cache itself, so lookups
+        that miss the page deadline still land there for the next render.
+        """
+        with _in_flight_lock:
+            future = _in_flight.get(cache_key)
+            if future is None:
+                future = _poster_pool.submit(self._resolve_and_store, cache_key, movie)
+                _in_flight[cache_key] = future
+                future.add_done_callback(lambda f: _in_flight.pop(cache_key, None))
+            return future
+    
+    def _resolve_and_store(self, cache_key, movie):
+        """Validate the document's poster, falling back to OMDB, and cache the outcome"""
+        catalog_poster = _catalog_poster(movie)
+        try:
+            if catalog_poster and self._is_valid_poster(catalog_poster):
+                poster_url = catalog_poster
+            else:
+                poster_url = self._fetch_poster_url(movie.get('title'), movie.get('year'))
+        except Exception as e:
+            print(f"Error fetching poster for '{movie.get('title')}': {e}")
+            return None
+        self.poster_cache.set(cache_key, poster_url, catalog_poster=catalog_poster)
+        return poster_url
+    
+    def _omdb_get(self, params):
+        if not _poster_rate.acquire(timeout=AppConfig.POSTER_PAGE_DEADLINE):
+            raise TimeoutError("poster lookup rate limit")
+        return _omdb_breaker.call(
+            _http.get, AppConfig.OMDB_BASE_URL, params=params, timeout=5,
+            is_failure=lambda response: response.status_code >= 500 or response.status_code == 429
+        )
+    
+    def _fetch_poster_url(self, movie_title, year=None):
+        """
+        Look a poster up on OMDB (title + year first, then title only)
+        
+        Returns:
+            Validated poster URL, or None when nothing usable was found
+        
+        Raises:
+            requests.RequestException / TimeoutError when OMDB could not be asked
+        """
         # Try OMDB API if key is available
         if not self.omdb_api_key:
             # Use demo API key if not configured
             self.omdb_api_key = 'bbe61596'
         
         if self.omdb_api_key:
-            try:
-                # First try with year if provided
-                if year:
-                    params = {
-                        'apikey': self.omdb_api_key,
-                        't': movie_title,
-                        'y': str(year)
-                    }
-                    response = requests.get('http://www.omdbapi.com/', params=params, timeout=5)
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        
-                        if data.get('Response') == 'True' and data.get('Poster'):
-                            poster_url = data['Poster']
-                            
-                            # Validate poster URL (not 'N/A' and is a valid URL)
-                            if poster_url != 'N/A' and self._validate_poster_url(poster_url):
-                                self.poster_cache[cache_key] = poster_url
-                                return poster_url
-                
-                # Try without year as fallback
+            # First try with year if provided
+            if year:
                 params = {
                     'apikey': self.omdb_api_key,
-                    't': movie_title
+                    't': movie_title,
+                    'y': str(year)
                 }
-                response = requests.get('http://www.omdbapi.com/', params=params, timeout=5)
+                response = self._omdb_get(params)
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -107,18 +389,39 @@ class MovieCatalog:
                     if data.get('Response') == 'True' and data.get('Poster'):
                         poster_url = data['Poster']
                         
-                        # Validate poster URL
-                        if poster_url != 'N/A' and self._validate_poster_url(poster_url):
-                            self.poster_cache[cache_key] = poster_url
+                        # Validate poster URL (not 'N/A' and is a valid URL)
+                        if poster_url != 'N/A' and self._is_valid_poster(poster_url):
                             return poster_url
+            
+            # Try without year as fallback
+            params = {
+                'apikey': self.omdb_api_key,
+                't': movie_title
+            }
+            response = self._omdb_get(params)
+            
+            if response.status_code == 200:
+                data = response.json()
+                
+                if data.get('Response') == 'True' and data.get('Poster'):
+                    poster_url = data['Poster']
                     
-            except Exception as e:
-                print(f"Error fetching poster for '{movie_title}': {e}")
+                    # Validate poster URL
+                    if poster_url != 'N/A' and self._is_valid_poster(poster_url):
+                        return poster_url
         
-        # Fallback to placeholder
-        placeholder_url = self._generate_placeholder_poster(movie_title)
-        self.poster_cache[cache_key] = placeholder_url
-        return placeholder_url
+        return None
+    
+    def _is_valid_poster(self, url):
+        """_validate_poster_url, remembered per URL in the shared poster cache"""
+        if self.thumbnails is not None and url in self.thumbnails:
+            return True  # already downloaded as an image
+        verdict = self.poster_cache.validation(url)
+        if verdict is None:
+            verdict = self._validate_poster_url(url)
+            if verdict is not None:  # None: the check itself failed, ask again next time
+                self.poster_cache.set_validation(url, verdict)
+        return bool(verdict)
     
     def _validate_poster_url(self, url):
         """
@@ -130,7 +433,7 @@ class MovieCatalog:
                 return False
             # Only validate for OMDB/Amazon URLs
             if 'm.media-amazon.com' in url or 'ia.media-imdb.com' in url:
-                head_response = requests.head(url, timeout=3, allow_redirects=True)
+                head_response = _http.head(url, timeout=3, allow_redirects=True)
                 if head_response.status_code == 200:
                     content_type = head_response.headers.get('Content-Type', '')
                     return 'image' in content_type.lower()
@@ -142,7 +445,7 @@ class MovieCatalog:
             return True
         except Exception as e:
             print(f"Poster validation failed for {url}: {e}")
-            return False
+            return None
     
     def _generate_placeholder_poster(self, title):
         """
@@ -161,6 +464,10 @@ class MovieCatalog:
         """Get detailed information for a specific movie"""
         return self.db_manager.get_movie_by_id(movie_id)
     
+    def get_movies_details(self, movie_ids, projection=None):
+        """Get detailed information for several movies in one query (str id -> movie)"""
+        return self.db_manager.get_movies_by_ids(movie_ids, projection=projection)
+    
     def get_popular_movies(self, limit=20):
         """Get most popular movies"""
         return self.db_manager.get_popular_movies(limit=limit)
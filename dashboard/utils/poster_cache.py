@@ -0,0 +1,192 @@
+"""
+Process-wide poster cache with an on-disk tier
+
+PosterCache maps (title, year) to resolved poster URLs for every session of
+the process, backed by a small SQLite file so entries survive restarts:
+
+- Found posters are kept for POSTER_CACHE_TTL, failed lookups (negative
+  entries) for the much shorter POSTER_NEGATIVE_TTL so they are retried later.
+- Hot entries live in an in-memory TTLCache in front of the file.
+- Each entry also records the catalog document's own `poster` field.
+- Image URL validation results are remembered per URL with the same TTLs,
+  so each image URL is checked once per TTL.
+
+Schema:
+
+    posters(key, url, catalog_poster, expires_at)   url '' = negative entry
+    validations(url, ok, expires_at)
+"""
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from utils.cache import TTLCache
+
+_MISSING = object()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posters (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    catalog_poster TEXT,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS validations (
+    url TEXT PRIMARY KEY,
+    ok INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+def poster_key(title, year=None):
+    """Cache key for a title/year pair (case and surrounding whitespace ignored)"""
+    return f"{str(title or '').strip().lower()}|{year or ''}"
+
+
+class PosterCache:
+    """Poster URL cache: memory LRU in front of a SQLite file, positive and negative TTLs"""
+
+    def __init__(self, path=None, maxsize=4096, ttl=7 * 24 * 3600, negative_ttl=6 * 3600):
+        self.path = Path(path) if path else None
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._validations = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self._conn = None
+        if self.path is not None:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.executescript(SCHEMA)
+            except sqlite3.Error as e:
+                print(f"⚠ Poster cache file unavailable, keeping posters in memory only: {e}")
+                self._conn = None
+
+    def get(self, key, default=None):
+        """
+        Cached poster URL for `key`
+
+        Returns:
+            The URL, '' for a cached failed lookup, or `default` when unknown/expired
+        """
+        entry = self._memory.get(key, _MISSING)
+        if entry is _MISSING:
+            entry = self._load(key)
+            if entry is None:
+                return default
+            self._memory.set(key, entry, ttl=entry[2] - time.time())
+        return entry[0]
+
+    def catalog_poster(self, key):
+        """The catalog document's `poster` field recorded with the entry, if any"""
+        entry = self._memory.get(key, _MISSING)
+        if entry is _MISSING:
+            entry = self._load(key)
+        return entry[1] if entry else None
+
+    def set(self, key, url, catalog_poster=None):
+        """Store a resolved URL; a falsy `url` records a failed lookup (negative TTL)"""
+        url = url or ''
+        ttl = self.ttl if url else self.negative_ttl
+        entry = (url, catalog_poster, time.time() + ttl)
+        self._memory.set(key, entry, ttl=ttl)
+        if self._conn is None:
+            return
+        try:
+            with self._lock, self._conn:
+                self._conn.execute("INSERT OR REPLACE INTO posters VALUES (?, ?, ?, ?)", (key, *entry))
+        except sqlite3.Error as e:
+            print(f"⚠ Could not persist poster for '{key}': {e}")
+
+    def _load(self, key):
+        if self._conn is None:
+            return None
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT url, catalog_poster, expires_at FROM posters WHERE key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"⚠ Poster cache read failed: {e}")
+            return None
+        if row is None or row[2] < time.time():
+            return None
+        return row
+
+    def validation(self, url):
+        """Remembered validation result for an image URL: True, False, or None when unknown"""
+        entry = self._validations.get(url, _MISSING)
+        if entry is not _MISSING:
+            return entry
+        if self._conn is None:
+            return None
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT ok, expires_at FROM validations WHERE url = ?", (url,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"⚠ Poster cache read failed: {e}")
+            return None
+        if row is None or row[1] < time.time():
+            return None
+        self._validations.set(url, bool(row[0]), ttl=row[1] - time.time())
+        return bool(row[0])
+
+    def set_validation(self, url, ok):
+        """Remember whether `url` serves an image (failures expire after the negative TTL)"""
+        ttl = self.ttl if ok else self.negative_ttl
+        self._validations.set(url, bool(ok), ttl=ttl)
+        if self._conn is None:
+            return
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO validations VALUES (?, ?, ?)", (url, int(bool(ok)), time.time() + ttl)
+                )
+        except sqlite3.Error as e:
+            print(f"⚠ Could not persist poster validation for {url}: {e}")
+
+    def purge_expired(self):
+        """Delete expired rows from the file; returns how many were removed"""
+        if self._conn is None:
+            return 0
+        now = time.time()
+        with self._lock, self._conn:
+            removed = self._conn.execute("DELETE FROM posters WHERE expires_at < ?", (now,)).rowcount
+            return removed + self._conn.execute("DELETE FROM validations WHERE expires_at < ?", (now,)).rowcount
+
+    def clear(self):
+        self._memory.invalidate()
+        self._validations.invalidate()
+        if self._conn is not None:
+            with self._lock, self._conn:
+                self._conn.execute("DELETE FROM posters")
+                self._conn.execute("DELETE FROM validations")
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __len__(self):
+        if self._conn is None:
+            return len(self._memory)
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM posters").fetchone()[0]
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_poster_cache(path=None, maxsize=4096, ttl=7 * 24 * 3600, negative_ttl=6 * 3600):
+    """Return the process-wide poster cache, creating it on first use"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PosterCache(path, maxsize=maxsize, ttl=ttl, negative_ttl=negative_ttl)
+            _cache.purge_expired()
+        return _cache
@@ -0,0 +1,72 @@
+"""
+Background prefetching of neighbouring catalog pages
+
+After page N is rendered, PagePrefetcher loads pages N+1 and N-1 on a small
+process-wide pool: the page query (which lands in the shared catalog cache
+along with its keyset token) and the page's posters (which land in the shared
+poster cache). A "Next" click then renders from memory.
+
+Each prefetcher belongs to one session. Scheduling for a different filter
+combination (genre, sort, order) cancels whatever is still pending for the
+old one, so stale prefetches never compete with the pages the user wants.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+_prefetch_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='prefetch')
+
+
+class PagePrefetcher:
+    """Warm neighbouring pages for one session; cancellable per filter combination"""
+
+    def __init__(self, fetch_page, warm_page):
+        """
+        Args:
+            fetch_page: fetch_page(filters, page) -> list of movies
+            warm_page: warm_page(movies), e.g. start poster lookups
+        """
+        self.fetch_page = fetch_page
+        self.warm_page = warm_page
+        self._filters = None
+        self._cancelled = threading.Event()
+        self._futures = {}  # page -> future, for the current filters
+        self._lock = threading.Lock()
+
+    def schedule(self, filters, page, neighbours=(1, -1)):
+        """Prefetch `page + d` for each d in `neighbours` under `filters`"""
+        with self._lock:
+            if filters != self._filters:
+                self._cancel_locked()
+                self._filters = filters
+            cancelled = self._cancelled
+            for offset in neighbours:
+                target = page + offset
+                pending = self._futures.get(target)
+                if target < 1 or (pending is not None and not pending.done()):
+                    continue
+                self._futures[target] = _prefetch_pool.submit(self._prefetch, filters, target, cancelled)
+
+    def cancel(self):
+        """Drop pending prefetches (e.g. the user typed a search query)"""
+        with self._lock:
+            self._cancel_locked()
+            self._filters = None
+
+    def _cancel_locked(self):
+        self._cancelled.set()
+        for future in self._futures.values():
+            future.cancel()
+        self._futures = {}
+        self._cancelled = threading.Event()
+
+    def _prefetch(self, filters, page, cancelled):
+        if cancelled.is_set():
+            return False
+        try:
+            movies = self.fetch_page(filters, page)
+            if movies and not cancelled.is_set():
+                self.warm_page(movies)
+            return True
+        except Exception as e:
+            print(f"⚠ Prefetch of page {page} failed: {e}")
+            return False
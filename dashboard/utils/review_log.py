@@ -0,0 +1,360 @@
+"""
+Append-only local review log used when MongoDB rejects writes
+
+Layout (one directory):
+
+    segment-000001.log   JSON review records, one per line (append-only)
+    segment-000001.idx   Fixed-width binary sidecar index, one record per review:
+                         (offset, length, timestamp, movie_id)
+    checkpoint.json      Aggregate checkpoint: ReviewStats over every sealed
+                         segment plus the first N records of the active one
+    legacy-imported      Marker: the old flat JSONL backup has been copied in
+
+When the active segment exceeds SEGMENT_MAX_BYTES it is sealed: a footer line
+with the segment's aggregate is appended and a new segment is started.
+
+Reads never re-parse the whole log. The index is memory-mapped and decoded
+with struct, review bodies are sliced out of the memory-mapped segment by
+offset, and statistics only parse the records written after the last
+checkpoint. Only the new tail of the index is read when the log grows.
+"""
+from datetime import datetime
+import json
+import mmap
+import os
+import struct
+import threading
+from pathlib import Path
+
+from utils.review_stats import ReviewStats
+
+try:
+    from bson import ObjectId
+except ImportError:  # the log works without pymongo installed (ids stay strings)
+    ObjectId = None
+
+SEGMENT_PREFIX = 'segment-'
+LEGACY_MARKER = 'legacy-imported'
+FOOTER_KEY = '__footer__'
+
+# offset (u64), length (u32), timestamp (f64 epoch seconds), movie_id (24 ASCII bytes)
+INDEX_RECORD = struct.Struct('<QId24s')
+
+# Fields written as hex strings that are ObjectIds in MongoDB
+OBJECT_ID_FIELDS = ('_id', 'movie_id')
+
+
+def _to_datetime(value):
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    return None
+
+
+class IndexEntry(tuple):
+    """(timestamp, segment, offset, length, movie_id)"""
+    __slots__ = ()
+
+    timestamp = property(lambda self: self[0])
+    segment = property(lambda self: self[1])
+    offset = property(lambda self: self[2])
+    length = property(lambda self: self[3])
+    movie_id = property(lambda self: self[4])
+
+
+class ReviewLog:
+    """Segmented append-only review store with a sidecar index and stats checkpoint"""
+
+    def __init__(self, directory, legacy_path=None, segment_max_bytes=4 * 1024 * 1024, checkpoint_every=64):
+        self.directory = Path(directory)
+        self.legacy_path = Path(legacy_path) if legacy_path else None
+        self.segment_max_bytes = segment_max_bytes
+        self.checkpoint_every = checkpoint_every
+        self._lock = threading.RLock()
+        self._opened = False
+        self._reset_state()
+
+    def _reset_state(self):
+        self._entries = []          # IndexEntry list in append order
+        self._by_segment = {}       # segment number -> its IndexEntry list
+        self._by_movie = {}         # movie_id -> its IndexEntry list
+        self._sorted = True         # entries are in timestamp order
+        self._index_sizes = {}      # segment number -> bytes of .idx already loaded
+        self._maps = {}             # segment number -> (size, mmap)
+        self._active = 1
+        self._checkpoint = None
+
+    # ----------------------------------------------------------------- files
+    def _segment_path(self, number, suffix):
+        return self.directory / f"{SEGMENT_PREFIX}{number:06d}.{suffix}"
+
+    def _segments(self):
+        numbers = []
+        for path in self.directory.glob(f"{SEGMENT_PREFIX}*.log"):
+            try:
+                numbers.append(int(path.stem[len(SEGMENT_PREFIX):]))
+            except ValueError:
+                continue
+        return sorted(numbers)
+
+    def _open(self):
+        if self._opened:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        segments = self._segments()
+        self._active = segments[-1] if segments else 1
+        self._opened = True
+        self._refresh_index()
+        self._checkpoint = self._read_checkpoint()
+        if (not segments and self.legacy_path is not None and self.legacy_path.exists()
+                and not (self.directory / LEGACY_MARKER).exists()):
+            self._import_legacy()
+
+    def _read_checkpoint(self):
+        path = self.directory / 'checkpoint.json'
+        if path.exists():
+            try:
+                checkpoint = json.loads(path.read_text(encoding='utf-8'))
+                if (ReviewStats.is_complete(checkpoint.get('sealed_stats'))
+                        and ReviewStats.is_complete(checkpoint.get('active_stats'))):
+                    return checkpoint
+                print("⚠ Review log checkpoint predates the current counters, recomputing")
+            except (OSError, ValueError) as e:
+                print(f"⚠ Review log checkpoint unreadable ({e}), recomputing")
+        return {'sealed_stats': self._sealed_stats_from_footers().to_dict(), 'active_segment': self._active,
+                'active_records': 0, 'active_stats': ReviewStats().to_dict()}
+
+    def _sealed_stats_from_footers(self):
+        """Rebuild sealed-segment aggregates from each segment's footer line"""
+        stats = ReviewStats()
+        for number in self._segments():
+            if number >= self._active:
+                continue
+            footer = self._read_footer(number)
+            if footer is not None and ReviewStats.is_complete(footer.get('stats')):
+                stats.merge(ReviewStats.from_dict(footer['stats']))
+            else:
+                for entry in self._by_segment.get(number, []):
+                    stats.add(self._read_record(entry))
+        return stats
+
+    def _read_footer(self, number):
+        path = self._segment_path(number, 'log')
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - 64 * 1024))
+            lines = f.read().rstrip(b'\n').rsplit(b'\n', 1)
+        try:
+            record = json.loads(lines[-1])
+        except ValueError:
+            return None
+        return record.get(FOOTER_KEY) if isinstance(record, dict) else None
+
+    def _write_checkpoint(self):
+        path = self.directory / 'checkpoint.json'
+        tmp_path = path.with_suffix('.json.tmp')
+        tmp_path.write_text(json.dumps(self._checkpoint), encoding='utf-8')
+        os.replace(tmp_path, path)
+
+    def _import_legacy(self):
+        """One-time copy of the old flat JSONL backup into the log (the file itself is left alone)"""
+        imported = 0
+        with open(self.legacy_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    self.append(json.loads(line))
+                    imported += 1
+                except ValueError:
+                    continue
+        (self.directory / LEGACY_MARKER).write_text(str(self.legacy_path), encoding='utf-8')
+        print(f"✓ Migrated {imported} reviews from {self.legacy_path.name} into the review log")
+
+    # ----------------------------------------------------------------- index
+    def _refresh_index(self):
+        """Load index records appended since the last call (only the new tail is read)"""
+        for number in self._segments():
+            path = self._segment_path(number, 'idx')
+            if not path.exists():
+                continue
+            size = path.stat().st_size
+            loaded = self._index_sizes.get(number, 0)
+            usable = size - (size % INDEX_RECORD.size)
+            if usable <= loaded:
+                continue
+            with open(path, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    tail = mm[loaded:usable]
+            for offset, length, ts, raw_id in INDEX_RECORD.iter_unpack(tail):
+                self._add_entry(IndexEntry((ts, number, offset, length, raw_id.rstrip(b'\0').decode('ascii'))))
+            self._index_sizes[number] = usable
+            self._active = max(self._active, number)
+
+    def _add_entry(self, entry):
+        if self._entries and entry.timestamp < self._entries[-1].timestamp:
+            self._sorted = False
+        self._entries.append(entry)
+        self._by_segment.setdefault(entry.segment, []).append(entry)
+        self._by_movie.setdefault(entry.movie_id, []).append(entry)
+
+    def _ordered_entries(self):
+        if not self._sorted:
+            self._entries.sort(key=lambda e: (e.timestamp, e.segment, e.offset))
+            self._sorted = True
+        return self._entries
+
+    def _read_record(self, entry):
+        size, mm = self._maps.get(entry.segment, (0, None))
+        if mm is None or entry.offset + entry.length > size:
+            if mm is not None:
+                mm.close()
+            with open(self._segment_path(entry.segment, 'log'), 'rb') as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[entry.segment] = (len(mm), mm)
+        review = json.loads(mm[entry.offset:entry.offset + entry.length])
+        timestamp = _to_datetime(review.get('timestamp'))
+        if timestamp is not None:
+            review['timestamp'] = timestamp
+        if ObjectId is not None:
+            # Same types as reviews that never left memory (grouping, movie_id lookups)
+            for field in OBJECT_ID_FIELDS:
+                value = review.get(field)
+                if isinstance(value, str) and ObjectId.is_valid(value):
+                    review[field] = ObjectId(value)
+        return review
+
+    def _close_maps(self):
+        for _, mm in self._maps.values():
+            mm.close()
+        self._maps = {}
+
+    # ----------------------------------------------------------------- write
+    def append(self, review):
+        """Append one review; returns its index entry"""
+        with self._lock:
+            self._open()
+            record = dict(review)
+            timestamp = _to_datetime(record.get('timestamp')) or datetime.now()
+            record['timestamp'] = timestamp.isoformat(sep=' ')
+            movie_id = str(record.get('movie_id') or '')[:24]
+            payload = json.dumps(record, default=str).encode('utf-8')
+
+            log_path = self._segment_path(self._active, 'log')
+            with open(log_path, 'ab') as f:
+                offset = f.tell()
+                f.write(payload + b'\n')
+                f.flush()
+                os.fsync(f.fileno())
+            with open(self._segment_path(self._active, 'idx'), 'ab') as f:
+                f.write(INDEX_RECORD.pack(offset, len(payload), timestamp.timestamp(), movie_id.encode('ascii', 'replace')))
+            self._refresh_index()
+            entry = self._by_segment[self._active][-1]
+
+            if self._active_records_since_checkpoint() >= self.checkpoint_every:
+                self.checkpoint()
+            if offset + len(payload) + 1 >= self.segment_max_bytes:
+                self._seal_active()
+            return entry
+
+    def _active_entries(self):
+        return self._by_segment.get(self._active, [])
+
+    def _active_records_since_checkpoint(self):
+        if self._checkpoint.get('active_segment') != self._active:
+            return len(self._active_entries())
+        return len(self._active_entries()) - self._checkpoint.get('active_records', 0)
+
+    def checkpoint(self):
+        """Persist aggregates covering every record written so far"""
+        with self._lock:
+            self._open()
+            active_stats = self._active_stats()
+            self._checkpoint['active_segment'] = self._active
+            self._checkpoint['active_records'] = len(self._active_entries())
+            self._checkpoint['active_stats'] = active_stats.to_dict()
+            self._write_checkpoint()
+
+    def _seal_active(self):
+        active_stats = self._active_stats()
+        footer = {FOOTER_KEY: {'records': len(self._active_entries()), 'stats': active_stats.to_dict()}}
+        with open(self._segment_path(self._active, 'log'), 'ab') as f:
+            f.write(json.dumps(footer).encode('utf-8') + b'\n')
+        sealed = ReviewStats.from_dict(self._checkpoint['sealed_stats']).merge(active_stats)
+        self._active += 1
+        self._segment_path(self._active, 'log').touch()
+        self._checkpoint = {'sealed_stats': sealed.to_dict(), 'active_segment': self._active,
+                            'active_records': 0, 'active_stats': ReviewStats().to_dict()}
+        self._write_checkpoint()
+
+    # ------------------------------------------------------------------ read
+    def _active_stats(self):
+        """Stats of the active segment: checkpointed prefix + parsed tail"""
+        entries = self._active_entries()
+        if self._checkpoint.get('active_segment') == self._active:
+            stats = ReviewStats.from_dict(self._checkpoint.get('active_stats'))
+            done = self._checkpoint.get('active_records', 0)
+        else:
+            stats, done = ReviewStats(), 0
+        for entry in entries[done:]:
+            stats.add(self._read_record(entry))
+        return stats
+
+    def stats(self):
+        """ReviewStats over every record in the log"""
+        with self._lock:
+            self._open()
+            self._refresh_index()
+            sealed = ReviewStats.from_dict(self._checkpoint.get('sealed_stats'))
+            return sealed.merge(self._active_stats())
+
+    def iter_reviews(self, movie_id=None, newest_first=True):
+        """Yield reviews (timestamp order), optionally for one movie, reading bodies lazily"""
+        with self._lock:
+            self._open()
+            self._refresh_index()
+            if movie_id is None:
+                entries = list(self._ordered_entries())
+            else:
+                entries = sorted(self._by_movie.get(str(movie_id), []),
+                                 key=lambda e: (e.timestamp, e.segment, e.offset))
+        if newest_first:
+            entries.reverse()
+        for entry in entries:
+            with self._lock:
+                review = self._read_record(entry)
+            yield review
+
+    def get_reviews(self, movie_id=None, limit=None):
+        reviews = []
+        for review in self.iter_reviews(movie_id=movie_id):
+            reviews.append(review)
+            if limit is not None and len(reviews) >= limit:
+                break
+        return reviews
+
+    def count(self):
+        with self._lock:
+            self._open()
+            self._refresh_index()
+            return len(self._entries)
+
+    def clear(self):
+        """Delete every segment, index and checkpoint; returns the number of reviews removed"""
+        with self._lock:
+            self._open()
+            self._refresh_index()
+            removed = len(self._entries)
+            self._close_maps()
+            for path in self.directory.glob(f"{SEGMENT_PREFIX}*"):
+                path.unlink()
+            checkpoint = self.directory / 'checkpoint.json'
+            if checkpoint.exists():
+                checkpoint.unlink()
+            self._reset_state()
+            self._checkpoint = self._read_checkpoint()
+            return removed
@@ -0,0 +1,221 @@
+"""
+Background review submission pipeline
+
+Reviews submitted from the UI are pushed through a staged worker pipeline:
+
+    detect -> translate -> score -> persist
+
+Each stage runs in its own worker thread and is fed by a bounded queue, so a
+slow stage (e.g. translation model loading) applies back-pressure upstream
+instead of piling up unbounded work. `submit()` returns a job id immediately;
+the UI polls `get_status()` to show progress and the final sentiment.
+"""
+import queue
+import threading
+import time
+import uuid
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+try:
+    from config import AppConfig
+except ImportError:
+    import importlib.util
+    config_path = Path(__file__).parent.parent / 'config.py'
+    spec = importlib.util.spec_from_file_location("config", config_path)
+    config_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(config_module)
+    AppConfig = config_module.AppConfig
+
+from utils.language import detect_language, translate_text
+
+
+class PipelineBusyError(Exception):
+    """Raised when the pipeline cannot accept a new review (queues are full)"""
+
+
+class ReviewPipeline:
+    """Staged detect -> translate -> score -> persist worker pipeline"""
+
+    STAGES = ('detect', 'translate', 'score', 'persist')
+
+    def __init__(self, queue_size=None, job_ttl=None):
+        queue_size = queue_size or AppConfig.REVIEW_PIPELINE_QUEUE_SIZE
+        self.job_ttl = job_ttl or AppConfig.REVIEW_PIPELINE_JOB_TTL
+        self._queues = [queue.Queue(maxsize=queue_size) for _ in self.STAGES]
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._handlers = {
+            'detect': self._detect,
+            'translate': self._translate,
+            'score': self._score,
+            'persist': self._persist,
+        }
+        for index, stage in enumerate(self.STAGES):
+            worker = threading.Thread(
+                target=self._run_stage,
+                args=(index,),
+                name=f"review-pipeline-{stage}",
+                daemon=True
+            )
+            worker.start()
+
+    def submit(self, review_data, text, model_name, model_manager, db_manager, timeout=None):
+        """
+        Enqueue a review for background processing
+
+        Args:
+            review_data: Review document (movie, rating, session...) to complete and save
+            text: Original review text (any language)
+            model_name: Internal sentiment model name ('logistic', 'distilbert', ...)
+            model_manager: ModelManager used for scoring
+            db_manager: DatabaseManager used for persistence
+            timeout: Seconds to wait for queue space before giving up
+
+        Returns:
+            Job id string to poll with get_status()
+
+        Raises:
+            PipelineBusyError: if the first stage queue stays full for `timeout` seconds
+        """
+        if timeout is None:
+            timeout = AppConfig.REVIEW_PIPELINE_SUBMIT_TIMEOUT
+        self._prune_jobs()
+
+        job_id = uuid.uuid4().hex
+        job = {
+            'id': job_id,
+            'status': 'queued',
+            'stage': self.STAGES[0],
+            'text': text,
+            'model_name': model_name,
+            'review': dict(review_data),
+            'model_manager': model_manager,
+            'db_manager': db_manager,
+            'sentiment': None,
+            'saved_id': None,
+            'error': None,
+            'submitted_at': time.time(),
+            'finished_at': None,
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+
+        try:
+            self._queues[0].put(job, timeout=timeout)
+        except queue.Full:
+            with self._lock:
+                self._jobs.pop(job_id, None)
+            raise PipelineBusyError("Review pipeline is at capacity, please retry shortly")
+        return job_id
+
+    def get_status(self, job_id):
+        """Return a snapshot of the job's public fields, or None if unknown/expired"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            review = job['review']
+            return {
+                'id': job['id'],
+                'status': job['status'],
+                'stage': job['stage'],
+                'movie_title': review.get('movie_title'),
+                'original_language': review.get('original_language'),
+                'was_translated': review.get('was_translated', False),
+                'sentiment': job['sentiment'],
+                'saved_id': job['saved_id'],
+                'error': job['error'],
+            }
+
+    def queue_depths(self):
+        """Current number of jobs waiting in front of each stage"""
+        return {stage: q.qsize() for stage, q in zip(self.STAGES, self._queues)}
+
+    def _run_stage(self, index):
+        stage = self.STAGES[index]
+        handler = self._handlers[stage]
+        inbox = self._queues[index]
+        outbox = self._queues[index + 1] if index + 1 < len(self._queues) else None
+
+        while True:
+            job = inbox.get()
+            try:
+                with self._lock:
+                    job['status'] = 'running'
+                    job['stage'] = stage
+                handler(job)
+                if outbox is not None:
+                    with self._lock:
+                        job['status'] = 'queued'
+                        job['stage'] = self.STAGES[index + 1]
+                    # Blocking put: a full downstream queue stalls this stage,
+                    # which in turn fills our inbox and pushes back on submit()
+                    outbox.put(job)
+            except Exception as e:
+                print(f"⚠ Review pipeline {stage} stage failed: {e}")
+                self._finish(job, 'failed', error=str(e))
+            finally:
+                inbox.task_done()
+
+    def _detect(self, job):
+        job['review']['original_language'] = detect_language(job['text'])
+
+    def _translate(self, job):
+        review = job['review']
+        result = translate_text(job['text'], review['original_language'])  # AppConfig.TRANSLATION_PROFILE
+        job['english_text'] = result['text']
+        review['translated_text'] = result['text'] if result['translated'] else None
+        review['translation_model'] = result['model']
+        review['translation_profile'] = result['profile']
+        review['was_translated'] = result['translated']
+
+    def _score(self, job):
+        result = job['model_manager'].predict_sentiment(job['english_text'], job['model_name'])
+        review = job['review']
+        review['sentiment_score'] = result['score']
+        review['sentiment_label'] = result['label']
+        review['model_used'] = job['model_name']
+        job['sentiment'] = {'label': result['label'], 'score': result['score']}
+
+    def _persist(self, job):
+        saved_id = job['db_manager'].save_review(job['review'])
+        if saved_id:
+            self._finish(job, 'done', saved_id=str(saved_id))
+        else:
+            self._finish(job, 'failed', error='Review analyzed but could not be saved')
+
+    def _finish(self, job, status, saved_id=None, error=None):
+        with self._lock:
+            job['status'] = status
+            job['saved_id'] = saved_id
+            job['error'] = error
+            job['finished_at'] = time.time()
+            # Drop heavy references once the job no longer needs them
+            job['model_manager'] = None
+            job['db_manager'] = None
+
+    def _prune_jobs(self):
+        cutoff = time.time() - self.job_ttl
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job['finished_at'] is not None and job['finished_at'] < cutoff
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def get_review_pipeline():
+    """Return the process-wide pipeline shared by all Streamlit sessions"""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = ReviewPipeline()
+        return _pipeline
@@ -0,0 +1,89 @@
+"""
+Running aggregates for audience review statistics
+
+ReviewStats keeps the sums and counters needed to answer the dashboard's
+statistics (totals, average rating/sentiment, positive/negative counts and
+distinct participants) without rescanning reviews. positive_count and
+negative_count compare the model confidence with 0.5; positive_label_count
+counts reviews whose predicted label is Positive. The same counters are
+kept in MongoDB as a single stats document (updated with $inc on every save)
+and in the local review log's checkpoint for reviews stored while MongoDB
+rejects writes.
+"""
+
+
+def _number(value):
+    """Return value as float if it is a real number, else None"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+class ReviewStats:
+    """Mergeable running totals over a set of reviews"""
+
+    COUNTERS = (
+        'total_reviews', 'rating_sum', 'rating_count',
+        'sentiment_sum', 'sentiment_count', 'positive_count', 'negative_count',
+        'positive_label_count'
+    )
+
+    def __init__(self, **counters):
+        for name in self.COUNTERS:
+            setattr(self, name, counters.get(name, 0))
+        self.participants = set(counters.get('participants', ()))
+
+    @staticmethod
+    def increments(review):
+        """Counter deltas contributed by one review (also used for MongoDB $inc)"""
+        rating = _number(review.get('rating'))
+        sentiment = _number(review.get('sentiment_score'))
+        return {
+            'total_reviews': 1,
+            'rating_sum': rating or 0.0,
+            'rating_count': 1 if rating is not None else 0,
+            'sentiment_sum': sentiment or 0.0,
+            'sentiment_count': 1 if sentiment is not None else 0,
+            'positive_count': 1 if sentiment is not None and sentiment > 0.5 else 0,
+            'negative_count': 1 if sentiment is not None and sentiment < 0.5 else 0,
+            'positive_label_count': 1 if review.get('sentiment_label') == 'Positive' else 0,
+        }
+
+    def add(self, review):
+        for name, delta in self.increments(review).items():
+            setattr(self, name, getattr(self, name) + delta)
+        if review.get('session_id'):
+            self.participants.add(review['session_id'])
+
+    def merge(self, other):
+        for name in self.COUNTERS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.participants |= other.participants
+        return self
+
+    def summary(self, participant_count=None):
+        """Public statistics dict (same keys the dashboard has always used)"""
+        return {
+            'total_reviews': self.total_reviews,
+            'avg_rating': self.rating_sum / self.rating_count if self.rating_count else 0,
+            'avg_sentiment': self.sentiment_sum / self.sentiment_count if self.sentiment_count else 0,
+            'positive_count': self.positive_count,
+            'negative_count': self.negative_count,
+            'positive_label_count': self.positive_label_count,
+            'active_participants': len(self.participants) if participant_count is None else participant_count,
+        }
+
+    def to_dict(self):
+        data = {name: getattr(self, name) for name in self.COUNTERS}
+        data['participants'] = sorted(self.participants)
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**(data or {}))
+
+    @classmethod
+    def is_complete(cls, data):
+        """True if `data` carries every counter (stored before a counter was added: recompute)"""
+        return isinstance(data, dict) and all(name in data for name in cls.COUNTERS)
+
@@ -0,0 +1,177 @@
+"""
+Local poster thumbnail cache
+
+ThumbnailCache downloads each poster once, shrinks it to the catalog grid
+size and keeps it on disk; the app hands the bytes to `st.image`, and a cached
+thumbnail doubles as proof that the URL serves an image.
+
+Layout under the cache directory:
+
+    blobs/<sha256 of thumbnail bytes>.<ext>   content-addressed, shared by
+                                               URLs serving the same image
+    index.sqlite3                              urls(url, digest, ext)
+
+Blob modification times record the last use; when the blobs exceed
+`max_bytes` the least recently used are deleted. Pillow is optional: without
+it (or for formats it cannot read) the original bytes are stored.
+"""
+import hashlib
+import io
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+try:
+    from PIL import Image
+except ImportError:  # thumbnails are stored unresized
+    Image = None
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+    url TEXT PRIMARY KEY,
+    digest TEXT NOT NULL,
+    ext TEXT NOT NULL
+);
+"""
+
+
+def make_thumbnail(data, width=300):
+    """
+    Shrink image bytes to `width` pixels wide (aspect ratio kept)
+
+    Returns:
+        (bytes, extension) - the original bytes when they cannot be resized
+    """
+    if Image is None:
+        return data, _sniff_extension(data)
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            if image.width <= width:
+                return data, (image.format or 'jpeg').lower()
+            height = max(1, round(image.height * width / image.width))
+            thumbnail = image.convert('RGB').resize((width, height), Image.LANCZOS)
+            out = io.BytesIO()
+            thumbnail.save(out, format='JPEG', quality=85, optimize=True)
+            return out.getvalue(), 'jpeg'
+    except Exception:
+        return data, _sniff_extension(data)
+
+
+def _sniff_extension(data):
+    if data.startswith(b'\xff\xd8'):
+        return 'jpeg'
+    if data.startswith(b'\x89PNG'):
+        return 'png'
+    if data.startswith(b'GIF8'):
+        return 'gif'
+    return 'img'
+
+
+class ThumbnailCache:
+    """Content-addressed thumbnail store with a URL index and an LRU size cap"""
+
+    def __init__(self, directory, max_bytes=200 * 1024 * 1024, width=300):
+        self.directory = Path(directory)
+        self.blob_dir = self.directory / 'blobs'
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.width = width
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.directory / 'index.sqlite3'), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._size = sum(path.stat().st_size for path in self.blob_dir.iterdir() if path.is_file())
+
+    def _blob_path(self, digest, ext):
+        return self.blob_dir / f"{digest}.{ext}"
+
+    def get(self, url):
+        """Thumbnail bytes for `url`, or None when not cached (or evicted)"""
+        with self._lock:
+            row = self._conn.execute("SELECT digest, ext FROM urls WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        path = self._blob_path(*row)
+        try:
+            data = path.read_bytes()
+            os.utime(path)  # mark as recently used
+            return data
+        except OSError:
+            return None
+
+    def __contains__(self, url):
+        with self._lock:
+            row = self._conn.execute("SELECT digest, ext FROM urls WHERE url = ?", (url,)).fetchone()
+        return row is not None and self._blob_path(*row).exists()
+
+    def put(self, url, data):
+        """Store a downloaded image for `url`; returns the thumbnail bytes"""
+        thumbnail, ext = make_thumbnail(data, self.width)
+        digest = hashlib.sha256(thumbnail).hexdigest()
+        path = self._blob_path(digest, ext)
+        with self._lock:
+            if not path.exists():
+                tmp_path = path.with_name(path.name + f'.{threading.get_ident()}.tmp')
+                tmp_path.write_bytes(thumbnail)
+                os.replace(tmp_path, path)
+                self._size += len(thumbnail)
+            with self._conn:
+                self._conn.execute("INSERT OR REPLACE INTO urls VALUES (?, ?, ?)", (url, digest, ext))
+            if self._size > self.max_bytes:
+                self._evict_locked()
+        return thumbnail
+
+    def fetch(self, url, session, timeout=5):
+        """
+        Cached thumbnail for `url`, downloading it on a miss
+
+        Returns:
+            Thumbnail bytes, or None when the URL does not serve an image
+        """
+        data = self.get(url)
+        if data is not None:
+            return data
+        response = session.get(url, timeout=timeout)
+        content_type = response.headers.get('Content-Type', '').lower()
+        if response.status_code != 200 or not content_type.startswith('image/'):
+            return None
+        return self.put(url, response.content)
+
+    def _evict_locked(self):
+        """Delete least recently used blobs until the cache is at 90% of its cap"""
+        blobs = sorted(
+            (entry for entry in os.scandir(self.blob_dir) if entry.is_file() and not entry.name.endswith('.tmp')),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        target = self.max_bytes * 0.9
+        removed = []
+        for entry in blobs:
+            if self._size <= target:
+                break
+            size = entry.stat().st_size
+            try:
+                os.remove(entry.path)
+            except OSError:
+                continue
+            self._size -= size
+            removed.append(entry.name.split('.', 1)[0])
+        if removed:
+            with self._conn:
+                self._conn.executemany("DELETE FROM urls WHERE digest = ?", [(digest,) for digest in removed])
+
+    def size(self):
+        return self._size
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_thumbnail_cache(directory, max_bytes=200 * 1024 * 1024, width=300):
+    """Return the process-wide thumbnail cache, creating it on first use"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ThumbnailCache(directory, max_bytes=max_bytes, width=width)
+        return _cache
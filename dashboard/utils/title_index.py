@@ -0,0 +1,256 @@
+"""
+In-memory title index for fuzzy movie search
+
+The catalog's ids, lowercased titles, years, ratings and genres are loaded once
+from the `movies` collection into compact arrays and shared by every session.
+Queries are scored with rapidfuzz over the whole catalog in a single vectorized
+call, so search-as-you-type never touches MongoDB. New movies are picked up by
+an incremental background refresh keyed on `_id`.
+"""
+import threading
+import time
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+try:
+    from config import AppConfig
+except ImportError:
+    import importlib.util
+    config_path = Path(__file__).parent.parent / 'config.py'
+    spec = importlib.util.spec_from_file_location("config", config_path)
+    config_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(config_module)
+    AppConfig = config_module.AppConfig
+
+
+class TitleIndex:
+    """Compact, process-wide title catalog searched with rapidfuzz"""
+
+    PROJECTION = {'title': 1, 'year': 1, 'genres': 1, 'imdb.rating': 1}
+    MISSING_RATING = -1.0
+    MIN_PRIMARY_CANDIDATES = 10  # below this, broaden to individual query words
+
+    def __init__(self, collection, refresh_interval=None):
+        self.collection = collection
+        self.refresh_interval = refresh_interval or AppConfig.TITLE_INDEX_REFRESH_SECONDS
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._refreshing = False
+        self._built = False
+        self._last_refresh = 0.0
+        self._max_id = None
+
+        # Growable column buffers (appended on refresh)
+        self._ids = []
+        self._titles = []
+        self._titles_lower = []
+        self._year_list = []
+        self._rating_list = []
+        self._genre_mask_list = []
+        self._genre_lists = []  # original genre order, for display
+        self._genre_bits = {}  # genre name -> bit position
+
+        # Frozen numpy views used by search
+        self._years = np.zeros(0, dtype=np.int32)
+        self._ratings = np.zeros(0, dtype=np.float32)
+        self._genre_masks = np.zeros(0, dtype=np.uint64)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def ensure_built(self):
+        """Build the index synchronously on first use"""
+        if self._built:
+            return
+        with self._build_lock:
+            if not self._built:
+                self._load({})
+                self._built = True
+
+    def refresh(self):
+        """Append movies inserted since the last load (incremental, keyed on _id)"""
+        with self._build_lock:
+            if self._max_id is None:
+                self._load({})
+            else:
+                self._load({'_id': {'$gt': self._max_id}})
+
+    def refresh_if_stale(self):
+        """Kick off a background incremental refresh when the interval has elapsed"""
+        if time.time() - self._last_refresh < self.refresh_interval:
+            return
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def _run():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Title index refresh warning: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=_run, name="title-index-refresh", daemon=True).start()
+
+    def _load(self, filter_query):
+        cursor = self.collection.find(filter_query, self.PROJECTION).sort('_id', 1).batch_size(2000)
+        ids, titles, years, ratings, masks, genre_lists = [], [], [], [], [], []
+        for doc in cursor:
+            title = doc.get('title')
+            if not isinstance(title, str):
+                title = '' if title is None else str(title)
+            imdb = doc.get('imdb')
+            rating = imdb.get('rating') if isinstance(imdb, dict) else None
+            genres = doc.get('genres')
+            ids.append(doc['_id'])
+            titles.append(title)
+            years.append(self._parse_year(doc.get('year')))
+            ratings.append(float(rating) if isinstance(rating, (int, float)) else self.MISSING_RATING)
+            masks.append(self._encode_genres(genres))
+            genre_lists.append(tuple(genres) if isinstance(genres, list) else ())
+
+        with self._lock:
+            self._ids.extend(ids)
+            self._titles.extend(titles)
+            self._titles_lower.extend(t.lower() for t in titles)
+            self._year_list.extend(years)
+            self._rating_list.extend(ratings)
+            self._genre_mask_list.extend(masks)
+            self._genre_lists.extend(genre_lists)
+            if ids:
+                self._max_id = ids[-1]
+                self._years = np.asarray(self._year_list, dtype=np.int32)
+                self._ratings = np.asarray(self._rating_list, dtype=np.float32)
+                self._genre_masks = np.asarray(self._genre_mask_list, dtype=np.uint64)
+            self._last_refresh = time.time()
+        if ids:
+            print(f"✓ Title index loaded {len(ids)} movies ({len(self._ids)} total)")
+
+    @staticmethod
+    def _parse_year(year):
+        if isinstance(year, int):
+            return year
+        digits = str(year or '')[:4]
+        return int(digits) if digits.isdigit() else 0
+
+    def _encode_genres(self, genres):
+        mask = 0
+        if isinstance(genres, list):
+            for genre in genres:
+                bit = self._genre_bits.get(genre)
+                if bit is None:
+                    if len(self._genre_bits) >= 64:
+                        continue
+                    bit = len(self._genre_bits)
+                    self._genre_bits[genre] = bit
+                mask |= 1 << bit
+        return mask
+
+    def _genre_filter_mask(self, genre):
+        """Bitmask of stored genres equal to the filter (case-insensitive exact match)"""
+        needle = genre.lower()
+        mask = 0
+        for name, bit in list(self._genre_bits.items()):
+            if isinstance(name, str) and name.lower() == needle:
+                mask |= 1 << bit
+        return mask
+
+    def search(self, query, genre=None, limit=20):
+        """
+        Rank catalog titles against `query`
+
+        Candidates are titles containing the full query; if fewer than 10, titles
+        containing any query word longer than 2 characters are added. Candidates
+        are ranked by WRatio similarity desc, then IMDb rating desc.
+
+        Returns:
+            List of movie dicts shaped like the MongoDB projection plus `rating`
+        """
+        from rapidfuzz import fuzz, process
+
+        self.ensure_built()
+        self.refresh_if_stale()
+
+        with self._lock:
+            count = len(self._ids)
+            ids = self._ids
+            titles = self._titles
+            titles_lower = self._titles_lower
+            years = self._years[:count]
+            ratings = self._ratings[:count]
+            genre_masks = self._genre_masks[:count]
+            genre_lists = self._genre_lists
+            genre_mask = self._genre_filter_mask(genre) if genre and genre != "All Genres" else None
+
+        if count == 0:
+            return []
+
+        if genre_mask is not None:
+            eligible = np.flatnonzero((genre_masks & np.uint64(genre_mask)) != 0)
+        else:
+            eligible = range(count)
+
+        q_lower = query.lower().strip()
+        candidates = [i for i in eligible if q_lower in titles_lower[i]]
+
+        if len(candidates) < self.MIN_PRIMARY_CANDIDATES:
+            words = [w.lower() for w in query.split() if len(w) > 2]
+            if words:
+                seen = set(candidates)
+                candidates.extend(
+                    i for i in eligible
+                    if i not in seen and any(w in titles_lower[i] for w in words)
+                )
+
+        if not candidates:
+            return []
+
+        candidates = np.asarray(candidates, dtype=np.int64)
+        scores = process.cdist(
+            [q_lower],
+            [titles_lower[i] for i in candidates],
+            scorer=fuzz.WRatio,
+            workers=-1
+        )[0]
+        candidate_ratings = ratings[candidates]
+        # lexsort is stable and sorts by the last key first: similarity desc, then rating desc
+        order = np.lexsort((-candidate_ratings, -scores))[:limit]
+
+        results = []
+        for pos in order:
+            i = int(candidates[pos])
+            rating = float(ratings[i])
+            movie = {
+                '_id': ids[i],
+                'title': titles[i],
+                'rating': round(rating, 1) if rating != self.MISSING_RATING else None,
+            }
+            if years[i]:
+                movie['year'] = int(years[i])
+            movie['genres'] = list(genre_lists[i])
+            if movie['rating'] is not None:
+                movie['imdb'] = {'rating': movie['rating']}
+            results.append(movie)
+        return results
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_title_index(collection):
+    """Return the process-wide TitleIndex for a movies collection"""
+    key = collection.full_name
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = TitleIndex(collection)
+            _indexes[key] = index
+        return index
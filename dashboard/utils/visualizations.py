@@ -68,12 +68,16 @@ def create_rating_distribution(reviews_df):
     Create a bar chart showing rating distribution
     
     Args:
-        reviews_df: DataFrame with review data
+        reviews_df: DataFrame with review data, or a Series of review counts
+            indexed by rating (as returned by ReviewAnalytics.rating_histogram)
     
     Returns:
         Plotly figure object
     """
-    rating_counts = reviews_df['rating'].value_counts().sort_index()
+    if isinstance(reviews_df, pd.Series):
+        rating_counts = reviews_df.sort_index()
+    else:
+        rating_counts = reviews_df['rating'].value_counts().sort_index()
     
     fig = go.Figure(data=[
         go.Bar(
@@ -106,39 +110,44 @@ def create_timeline_chart(reviews_df):
     Create a timeline chart showing review activity
     
     Args:
-        reviews_df: DataFrame with review data
+        reviews_df: DataFrame with review data, or pre-aggregated buckets with
+            `time_bucket` and `review_count` columns (ReviewAnalytics.timeline)
     
     Returns:
         Plotly figure object
     """
-    # Group by time intervals
-    reviews_df['timestamp'] = pd.to_datetime(reviews_df['timestamp'])
-    reviews_df['time_bucket'] = reviews_df['timestamp'].dt.floor('5min')
-    
-    # Determine appropriate text column for counting reviews
-    text_col_candidates = [
-        'review_text', 'text', 'original_text', 'translated_text'
-    ]
-    available_text_col = None
-    for c in text_col_candidates:
-        if c in reviews_df.columns:
-            available_text_col = c
-            break
-    if available_text_col is None:
-        # Fallback: create a dummy column to count rows
-        available_text_col = '_row'
-        reviews_df[available_text_col] = 1
-    agg_map = {available_text_col: 'count'}
-    if 'sentiment_score' in reviews_df.columns:
-        agg_map['sentiment_score'] = 'mean'
-    if 'rating' in reviews_df.columns:
-        agg_map['rating'] = 'mean'
-    timeline_data = reviews_df.groupby('time_bucket').agg(agg_map).reset_index()
+    if {'time_bucket', 'review_count'}.issubset(reviews_df.columns):
+        timeline_data = reviews_df
+        count_col = 'review_count'
+    else:
+        # Group by time intervals
+        reviews_df['timestamp'] = pd.to_datetime(reviews_df['timestamp'])
+        reviews_df['time_bucket'] = reviews_df['timestamp'].dt.floor('5min')
+        
+        # Determine appropriate text column for counting reviews
+        text_col_candidates = [
+            'review_text', 'text', 'original_text', 'translated_text'
+        ]
+        available_text_col = None
+        for c in text_col_candidates:
+            if c in reviews_df.columns:
+                available_text_col = c
+                break
+        if available_text_col is None:
+            # Fallback: create a dummy column to count rows
+            available_text_col = '_row'
+            reviews_df[available_text_col] = 1
+        agg_map = {available_text_col: 'count'}
+        if 'sentiment_score' in reviews_df.columns:
+            agg_map['sentiment_score'] = 'mean'
+        if 'rating' in reviews_df.columns:
+            agg_map['rating'] = 'mean'
+        timeline_data = reviews_df.groupby('time_bucket').agg(agg_map).reset_index()
+        count_col = available_text_col
     
     fig = go.Figure()
     
     # Add review count line
-    count_col = available_text_col
     fig.add_trace(go.Scatter(
         x=timeline_data['time_bucket'],
         y=timeline_data[count_col],
@@ -0,0 +1,194 @@
+"""
+Write-behind buffer for audience reviews
+
+Reviews from every session are collected in one process-wide buffer and handed
+to a sink in batches (the DatabaseManager flushes them with an unordered
+insert_many), instead of paying a full Atlas round trip per review.
+
+Durability comes first: each review is appended to a local write-ahead
+ReviewLog before `append()` returns, and the log is replayed on startup, so a
+crash between accepting and flushing a review loses nothing. Reviews carry a
+client-assigned `_id`, which makes a replayed flush idempotent.
+
+A batch is flushed when `max_batch` reviews are waiting or the oldest waiting
+review is `max_delay` seconds old. Until then `pending()` exposes the waiting
+reviews so readers can overlay them (read-your-writes); the sink `confirm()`s
+reviews as soon as they are stored so they are not counted twice.
+"""
+import atexit
+import threading
+import time
+
+
+class WriteBehindBuffer:
+    """Batches reviews for a sink, with a write-ahead log and a pending overlay"""
+
+    def __init__(self, wal, max_batch=50, max_delay=1.0, retry_delay=5.0):
+        """
+        Args:
+            wal: ReviewLog used as the write-ahead log
+            max_batch: Flush as soon as this many reviews are waiting
+            max_delay: Flush reviews that have waited this many seconds
+            retry_delay: Pause before retrying reviews the sink could not write
+        """
+        self.wal = wal
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.retry_delay = retry_delay
+        self._sink = None
+        self._pending = {}        # str(_id) -> review, in arrival order
+        self._in_flight = {}      # str(_id) -> review handed to the sink, not yet confirmed
+        self._oldest = None       # monotonic time the oldest pending review arrived
+        self._failed_at = None
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._recovered = False
+
+    def set_sink(self, sink):
+        """
+        Register the batch writer: sink(reviews) persists a list of reviews
+
+        The sink returns the reviews it could not write (retried later), or
+        raises to have the whole batch retried.
+        """
+        with self._cond:
+            self._sink = sink
+            if not self._recovered:
+                self._recover()
+                self._recovered = True
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="review-write-behind", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _recover(self):
+        """Queue reviews left in the write-ahead log by a previous process"""
+        recovered = 0
+        for review in self.wal.iter_reviews(newest_first=False):
+            review_id = review.get('_id')
+            if review_id is not None and str(review_id) not in self._pending:
+                self._pending[str(review_id)] = review
+                recovered += 1
+        if recovered:
+            self._oldest = time.monotonic() - self.max_delay
+            print(f"✓ Recovered {recovered} unflushed reviews from the write-ahead log")
+
+    def append(self, review):
+        """Durably accept one review (must already carry its `_id`)"""
+        with self._cond:
+            # Logged under the lock so a concurrent flush cannot clear the log
+            # between this write and the review becoming pending
+            self.wal.append(review)
+            self._pending[str(review['_id'])] = review
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            if len(self._pending) >= self.max_batch:
+                self._cond.notify()
+
+    def pending(self):
+        """Snapshot of reviews accepted but not yet confirmed by the sink"""
+        with self._cond:
+            return list(self._in_flight.values()) + list(self._pending.values())
+
+    def confirm(self, reviews):
+        """
+        Called by the sink for reviews it has persisted, before its batch returns
+
+        They leave the pending overlay right away, so readers stop adding them
+        on top of the store while the sink finishes the rest of the batch.
+        """
+        with self._cond:
+            for review in reviews:
+                self._in_flight.pop(str(review['_id']), None)
+
+    def __len__(self):
+        with self._cond:
+            return len(self._pending) + len(self._in_flight)
+
+    def flush(self):
+        """Hand every pending review to the sink now; returns the number written"""
+        with self._flush_lock:
+            with self._cond:
+                if self._sink is None or not self._pending:
+                    return 0
+                sink = self._sink
+                self._in_flight = self._pending
+                self._pending = {}
+                self._oldest = None
+            batch = list(self._in_flight.values())
+            failure = None
+            try:
+                retry = list(sink(batch) or ())
+            except Exception as e:
+                retry, failure = batch, e
+            with self._cond:
+                self._in_flight = {}
+                if retry:
+                    # Put them back in front of anything that arrived meanwhile
+                    requeued = {str(review['_id']): review for review in retry}
+                    requeued.update(self._pending)
+                    self._pending = requeued
+                    self._oldest = time.monotonic() - self.max_delay
+                    self._failed_at = time.monotonic()
+                else:
+                    self._failed_at = None
+                    if not self._pending:
+                        # Everything accepted so far is persisted
+                        self.wal.clear()
+            if failure is not None:
+                raise failure
+            return len(batch) - len(retry)
+
+    def clear(self):
+        """Drop pending reviews and the write-ahead log (admin reset)"""
+        with self._flush_lock:
+            with self._cond:
+                dropped = len(self._pending)
+                self._pending = {}
+                self._oldest = None
+                self.wal.clear()
+                return dropped
+
+    def _due(self):
+        if not self._pending or self._sink is None:
+            return False
+        if self._failed_at is not None and time.monotonic() - self._failed_at < self.retry_delay:
+            return False
+        return len(self._pending) >= self.max_batch or time.monotonic() - self._oldest >= self.max_delay
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._due():
+                    timeout = None
+                    if self._pending:
+                        timeout = max(0.05, self.max_delay - (time.monotonic() - self._oldest))
+                        if self._failed_at is not None:
+                            timeout = max(0.05, self.retry_delay - (time.monotonic() - self._failed_at))
+                    self._cond.wait(timeout)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠ Review write-behind flush failed, will retry: {e}")
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_write_behind_buffer(wal, max_batch=50, max_delay=1.0):
+    """Return the process-wide review buffer, creating it on first use"""
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = WriteBehindBuffer(wal, max_batch=max_batch, max_delay=max_delay)
+            atexit.register(_flush_at_exit, _buffer)
+        return _buffer
+
+
+def _flush_at_exit(buffer):
+    try:
+        buffer.flush()
+    except Exception as e:
+        print(f"⚠ Pending reviews left in the write-ahead log: {e}")
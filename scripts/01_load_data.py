@@ -30,4 +30,4 @@ reviews["sentiment"] = reviews["sentiment"].map({"positive": 1, "negative": 0})
 reviews_dict = reviews.to_dict("records")
 db.reviews.drop()
 db.reviews.insert_many(reviews_dict)
-print("Reviews cargadas")
\ No newline at end of file
+print("Reviews cargadas")
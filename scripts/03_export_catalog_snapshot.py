@@ -0,0 +1,31 @@
+# scripts/03_export_catalog_snapshot.py
+#
+# Export the sample_mflix movie catalog to the local SQLite snapshot served by
+# DatabaseManager when Atlas is unreachable (or CATALOG_BACKEND=snapshot).
+#
+#   python scripts/03_export_catalog_snapshot.py [output.sqlite3]
+
+import sys
+from pathlib import Path
+
+from pymongo import MongoClient
+from pymongo.server_api import ServerApi
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "dashboard"))
+
+from config import AppConfig
+from utils.catalog_snapshot import export_snapshot
+
+output = Path(sys.argv[1]) if len(sys.argv) > 1 else AppConfig.CATALOG_SNAPSHOT_PATH
+
+client = MongoClient(AppConfig.MONGODB_URI, server_api=ServerApi('1'))
+db = client[AppConfig.DATABASE_NAME]
+
+print(f"Exportando catálogo a {output}...")
+count = export_snapshot(
+    db[AppConfig.MOVIES_COLLECTION],
+    output,
+    popularity=db[AppConfig.POPULARITY_COLLECTION]
+)
+print(f"Películas exportadas: {count}")
+client.close()
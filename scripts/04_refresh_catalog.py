@@ -0,0 +1,33 @@
+# scripts/04_refresh_catalog.py
+#
+# Run after changing the sample_mflix movie catalog the dashboard reads:
+# recomputes the rating_sort key (imdb.rating, or -1 for unrated movies, as
+# DatabaseManager.RATING_SORT_EXPRESSION) and bumps catalog_meta.version so
+# every running dashboard drops its cached catalog reads
+# (DatabaseManager.poll_catalog_version).
+#
+#   python scripts/04_refresh_catalog.py
+
+import sys
+from pathlib import Path
+
+from pymongo import MongoClient, ReturnDocument
+from pymongo.server_api import ServerApi
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "dashboard"))
+
+from config import AppConfig
+
+client = MongoClient(AppConfig.MONGODB_URI, server_api=ServerApi('1'))
+db = client[AppConfig.DATABASE_NAME]
+
+result = db[AppConfig.MOVIES_COLLECTION].update_many(
+    {}, [{"$set": {"rating_sort": {"$cond": [{"$isNumber": "$imdb.rating"}, "$imdb.rating", -1]}}}]
+)
+print(f"rating_sort actualizado en {result.modified_count} películas")
+
+meta = db[AppConfig.CATALOG_META_COLLECTION].find_one_and_update(
+    {"_id": "catalog"}, {"$inc": {"version": 1}}, upsert=True, return_document=ReturnDocument.AFTER
+)
+print(f"Versión del catálogo: {meta['version']}")
+client.close()
@@ -0,0 +1,90 @@
+"""
+Poster resolution load test against the local OMDb stub (no network needed)
+
+Resolves pages of uncached titles through MovieCatalog.get_poster_urls and
+reports page latency and lookup throughput:
+
+    python test/load_test_posters.py --pages 10 --latency 80 --rate 50
+    python test/load_test_posters.py --error-rate 0.2      # retries + breaker
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent / 'dashboard'
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from omdb_stub_server import start_stub_server
+
+
+class NoCatalog:
+    """db_manager stand-in: no document posters, so every title goes to OMDb"""
+
+    def get_movies_by_ids(self, movie_ids, projection=None):
+        return {}
+
+
+def run(pages, page_size, latency_ms, error_rate, rate, workers):
+    server = start_stub_server(latency=latency_ms / 1000, error_rate=error_rate)
+    tmp = tempfile.TemporaryDirectory()
+
+    from config import AppConfig
+    AppConfig.OMDB_BASE_URL = server.base_url
+    AppConfig.POSTER_CACHE_PATH = Path(tmp.name) / 'posters.sqlite3'  # cold cache every run
+    AppConfig.POSTER_RATE_LIMIT = rate
+    AppConfig.POSTER_WORKERS = workers
+    AppConfig.POSTER_PAGE_DEADLINE = 60
+
+    from utils.movie_search import MovieCatalog
+    catalog = MovieCatalog(NoCatalog())
+
+    print("=" * 80)
+    print(f"POSTER LOAD TEST - {pages} pages x {page_size} titles, stub latency {latency_ms:.0f} ms, "
+          f"error rate {error_rate:.0%}, {rate:.0f} lookups/s, {workers} workers")
+    print("=" * 80)
+
+    page_times, placeholders = [], 0
+    started = time.perf_counter()
+    for page in range(pages):
+        movies = [{'title': f"Load Test Movie {page}-{i}", 'year': 2000 + i % 20} for i in range(page_size)]
+        page_start = time.perf_counter()
+        urls = catalog.get_poster_urls(movies)
+        page_times.append(time.perf_counter() - page_start)
+        placeholders += sum(1 for url in urls if '/posters/' not in url)
+        print(f"Page {page + 1:3d}: {page_times[-1] * 1000:8.1f} ms")
+    elapsed = time.perf_counter() - started
+
+    # A cached page should not touch the stub at all
+    before = server.requests
+    cached_start = time.perf_counter()
+    catalog.get_poster_urls(movies)
+    cached_ms = (time.perf_counter() - cached_start) * 1000
+
+    total = pages * page_size
+    print("-" * 80)
+    print(f"Posters resolved:   {total - placeholders}/{total} ({placeholders} placeholders)")
+    print(f"Throughput:         {total / elapsed:.1f} posters/s")
+    print(f"Page latency p50:   {statistics.median(page_times) * 1000:.1f} ms")
+    p95 = sorted(page_times)[max(0, round(len(page_times) * 0.95) - 1)]
+    print(f"Page latency p95:   {p95 * 1000:.1f} ms")
+    print(f"Cached page:        {cached_ms:.1f} ms, {server.requests - before} stub requests")
+    print(f"Stub requests:      {server.requests}")
+
+    server.shutdown()
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark poster resolution against the OMDb stub")
+    parser.add_argument('--pages', type=int, default=5)
+    parser.add_argument('--page-size', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=80, help="stub latency in milliseconds")
+    parser.add_argument('--error-rate', type=float, default=0)
+    parser.add_argument('--rate', type=float, default=50, help="lookup rate limit (requests/s)")
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+    run(args.pages, args.page_size, args.latency, args.error_rate, args.rate, args.workers)
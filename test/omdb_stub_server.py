@@ -0,0 +1,116 @@
+"""
+Local OMDb-compatible stand-in server for offline poster benchmarks
+
+Answers `/?apikey=..&t=<title>[&y=<year>]` like www.omdbapi.com and serves
+the poster images it points to, so poster throughput can be measured without
+network access or API quota. Point the dashboard at it with:
+
+    python test/omdb_stub_server.py --port 8765 --latency 80
+    OMDB_BASE_URL=http://127.0.0.1:8765/ streamlit run dashboard/app.py
+
+Titles containing "missing" get {"Response": "False"}; --error-rate makes a
+share of requests fail with HTTP 503 to exercise retries and the breaker.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlparse
+
+# Smallest valid GIF: the stub's "poster"
+POSTER_BYTES = (
+    b'GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!\xf9\x04\x01\x00\x00\x00\x00'
+    b',\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;'
+)
+
+
+class OmdbStubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real API
+
+    def do_GET(self):
+        self._handle(send_body=True)
+
+    def do_HEAD(self):
+        self._handle(send_body=False)
+
+    def _handle(self, send_body):
+        server = self.server
+        server.count_request()
+        if server.latency:
+            time.sleep(server.latency)
+        if server.error_rate and random.random() < server.error_rate:
+            return self._send(503, b'{"Response":"False","Error":"Service unavailable"}', 'application/json', send_body)
+
+        url = urlparse(self.path)
+        if url.path.startswith('/posters/'):
+            return self._send(200, POSTER_BYTES, 'image/gif', send_body)
+
+        params = parse_qs(url.query)
+        title = params.get('t', [''])[0]
+        if not params.get('apikey') or not title:
+            body = {'Response': 'False', 'Error': 'No API key provided.' if not params.get('apikey') else 'Incorrect IMDb ID.'}
+        elif 'missing' in title.lower():
+            body = {'Response': 'False', 'Error': 'Movie not found!'}
+        else:
+            host = self.headers.get('Host') or f"127.0.0.1:{server.server_address[1]}"
+            body = {
+                'Response': 'True',
+                'Title': title,
+                'Year': params.get('y', ['N/A'])[0],
+                'Poster': f"http://{host}/posters/{quote(title.lower())}.gif",
+            }
+        self._send(200, json.dumps(body).encode(), 'application/json', send_body)
+
+    def _send(self, status, body, content_type, send_body):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class OmdbStubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=0, latency=0.0, error_rate=0.0):
+        super().__init__(('127.0.0.1', port), OmdbStubHandler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/"
+
+
+def start_stub_server(port=0, latency=0.0, error_rate=0.0):
+    """Start the stub on a background thread; returns the server (call shutdown() when done)"""
+    server = OmdbStubServer(port, latency, error_rate)
+    threading.Thread(target=server.serve_forever, name='omdb-stub', daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local OMDb stand-in")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0, help="milliseconds added to every response")
+    parser.add_argument('--error-rate', type=float, default=0, help="share of requests answered with 503")
+    args = parser.parse_args()
+
+    server = OmdbStubServer(args.port, args.latency / 1000, args.error_rate)
+    print(f"OMDb stub listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,80 @@
+"""
+Test the local SQLite catalog snapshot (export + DatabaseManager-shaped reads)
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent / 'dashboard'
+sys.path.insert(0, str(BASE_DIR))
+
+from utils.catalog_snapshot import CatalogSnapshot, export_snapshot
+
+MOVIES = [
+    {'_id': '573a1390f29313caabcd4135', 'title': 'Blacksmith Scene', 'year': 1893, 'genres': ['Short'],
+     'imdb': {'rating': 6.2}, 'cast': ['Charles Kayser'], 'directors': ['William K.L. Dickson']},
+    {'_id': '573a1390f29313caabcd42e8', 'title': 'The Great Train Robbery', 'year': 1903,
+     'genres': ['Short', 'Western'], 'imdb': {'rating': 7.4}, 'plot': 'A group of bandits stage a brazen train hold-up.'},
+    {'_id': '573a1390f29313caabcd4323', 'title': 'The Land Beyond the Sunset', 'year': 1912,
+     'genres': ['Short'], 'imdb': {'rating': 7.1}},
+    {'_id': '573a1390f29313caabcd446f', 'title': 'A Corner in Wheat', 'year': '1909è', 'genres': ['Drama', 'Short']},
+]
+
+
+class FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, filter_query=None, projection=None):
+        return iter(self.docs)
+
+
+def build(tmp, popularity=None):
+    path = Path(tmp) / 'catalog.sqlite3'
+    assert export_snapshot(FakeCollection(MOVIES), path, popularity=popularity) == len(MOVIES)
+    return CatalogSnapshot(path)
+
+
+def test_browse_count_and_genre_filter():
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = build(tmp)
+        movies = snapshot.search_movies(sort_by='year', sort_order='desc', limit=10)
+        assert [m['year'] for m in movies] == [1912, 1909, 1903, 1893]
+        assert movies[1]['rating'] is None and 'imdb' not in movies[1]
+        assert snapshot.count_movies(genre='western') == 1
+        assert snapshot.count_movies(query='train') == 1
+        assert [m['title'] for m in snapshot.search_movies(query='bandits')] == ['The Great Train Robbery']
+
+
+def test_pages_and_lookup_by_id():
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = build(tmp)
+        first, token = snapshot.search_movies_page(limit=3)
+        second, last_token = snapshot.search_movies_page(limit=3, page_token=token)
+        assert len(first) == 3 and len(second) == 1 and last_token is None
+        assert snapshot.page_token_at(page_token=None, offset=3) == token
+
+        found = snapshot.get_movies_by_ids([MOVIES[1]['_id'], 'missing'])
+        assert list(found) == [MOVIES[1]['_id']]
+        assert found[MOVIES[1]['_id']]['genres'] == ['Short', 'Western']
+
+
+def test_popular_movies_use_exported_popularity():
+    popularity = FakeCollection([
+        {'_id': MOVIES[0]['_id'], 'rating': 6.2, 'comment_count': 40},
+        {'_id': MOVIES[2]['_id'], 'rating': 7.1, 'comment_count': 3},
+    ])
+    with tempfile.TemporaryDirectory() as tmp:
+        popular = build(tmp, popularity=popularity).get_popular_movies(limit=5)
+        assert [(m['title'], m['comment_count']) for m in popular] == [
+            ('The Land Beyond the Sunset', 3), ('Blacksmith Scene', 40)
+        ]
+
+
+def test_rating_order_keeps_unrated_movies_last():
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = build(tmp)
+        for order in ('asc', 'desc'):
+            movies = snapshot.search_movies(sort_by='rating', sort_order=order)
+            assert movies[-1]['title'] == 'A Corner in Wheat'
+        assert [m['rating'] for m in snapshot.search_movies(sort_by='rating')] == [6.2, 7.1, 7.4, None]
@@ -0,0 +1,72 @@
+"""
+Verify genre-filtered catalog queries are served by an index (explain plan)
+
+The explain-plan check requires pymongo and a reachable MongoDB (same
+connection as the dashboard); it is skipped otherwise.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+BASE_DIR = Path(__file__).resolve().parent.parent / 'dashboard'
+sys.path.insert(0, str(BASE_DIR))
+
+SORT_MODES = [
+    ('rating', 'desc'),
+    ('rating', 'asc'),
+    ('year', 'desc'),
+    ('title', 'asc'),
+]
+
+
+def plan_stages(plan):
+    """Collect every stage name in an explain() winning plan tree"""
+    stages = []
+    if isinstance(plan, dict):
+        if 'stage' in plan:
+            stages.append(plan['stage'])
+        for key in ('inputStage', 'queryPlan'):
+            if key in plan:
+                stages.extend(plan_stages(plan[key]))
+        for child in plan.get('inputStages', []):
+            stages.extend(plan_stages(child))
+    return stages
+
+
+def winning_plan(explain):
+    planner = explain.get('queryPlanner', {})
+    return planner.get('winningPlan', {})
+
+
+def test_plan_stages_walks_nested_plans():
+    explain = {'queryPlanner': {'winningPlan': {
+        'stage': 'LIMIT',
+        'inputStage': {'stage': 'FETCH', 'inputStage': {'stage': 'IXSCAN', 'indexName': 'genres_1_rating_sort_1__id_1'}}
+    }}}
+    assert plan_stages(winning_plan(explain)) == ['LIMIT', 'FETCH', 'IXSCAN']
+
+
+def test_genre_sorted_browse_uses_ixscan():
+    pytest.importorskip("pymongo")
+    from utils.database import DatabaseManager
+
+    db = DatabaseManager()
+    if not db.is_connected():
+        pytest.skip("MongoDB not reachable")
+    # DatabaseManager builds its indexes on a background thread; make sure they exist first
+    db._create_indexes()
+
+    for sort_by, sort_order in SORT_MODES:
+        explain = db.explain_catalog_query(genre='Drama', sort_by=sort_by, sort_order=sort_order)
+        assert explain, f"no explain output for genre + {sort_by} sort"
+        stages = plan_stages(winning_plan(explain))
+        assert 'IXSCAN' in stages, f"expected IXSCAN for genre + {sort_by} sort, got {stages}"
+        assert 'COLLSCAN' not in stages
+        # The index supplies the order, so no blocking in-memory SORT stage
+        assert 'SORT' not in stages, f"unexpected in-memory sort for {sort_by}/{sort_order}"
+
+
+if __name__ == "__main__":
+    test_plan_stages_walks_nested_plans()
+    test_genre_sorted_browse_uses_ixscan()
@@ -0,0 +1,47 @@
+"""
+Test the shared HTTP client: circuit breaker and pooled session against the OMDb stub
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+BASE_DIR = Path(__file__).resolve().parent.parent / 'dashboard'
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from omdb_stub_server import start_stub_server
+from utils.http_client import CircuitBreaker, CircuitOpenError, build_session
+
+
+def fail():
+    raise ValueError("boom")
+
+
+def test_breaker_opens_and_lets_one_trial_through():
+    breaker = CircuitBreaker('stub', failure_threshold=2, reset_timeout=60)
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            breaker.call(fail)
+    assert breaker.state == 'open'
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: 'not called')
+
+    breaker.reset_timeout = 0
+    assert breaker.allow() is True  # the single half-open trial
+    assert breaker.allow() is False
+    breaker.record_success()
+    assert breaker.state == 'closed'
+
+
+def test_session_talks_to_the_stub():
+    server = start_stub_server()
+    try:
+        session = build_session(pool_size=2, retries=0)
+        data = session.get(server.base_url, params={'apikey': 'x', 't': 'The Matrix', 'y': '1999'}, timeout=5).json()
+        assert data['Response'] == 'True' and data['Year'] == '1999'
+        poster = session.head(data['Poster'], timeout=5)
+        assert poster.status_code == 200 and poster.headers['Content-Type'].startswith('image/')
+        assert session.get(server.base_url, params={'apikey': 'x', 't': 'missing'}, timeout=5).json()['Response'] == 'False'
+    finally:
+        server.shutdown()
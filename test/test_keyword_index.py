@@ -0,0 +1,71 @@
+"""
+Test the trigram keyword index used by catalog search (no database needed)
+"""
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent / 'dashboard'
+sys.path.insert(0, str(BASE_DIR))
+
+from utils.keyword_index import TrigramIndex
+
+MOVIES = [
+    {'_id': 1, 'title': 'The Godfather', 'plot': 'The aging patriarch of an organized crime dynasty...',
+     'cast': ['Marlon Brando', 'Al Pacino'], 'directors': ['Francis Ford Coppola']},
+    {'_id': 2, 'title': 'Love Actually', 'plot': 'Follows the lives of eight couples in London.',
+     'cast': ['Hugh Grant', 'Emma Thompson'], 'directors': ['Richard Curtis']},
+    {'_id': 3, 'title': 'Toy Story', 'plot': 'A cowboy doll is threatened by a new spaceman toy.',
+     'cast': ['Tom Hanks', 'Tim Allen'], 'directors': ['John Lasseter']},
+    {'_id': 4, 'title': 'Cast Away', 'plot': 'A FedEx executive is stranded on an island.',
+     'cast': ['Tom Hanks', 'Helen Hunt'], 'directors': ['Robert Zemeckis']},
+]
+
+
+def build_index():
+    index = TrigramIndex()
+    index.add_documents(MOVIES)
+    return index
+
+
+def test_substring_across_fields():
+    index = build_index()
+    assert index.search('godfather') == [1]
+    assert index.search('LONDON') == [2]          # plot, case-insensitive
+    assert index.search('hanks') == [3, 4]        # cast
+    assert index.search('zemeckis') == [4]        # directors
+    assert index.search('xyzzy') == []
+    print("✓ Substring matches across title, plot, cast and directors")
+
+
+def test_multi_word_and_or():
+    index = build_index()
+    assert index.search('tom island', mode='and') == [4]
+    assert index.search('love toy', mode='or', fields=('title',)) == [2, 3]
+    assert index.search('love toy', mode='and', fields=('title',)) == []
+    print("✓ Multi-word AND/OR queries")
+
+
+def test_field_restriction_and_short_terms():
+    index = build_index()
+    # 'cast' appears in a title and in no cast list
+    assert index.search('cast', fields=('title',)) == [4]
+    # Terms shorter than a trigram fall back to a scan
+    assert index.search('al', fields=('cast',)) == [1, 3]
+    # Names are indexed one per line, so a term never spans two names
+    assert index.search('brando al') == [1]
+    assert index.search_terms(['brando al']) == []
+    print("✓ Field restriction and short terms")
+
+
+def test_incremental_add():
+    index = build_index()
+    index.add_documents([{'_id': 5, 'title': 'Toy Story 2', 'plot': '', 'cast': [], 'directors': []}])
+    assert index.search_terms(['toy story']) == [3, 5]
+    print("✓ Incremental additions are searchable")
+
+
+if __name__ == "__main__":
+    test_substring_across_fields()
+    test_multi_word_and_or()
+    test_field_restriction_and_short_terms()
+    test_incremental_add()
@@ -0,0 +1,49 @@
+"""
+Test the shared poster cache (disk tier, positive and negative TTLs)
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent / 'dashboard'
+sys.path.insert(0, str(BASE_DIR))
+
+from utils.poster_cache import PosterCache, poster_key
+
+
+def test_entries_survive_a_restart():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'posters.sqlite3'
+        key = poster_key(' The Godfather ', 1972)
+        PosterCache(path).set(key, 'https://example.org/godfather.jpg', catalog_poster='https://example.org/doc.jpg')
+
+        reopened = PosterCache(path)
+        assert reopened.get(poster_key('the godfather', 1972)) == 'https://example.org/godfather.jpg'
+        assert reopened.catalog_poster(key) == 'https://example.org/doc.jpg'
+        assert reopened.get(poster_key('The Godfather')) is None
+
+
+def test_failed_lookups_expire_sooner():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = PosterCache(Path(tmp) / 'posters.sqlite3', ttl=60, negative_ttl=0.05)
+        cache.set('found|', 'https://example.org/a.jpg')
+        cache.set('missing|', None)
+        assert cache.get('missing|') == ''  # cached "no poster"
+        time.sleep(0.1)
+        assert cache.get('missing|') is None
+        assert cache.get('found|') == 'https://example.org/a.jpg'
+        assert cache.purge_expired() == 1
+
+
+def test_validation_results_are_remembered_per_url():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'posters.sqlite3'
+        cache = PosterCache(path, negative_ttl=60)
+        assert cache.validation('https://example.org/a.jpg') is None
+        cache.set_validation('https://example.org/a.jpg', True)
+        cache.set_validation('https://example.org/broken.jpg', False)
+
+        reopened = PosterCache(path)
+        assert reopened.validation('https://example.org/a.jpg') is True
+        assert reopened.validation('https://example.org/broken.jpg') is False
@@ -0,0 +1,45 @@
+"""
+Test background page prefetching (neighbour pages, cancellation on filter change)
+"""
+import sys
+import threading
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent / 'dashboard'
+sys.path.insert(0, str(BASE_DIR))
+
+from utils.prefetch import PagePrefetcher
+
+
+def test_neighbour_pages_are_fetched_and_warmed():
+    fetched, warmed = [], []
+    prefetcher = PagePrefetcher(
+        fetch_page=lambda filters, page: fetched.append((filters, page)) or [f"movie-{page}"],
+        warm_page=warmed.extend
+    )
+    prefetcher.schedule(('Drama', 'title', 'asc', 20), page=1)
+    for future in list(prefetcher._futures.values()):
+        future.result(timeout=5)
+    assert fetched == [(('Drama', 'title', 'asc', 20), 2)]  # no page 0
+    assert warmed == ['movie-2']
+
+
+def test_changing_filters_cancels_pending_prefetches():
+    release = threading.Event()
+    warmed = []
+
+    def fetch_page(filters, page):
+        release.wait(5)
+        return [(filters, page)]
+
+    prefetcher = PagePrefetcher(fetch_page=fetch_page, warm_page=warmed.extend)
+    prefetcher.schedule(('Drama', 'title', 'asc', 20), page=3)
+    stale = list(prefetcher._futures.values())
+    prefetcher.schedule(('Comedy', 'year', 'desc', 20), page=1)
+    current = list(prefetcher._futures.values())
+    release.set()
+    for future in current:
+        future.result(timeout=5)
+    for future in stale:
+        assert future.cancelled() or future.result(timeout=5) is not None
+    assert warmed == [(('Comedy', 'year', 'desc', 20), 2)]
@@ -0,0 +1,92 @@
+"""
+Test the append-only local review log (segments, sidecar index, checkpoints)
+"""
+import json
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent / 'dashboard'
+sys.path.insert(0, str(BASE_DIR))
+
+from utils.review_log import ReviewLog
+
+MOVIE_A = '573a13e7f29313caabdc8b22'
+MOVIE_B = '573a13b8f29313caabd4b94b'
+
+
+def make_review(i, movie_id, start=datetime(2025, 11, 21, 6, 0, 0)):
+    return {
+        'movie_id': movie_id,
+        'movie_title': 'A' if movie_id == MOVIE_A else 'B',
+        'rating': i % 6,
+        'sentiment_score': 0.9 if i % 2 else 0.1,
+        'sentiment_label': 'Positive' if i % 4 == 1 else 'Negative',  # confident Negatives too
+        'session_id': f"session-{i % 3}",
+        'timestamp': start + timedelta(minutes=i),
+    }
+
+
+def test_append_and_read_newest_first():
+    with tempfile.TemporaryDirectory() as tmp:
+        log = ReviewLog(tmp)
+        for i in range(10):
+            log.append(make_review(i, MOVIE_A if i % 2 else MOVIE_B))
+
+        reviews = log.get_reviews(limit=3)
+        assert [r['rating'] for r in reviews] == [9 % 6, 8 % 6, 7 % 6]
+        assert isinstance(reviews[0]['timestamp'], datetime)
+        assert len(log.get_reviews(movie_id=MOVIE_A)) == 5
+        assert all(str(r['movie_id']) == MOVIE_B for r in log.get_reviews(movie_id=MOVIE_B))
+    print("✓ Reviews read back newest first, filtered by movie")
+
+
+def test_stats_survive_segment_rotation_and_reopen():
+    with tempfile.TemporaryDirectory() as tmp:
+        log = ReviewLog(tmp, segment_max_bytes=600, checkpoint_every=4)
+        for i in range(25):
+            log.append(make_review(i, MOVIE_A))
+        assert len(list(Path(tmp).glob('segment-*.log'))) > 2
+
+        expected = log.stats().summary()
+        assert expected['total_reviews'] == 25
+        assert expected['positive_count'] == 12
+        assert expected['positive_label_count'] == 6
+        assert expected['active_participants'] == 3
+
+        # Reopen: stats come from footers/checkpoint plus the unparsed tail
+        reopened = ReviewLog(tmp, segment_max_bytes=600, checkpoint_every=4)
+        assert reopened.stats().summary() == expected
+
+        # Lose the checkpoint: sealed segment footers rebuild the aggregate
+        (Path(tmp) / 'checkpoint.json').unlink()
+        recovered = ReviewLog(tmp, segment_max_bytes=600, checkpoint_every=4)
+        assert recovered.stats().summary() == expected
+        assert recovered.count() == 25
+    print("✓ Aggregates survive rotation, reopen and checkpoint loss")
+
+
+def test_legacy_import_and_clear():
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = Path(tmp) / 'local_reviews_backup.jsonl'
+        with open(legacy, 'w', encoding='utf-8') as f:
+            for i in range(3):
+                review = make_review(i, MOVIE_B)
+                review['timestamp'] = str(review['timestamp'])
+                f.write(json.dumps(review) + '\n')
+
+        log = ReviewLog(Path(tmp) / 'log', legacy_path=legacy)
+        assert log.count() == 3
+        assert legacy.exists()  # copied, not moved (the backup file is tracked in git)
+        assert log.clear() == 3
+        assert log.count() == 0
+        assert log.stats().total_reviews == 0
+        assert ReviewLog(Path(tmp) / 'log', legacy_path=legacy).count() == 0
+    print("✓ Legacy JSONL backup is migrated once; clear() empties the log")
+
+
+if __name__ == "__main__":
+    test_append_and_read_newest_first()
+    test_stats_survive_segment_rotation_and_reopen()
+    test_legacy_import_and_clear()
@@ -0,0 +1,39 @@
+"""
+Test the local poster thumbnail cache (content addressing, LRU size cap)
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent / 'dashboard'
+sys.path.insert(0, str(BASE_DIR))
+
+from utils.thumbnails import ThumbnailCache
+
+GIF = b'GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff,\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;'
+
+
+def test_identical_images_share_one_blob():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ThumbnailCache(tmp)
+        cache.put('https://example.org/a.gif', GIF)
+        cache.put('https://example.org/copy-of-a.gif', GIF)
+        assert cache.get('https://example.org/a.gif') == cache.get('https://example.org/copy-of-a.gif')
+        assert len(list(cache.blob_dir.iterdir())) == 1
+        assert 'https://example.org/a.gif' in ThumbnailCache(tmp)  # index survives a restart
+        assert cache.get('https://example.org/unknown.gif') is None
+
+
+def test_least_recently_used_thumbnails_are_evicted():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ThumbnailCache(tmp, max_bytes=2500)
+        cache.put('old', b'GIF8' + b'o' * 996)
+        cache.put('used', b'GIF8' + b'u' * 996)
+        for path in cache.blob_dir.iterdir():  # 'old' last used long ago
+            os.utime(path, (1, 1) if path.read_bytes()[4:5] == b'o' else None)
+        cache.put('new', b'GIF8' + b'n' * 996)
+
+        assert cache.get('old') is None and 'old' not in cache
+        assert cache.get('used') is not None and cache.get('new') is not None
+        assert cache.size() <= 2500